@@ -1,4 +1,5 @@
 import os
+import re
 import sys
 import json
 import shutil
@@ -8,13 +9,32 @@ import tempfile
 import threading
 import zipfile
 import requests
-import signal
+import struct
+import time
+import errno
+import fcntl
+import concurrent.futures
+import hashlib
+import io
+import copy
+import stat
+import bz2
+import gzip
+import lzma
+import zlib
+import collections
+from contextlib import contextmanager
 from pathlib import Path
 from PySide6.QtWidgets import *
 from PySide6.QtCore import *
 from PySide6.QtGui import *
 from typing import Optional, Tuple
 
+try:
+    import zstandard  # opcional: compresión zstd multihilo en exportaciones
+except ImportError:
+    zstandard = None
+
 # ============================================================================
 # CONFIGURACIONES Y RUTAS
 # ============================================================================
@@ -31,6 +51,16 @@ MCPELAUNCHER_DIR = Path.home() / ".local" / "share" / "boxcraft"
 VERSIONS_DIR = MCPELAUNCHER_DIR / "versions"
 GAMES_DIR = MCPELAUNCHER_DIR / "games" / "com.mojang"
 CONFIG_FILE = MCPELAUNCHER_DIR / "boxcraft_config.json"
+CACHE_DIR = MCPELAUNCHER_DIR / "cache"
+PACK_INDEX_FILE = CACHE_DIR / "pack_index.json"
+WORLD_INDEX_FILE = CACHE_DIR / "world_index.json"
+VERSION_INDEX_FILE = CACHE_DIR / "version_index.json"
+DISK_USAGE_FILE = CACHE_DIR / "disk_usage.json"
+EXPORT_MANIFEST_FILE = CACHE_DIR / "export_manifests.json"
+TRASH_DIR = MCPELAUNCHER_DIR / "trash"
+APK_CACHE_DIR = MCPELAUNCHER_DIR / "apk-cache"
+OBJECTS_DIR = MCPELAUNCHER_DIR / "objects"
+SNAPSHOTS_DIR = MCPELAUNCHER_DIR / "snapshots"
 
 # Ruta a los ejecutables mcpelauncher
 MCPELAUNCHER_CLIENT = RESOURCES_DIR / "mcpelauncher-client"
@@ -757,6 +787,62 @@ class TermsManager:
         
         return True
 
+class LauncherSettings:
+    """Preferencias generales del launcher, guardadas en CONFIG_FILE junto a los términos."""
+    
+    DEFAULTS = {
+        "extract_backend": "auto",  # auto, external o python
+        "extract_threads": 0,       # 0 = según el número de CPUs
+        "apk_cache": True,          # reutilizar árboles ya extraídos del mismo APK
+        "dedupe_versions": True,    # enlazar las versiones nuevas al almacén de objetos
+        "slim_versions": False,     # retirar ABIs y recursos sin uso tras extraer
+        "export_format": "gzip",    # gzip, zstd, xz o none
+        "export_level": 6,          # se ajusta al rango de cada formato
+        "export_threads": 0,        # 0 = según el número de CPUs
+        "world_snapshots": True,    # instantánea de los mundos al cerrar el juego
+        "snapshot_keep_last": 10,   # retención: las últimas N...
+        "snapshot_keep_hourly": 24, # ...y la más reciente de cada hora, día y semana
+        "snapshot_keep_daily": 7,
+        "snapshot_keep_weekly": 4,
+        "sync_target": "",          # último directorio espejo de la sincronización
+    }
+    
+    def __init__(self):
+        self.config_file = CONFIG_FILE
+    
+    def load(self) -> dict:
+        try:
+            with open(self.config_file, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            return config if isinstance(config, dict) else {}
+        except (OSError, json.JSONDecodeError):
+            return {}
+    
+    def get(self, key: str):
+        return self.load().get(key, self.DEFAULTS.get(key))
+    
+    def set(self, key: str, value) -> bool:
+        """Guarda una preferencia sin tocar el resto del archivo."""
+        try:
+            config = self.load()
+            config[key] = value
+            self.config_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.config_file.with_name(self.config_file.name + ".tmp")
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(config, f, indent=4, ensure_ascii=False)
+            os.replace(tmp_file, self.config_file)
+            return True
+        except OSError as e:
+            print(f"Error guardando configuración: {e}")
+            return False
+    
+    def extract_backend(self) -> str:
+        """Backend efectivo: 'auto' usa el binario si está y, si no, el integrado."""
+        backend = self.get("extract_backend")
+        if backend not in ("external", "python"):
+            backend = "external" if MCPELAUNCHER_EXTRACT.exists() else "python"
+        return backend
+
 # ============================================================================
 # BARRA DE TÍTULO PERSONALIZADA
 # ============================================================================
@@ -803,72 +889,5126 @@ class TitleBar(QWidget):
         self.minimize_button.setFixedSize(30, 30)
         self.minimize_button.clicked.connect(self.minimize_window)
         
-        # Botón cerrar
-        self.close_button = QPushButton("✕")
-        self.close_button.setObjectName("TitleButton")
-        self.close_button.setProperty("id", "CloseButton")
-        self.close_button.setToolTip("Cerrar")
-        self.close_button.setFixedSize(30, 30)
-        self.close_button.clicked.connect(self.close_window)
+        # Botón cerrar
+        self.close_button = QPushButton("✕")
+        self.close_button.setObjectName("TitleButton")
+        self.close_button.setProperty("id", "CloseButton")
+        self.close_button.setToolTip("Cerrar")
+        self.close_button.setFixedSize(30, 30)
+        self.close_button.clicked.connect(self.close_window)
+        
+        button_layout.addWidget(self.minimize_button)
+        button_layout.addWidget(self.close_button)
+        
+        layout.addWidget(button_container)
+    
+    def minimize_window(self):
+        self.window().showMinimized()
+    
+    def close_window(self):
+        self.window().close()
+    
+    # Funciones para arrastre de ventana
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self.drag_position = event.globalPosition().toPoint() - self.window().frameGeometry().topLeft()
+            event.accept()
+    
+    def mouseMoveEvent(self, event):
+        if event.buttons() == Qt.LeftButton:
+            self.window().move(event.globalPosition().toPoint() - self.drag_position)
+            event.accept()
+
+# ============================================================================
+# CLASES DE CONFIGURACIÓN
+# ============================================================================
+
+class VersionConfig:
+    """Maneja la configuración de una versión específica."""
+    
+    def __init__(self, version_name: str):
+        self.version_name = version_name
+        self.launch_args = ""
+        self.load()
+    
+    def get_launch_args(self) -> str:
+        return self.launch_args
+    
+    def set_launch_args(self, args: str):
+        self.launch_args = args
+    
+    def config_path(self) -> Path:
+        return VERSIONS_DIR / self.version_name / "boxcraft-config.txt"
+    
+    def save(self) -> bool:
+        """Escribe en un temporal y lo renombra: nunca se modifica el inodo en su sitio."""
+        try:
+            path = self.config_path()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            tmp_file.write_text(self.launch_args)
+            os.replace(tmp_file, path)
+            return True
+        except Exception:
+            return False
+    
+    def load(self) -> bool:
+        try:
+            if self.config_path().exists():
+                self.launch_args = self.config_path().read_text().strip()
+            return True
+        except Exception:
+            return False
+
+# ============================================================================
+# ÍNDICES PERSISTENTES Y TRABAJO EN SEGUNDO PLANO
+# ============================================================================
+
+class BackgroundThread(QThread):
+    """Hilo de trabajo que sigue vivo aunque se destruya la página que lo creó."""
+    
+    # Las páginas se recrean en cada cambio de pestaña; mantener aquí la
+    # referencia evita destruir un QThread que todavía está corriendo.
+    _running = set()
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.cancelled = False
+        self.finished.connect(self._release)
+    
+    def start(self, *args):
+        BackgroundThread._running.add(self)
+        super().start(*args)
+    
+    def _release(self):
+        BackgroundThread._running.discard(self)
+    
+    @classmethod
+    def stop_all(cls, timeout_ms: int = 5000):
+        """Cancela y espera los hilos en curso (al cerrar la aplicación)."""
+        for thread in list(cls._running):
+            thread.cancel()
+        for thread in list(cls._running):
+            thread.wait(timeout_ms)
+    
+    def cancel(self):
+        self.cancelled = True
+
+class JsonIndex:
+    """Índice persistente en disco (JSON) con escritura atómica."""
+    
+    SCHEMA = 1
+    
+    def __init__(self, index_file: Path):
+        self.index_file = index_file
+        self.lock = threading.RLock()
+        self.entries = {}
+        self.dirty = False
+        self.transaction_depth = 0
+        self.load()
+    
+    def load(self) -> bool:
+        """Carga el índice desde disco; si está corrupto se empieza de cero."""
+        with self.lock:
+            try:
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('schema') == self.SCHEMA:
+                    self.entries = data.get('entries', {})
+                else:
+                    self.entries = {}
+                return True
+            except (FileNotFoundError, json.JSONDecodeError, AttributeError, OSError):
+                self.entries = {}
+                return False
+    
+    def save(self) -> bool:
+        """Guarda el índice si hubo cambios (archivo temporal + rename)."""
+        with self.lock:
+            if not self.dirty:
+                return True
+            try:
+                self.index_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = self.index_file.with_name(f".{self.index_file.name}.{os.getpid()}.tmp")
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump({'schema': self.SCHEMA, 'entries': self.entries}, f, ensure_ascii=False)
+                os.replace(tmp_file, self.index_file)
+                self.dirty = False
+                return True
+            except OSError as e:
+                print(f"Error guardando índice {self.index_file}: {e}")
+                return False
+    
+    @contextmanager
+    def transaction(self):
+        """Agrupa cambios: se guardan juntos o se descartan si algo falla."""
+        with self.lock:
+            snapshot = copy.deepcopy(self.entries), self.dirty
+            self.transaction_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self.entries, self.dirty = snapshot
+                raise
+            finally:
+                self.transaction_depth -= 1
+            if self.transaction_depth == 0:
+                self.save()
+    
+    def get(self, key: str):
+        with self.lock:
+            return self.entries.get(key)
+    
+    def set(self, key: str, value):
+        with self.lock:
+            self.entries[key] = value
+            self.dirty = True
+    
+    def remove(self, key: str):
+        with self.lock:
+            if self.entries.pop(key, None) is not None:
+                self.dirty = True
+    
+    def rename(self, old_key: str, new_key: str):
+        with self.lock:
+            if old_key in self.entries:
+                self.entries[new_key] = self.entries.pop(old_key)
+                self.dirty = True
+    
+    def prune(self, prefix: str, keep: set):
+        """Elimina las entradas bajo `prefix` que ya no están en `keep`."""
+        with self.lock:
+            for key in [k for k in self.entries if k.startswith(prefix) and k not in keep]:
+                del self.entries[key]
+                self.dirty = True
+
+class PackIndex(JsonIndex):
+    """Metadatos de packs (manifest.json) indexados por ruta y mtime."""
+    
+    _shared = None
+    
+    @classmethod
+    def shared(cls) -> "PackIndex":
+        """Instancia compartida: las páginas se recrean en cada cambio de pestaña."""
+        if cls._shared is None:
+            cls._shared = cls(PACK_INDEX_FILE)
+        return cls._shared
+    
+    @staticmethod
+    def find_manifest(pack_path: Path) -> Optional[Path]:
+        """Busca manifest.json en el pack o en su primer subdirectorio."""
+        manifest = pack_path / "manifest.json"
+        if manifest.is_file():
+            return manifest
+        try:
+            for entry in os.scandir(pack_path):
+                if entry.is_dir():
+                    manifest = Path(entry.path) / "manifest.json"
+                    if manifest.is_file():
+                        return manifest
+        except OSError:
+            pass
+        return None
+    
+    @classmethod
+    def stamp_for(cls, pack_path: Path) -> Optional[list]:
+        """Sello de validez: mtime y tamaño del manifest que usa find_manifest y mtime de la carpeta.
+        
+        El manifest puede estar en un subdirectorio; la carpeta cubre que aparezca
+        o desaparezca uno en la raíz.
+        """
+        try:
+            folder = pack_path.stat()
+        except OSError:
+            return None
+        manifest = cls.find_manifest(pack_path)
+        try:
+            st = manifest.stat() if manifest is not None else folder
+        except OSError:
+            st = folder
+        return [st.st_mtime_ns, st.st_size, folder.st_mtime_ns]
+    
+    @staticmethod
+    def load_json_lenient(text: str):
+        """Carga JSON tolerando comentarios y comas finales (habituales en manifests)."""
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            text = re.sub(r'("(?:\\.|[^"\\])*")|//[^\n]*|/\*.*?\*/',
+                          lambda m: m.group(1) or '', text, flags=re.S)
+            text = re.sub(r',(\s*[}\]])', r'\1', text)
+            return json.loads(text)
+    
+    @staticmethod
+    def resolve_lang_key(pack_root: Path, key: str) -> str:
+        """Traduce claves tipo 'pack.name' usando texts/*.lang."""
+        for lang in ("es_ES", "es_MX", "en_US"):
+            lang_file = pack_root / "texts" / f"{lang}.lang"
+            try:
+                with open(lang_file, 'r', encoding='utf-8-sig', errors='replace') as f:
+                    for line in f:
+                        if line.startswith(key + "="):
+                            return line.split("=", 1)[1].split("\t#", 1)[0].strip()
+            except OSError:
+                continue
+        return key
+    
+    @classmethod
+    def read_pack_info(cls, pack_path: Path) -> dict:
+        """Lee los metadatos de un pack. Se ejecuta en hilos de trabajo."""
+        info = {
+            'name': pack_path.name,
+            'description': "",
+            'version': "",
+            'uuid': "",
+            'type': "",
+            'min_engine_version': "",
+            'valid': False,
+        }
+        manifest = cls.find_manifest(pack_path)
+        if manifest is None:
+            return info
+        
+        try:
+            data = cls.load_json_lenient(manifest.read_text(encoding='utf-8-sig', errors='replace'))
+            header = data.get('header', {}) if isinstance(data, dict) else {}
+        except (ValueError, OSError):
+            return info
+        
+        def version_str(value):
+            if isinstance(value, list):
+                return ".".join(str(v) for v in value)
+            return str(value) if value else ""
+        
+        name = str(header.get('name') or pack_path.name)
+        description = str(header.get('description') or "")
+        if name.startswith("pack."):
+            name = cls.resolve_lang_key(manifest.parent, name)
+        if description.startswith("pack."):
+            description = cls.resolve_lang_key(manifest.parent, description)
+        
+        modules = data.get('modules') or []
+        types = [m.get('type', "") for m in modules if isinstance(m, dict)]
+        
+        info.update({
+            'name': name,
+            'description': description,
+            'version': version_str(header.get('version')),
+            'uuid': str(header.get('uuid') or ""),
+            'type': ", ".join(t for t in types if t),
+            'min_engine_version': version_str(header.get('min_engine_version')),
+            'valid': True,
+        })
+        return info
+    
+    def lookup(self, pack_path: Path, stamp) -> Optional[dict]:
+        """Retorna los metadatos en caché si el sello coincide."""
+        entry = self.get(str(pack_path))
+        if entry and stamp is not None and entry.get('stamp') == stamp:
+            return entry.get('info')
+        return None
+    
+    def store(self, pack_path: Path, stamp, info: dict):
+        self.set(str(pack_path), {'stamp': stamp, 'info': info})
+
+class PackIndexThread(BackgroundThread):
+    """Hilo que analiza manifests en un pool y emite resultados a medida que llegan."""
+    
+    pack_indexed = Signal(str, dict)  # ruta, metadatos
+    index_finished = Signal(int)      # packs analizados
+    
+    def __init__(self, pack_paths: list, max_workers: int = 0, parent=None):
+        super().__init__(parent)
+        self.pack_paths = [Path(p) for p in pack_paths]
+        self.max_workers = max_workers or min(8, (os.cpu_count() or 2) + 2)
+    
+    def run(self):
+        index = PackIndex.shared()
+        
+        def work(path):
+            stamp = PackIndex.stamp_for(path)
+            return path, stamp, PackIndex.read_pack_info(path)
+        
+        done = 0
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [pool.submit(work, p) for p in self.pack_paths]
+            for future in concurrent.futures.as_completed(futures):
+                if self.cancelled:
+                    for f in futures:
+                        f.cancel()
+                    break
+                try:
+                    path, stamp, info = future.result()
+                except Exception as e:
+                    print(f"Error indexando pack: {e}")
+                    continue
+                index.store(path, stamp, info)
+                done += 1
+                self.pack_indexed.emit(str(path), info)
+        
+        index.save()
+        self.index_finished.emit(done)
+
+def format_size(size: int) -> str:
+    """Formatea un tamaño en bytes de forma legible."""
+    value = float(size)
+    for unit in ("B", "KB", "MB", "GB"):
+        if value < 1024 or unit == "GB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} TB"
+
+def format_duration(seconds: float) -> str:
+    """Formatea una duración como m:ss o h:mm:ss."""
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
+
+def parallel_tree_size(root: Path, max_workers: int = 0) -> int:
+    """Suma el tamaño de un árbol recorriendo subdirectorios con os.scandir en paralelo."""
+    def scan(path):
+        total = 0
+        subdirs = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        else:
+                            total += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return total, subdirs
+    
+    total = 0
+    workers = max_workers or min(8, (os.cpu_count() or 2) * 2)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {pool.submit(scan, str(root))}
+        while pending:
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                size, subdirs = future.result()
+                total += size
+                pending.update(pool.submit(scan, d) for d in subdirs)
+    return total
+
+class DiskUsage(JsonIndex):
+    """Uso de disco por directorio, cacheado por mtime.
+    
+    Cada carpeta guarda su mtime, los bytes de sus archivos directos y los
+    nombres de sus subcarpetas. Si el mtime no cambió no se vuelve a listar,
+    así que medir otra vez un árbol intacto cuesta un stat por carpeta y solo
+    se recorren los subárboles que cambiaron. Reescribir un archivo que ya
+    existía no cambia el mtime de su carpeta: force=True lo recuenta todo.
+    """
+    
+    _shared = None
+    
+    @classmethod
+    def shared(cls) -> "DiskUsage":
+        if cls._shared is None:
+            cls._shared = cls(DISK_USAGE_FILE)
+        return cls._shared
+    
+    def scan_dir(self, path: str, force: bool = False) -> Tuple[int, list]:
+        """Bytes directos y subcarpetas de un directorio; solo se lista si cambió."""
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            self.forget(path)
+            return 0, []
+        cached = self.get(path)
+        if not force and cached and cached[0] == mtime:
+            return cached[1], [os.path.join(path, name) for name in cached[2]]
+        
+        total = 0
+        subdirs = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                        else:
+                            total += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+        except OSError:
+            return 0, []
+        # Las subcarpetas que ya no existen salen del índice
+        if cached:
+            for name in set(cached[2]) - set(subdirs):
+                self.forget(os.path.join(path, name))
+        self.set(path, [mtime, total, subdirs])
+        return total, [os.path.join(path, name) for name in subdirs]
+    
+    def measure(self, root, force: bool = False, max_workers: int = 0) -> int:
+        """Tamaño total de un árbol (o de un archivo suelto), revisando carpetas en paralelo."""
+        root = str(root)
+        if not os.path.isdir(root):
+            try:
+                return os.stat(root).st_size
+            except OSError:
+                return 0
+        
+        total = 0
+        workers = max_workers or min(8, (os.cpu_count() or 2) * 2)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = {pool.submit(self.scan_dir, root, force)}
+            while pending:
+                done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    size, subdirs = future.result()
+                    total += size
+                    pending.update(pool.submit(self.scan_dir, d, force) for d in subdirs)
+        return total
+    
+    def cached(self, root) -> Optional[int]:
+        """Último total conocido sin tocar el disco (None si falta alguna carpeta)."""
+        root = str(root)
+        total = 0
+        stack = [root]
+        with self.lock:
+            while stack:
+                path = stack.pop()
+                entry = self.entries.get(path)
+                if entry is None:
+                    return None
+                total += entry[1]
+                stack.extend(os.path.join(path, name) for name in entry[2])
+        return total
+    
+    def forget(self, root):
+        """Descarta un árbol del índice (tras borrarlo o moverlo a la papelera)."""
+        root = str(root)
+        with self.lock:
+            self.remove(root)
+            self.prune(root + os.sep, set())
+
+class DiskUsageThread(BackgroundThread):
+    """Mide árboles con DiskUsage y emite cada total en cuanto lo tiene."""
+    
+    usage_measured = Signal(str, object)  # ruta, bytes (puede superar 32 bits)
+    usage_finished = Signal(int)          # árboles medidos
+    
+    def __init__(self, paths: list, force: bool = False, parent=None):
+        super().__init__(parent)
+        self.paths = [Path(p) for p in paths]
+        self.force = force
+    
+    def run(self):
+        usage = DiskUsage.shared()
+        done = 0
+        for path in self.paths:
+            if self.cancelled:
+                break
+            size = usage.measure(path, self.force)
+            done += 1
+            self.usage_measured.emit(str(path), size)
+        usage.save()
+        self.usage_finished.emit(done)
+
+class BedrockLevelDat:
+    """Lector de level.dat de Bedrock (cabecera de 8 bytes + NBT little-endian)."""
+    
+    TAG_END, TAG_BYTE, TAG_SHORT, TAG_INT, TAG_LONG, TAG_FLOAT, TAG_DOUBLE = range(7)
+    TAG_BYTE_ARRAY, TAG_STRING, TAG_LIST, TAG_COMPOUND, TAG_INT_ARRAY, TAG_LONG_ARRAY = range(7, 13)
+    
+    GAME_MODES = {0: "Supervivencia", 1: "Creativo", 2: "Aventura", 3: "Espectador", 6: "Espectador"}
+    
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+    
+    @classmethod
+    def parse_file(cls, level_dat: Path) -> dict:
+        """Parsea un level.dat y retorna el compound raíz como dict."""
+        data = level_dat.read_bytes()
+        if len(data) < 9:
+            raise ValueError("level.dat demasiado corto")
+        # Cabecera: versión de almacenamiento y longitud del NBT (int32 LE)
+        length = int.from_bytes(data[4:8], 'little')
+        reader = cls(data[8:8 + length] if 0 < length <= len(data) - 8 else data[8:])
+        tag_type = reader.read_fmt('<b')
+        if tag_type != cls.TAG_COMPOUND:
+            raise ValueError("level.dat sin compound raíz")
+        reader.read_string()  # nombre de la raíz (vacío)
+        return reader.read_payload(cls.TAG_COMPOUND)
+    
+    def read_fmt(self, fmt: str):
+        size = struct.calcsize(fmt)
+        if self.pos + size > len(self.data):
+            raise ValueError("NBT truncado")
+        value = struct.unpack_from(fmt, self.data, self.pos)[0]
+        self.pos += size
+        return value
+    
+    def read_string(self) -> str:
+        length = self.read_fmt('<H')
+        raw = self.data[self.pos:self.pos + length]
+        self.pos += length
+        return raw.decode('utf-8', errors='replace')
+    
+    def read_payload(self, tag_type: int, depth: int = 0):
+        if depth > 64:
+            raise ValueError("NBT demasiado anidado")
+        if tag_type == self.TAG_BYTE:
+            return self.read_fmt('<b')
+        if tag_type == self.TAG_SHORT:
+            return self.read_fmt('<h')
+        if tag_type == self.TAG_INT:
+            return self.read_fmt('<i')
+        if tag_type == self.TAG_LONG:
+            return self.read_fmt('<q')
+        if tag_type == self.TAG_FLOAT:
+            return self.read_fmt('<f')
+        if tag_type == self.TAG_DOUBLE:
+            return self.read_fmt('<d')
+        if tag_type == self.TAG_STRING:
+            return self.read_string()
+        if tag_type == self.TAG_BYTE_ARRAY:
+            length = self.read_fmt('<i')
+            self.pos += max(0, length)
+            return None  # no se necesitan los datos
+        if tag_type in (self.TAG_INT_ARRAY, self.TAG_LONG_ARRAY):
+            length = self.read_fmt('<i')
+            self.pos += max(0, length) * (4 if tag_type == self.TAG_INT_ARRAY else 8)
+            return None
+        if tag_type == self.TAG_LIST:
+            item_type = self.read_fmt('<b')
+            length = self.read_fmt('<i')
+            return [self.read_payload(item_type, depth + 1) for _ in range(max(0, length))]
+        if tag_type == self.TAG_COMPOUND:
+            result = {}
+            while True:
+                child_type = self.read_fmt('<b')
+                if child_type == self.TAG_END:
+                    return result
+                name = self.read_string()
+                result[name] = self.read_payload(child_type, depth + 1)
+        raise ValueError(f"Tipo NBT desconocido: {tag_type}")
+    
+    @classmethod
+    def read_world_info(cls, world_path: Path) -> dict:
+        """Extrae nombre, última partida, modo de juego y versión de un mundo."""
+        info = {
+            'name': world_path.name,
+            'last_played': 0,
+            'game_mode': "",
+            'version': "",
+            'valid': False,
+        }
+        levelname_txt = world_path / "levelname.txt"
+        try:
+            info['name'] = levelname_txt.read_text(encoding='utf-8', errors='replace').strip() or info['name']
+        except OSError:
+            pass
+        
+        try:
+            root = cls.parse_file(world_path / "level.dat")
+        except (OSError, ValueError) as e:
+            print(f"Error leyendo level.dat de {world_path.name}: {e}")
+            return info
+        
+        if isinstance(root.get('LevelName'), str) and root['LevelName'].strip():
+            info['name'] = root['LevelName'].strip()
+        if isinstance(root.get('LastPlayed'), int):
+            info['last_played'] = root['LastPlayed']
+        if isinstance(root.get('GameType'), int):
+            info['game_mode'] = cls.GAME_MODES.get(root['GameType'], str(root['GameType']))
+        version = root.get('lastOpenedWithVersion')
+        if isinstance(version, list) and version:
+            # [mayor, menor, parche, revisión, beta]: se muestran los tres primeros
+            info['version'] = ".".join(str(v) for v in version[:3] if isinstance(v, int) and v >= 0)
+        elif isinstance(root.get('InventoryVersion'), str):
+            info['version'] = root['InventoryVersion']
+        info['valid'] = True
+        return info
+
+class WorldIndex(JsonIndex):
+    """Caché de metadatos y tamaños de mundos, invalidada por mtime."""
+    
+    _shared = None
+    
+    @classmethod
+    def shared(cls) -> "WorldIndex":
+        if cls._shared is None:
+            cls._shared = cls(WORLD_INDEX_FILE)
+        return cls._shared
+    
+    @staticmethod
+    def info_stamp(world_path: Path) -> Optional[list]:
+        """Sello de metadatos: mtime y tamaño de level.dat."""
+        try:
+            st = (world_path / "level.dat").stat()
+            return [st.st_mtime_ns, st.st_size]
+        except OSError:
+            return None
+    
+    @staticmethod
+    def size_stamp(world_path: Path) -> Optional[list]:
+        """Sello de tamaño: mtimes de la carpeta del mundo y de su base de datos."""
+        stamp = []
+        for path in (world_path, world_path / "db", world_path / "level.dat"):
+            try:
+                stamp.append(path.stat().st_mtime_ns)
+            except OSError:
+                stamp.append(0)
+        return stamp if stamp[0] else None
+    
+    def cached_info(self, world_path: Path, stamp) -> Optional[dict]:
+        entry = self.get(str(world_path)) or {}
+        if stamp is not None and entry.get('info_stamp') == stamp:
+            return entry.get('info')
+        return None
+    
+    def cached_size(self, world_path: Path, stamp) -> Optional[int]:
+        entry = self.get(str(world_path)) or {}
+        if stamp is not None and entry.get('size_stamp') == stamp:
+            return entry.get('size')
+        return None
+    
+    def store_info(self, world_path: Path, stamp, info: dict):
+        with self.lock:
+            entry = dict(self.get(str(world_path)) or {})
+            entry.update({'info_stamp': stamp, 'info': info})
+            self.set(str(world_path), entry)
+    
+    def store_size(self, world_path: Path, stamp, size: int):
+        with self.lock:
+            entry = dict(self.get(str(world_path)) or {})
+            entry.update({'size_stamp': stamp, 'size': size})
+            self.set(str(world_path), entry)
+
+class WorldInfoThread(BackgroundThread):
+    """Lee level.dat y calcula tamaños de mundos en segundo plano."""
+    
+    world_info = Signal(str, dict)    # ruta, metadatos
+    world_size = Signal(str, object)  # ruta, bytes (puede superar 32 bits)
+    
+    def __init__(self, info_paths: list, size_paths: list, parent=None):
+        super().__init__(parent)
+        self.info_paths = [Path(p) for p in info_paths]
+        self.size_paths = [Path(p) for p in size_paths]
+    
+    def run(self):
+        index = WorldIndex.shared()
+        workers = min(8, (os.cpu_count() or 2) + 2)
+        
+        # Primero los metadatos (rápidos), después los tamaños (perezosos)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(BedrockLevelDat.read_world_info, p): p for p in self.info_paths}
+            for future in concurrent.futures.as_completed(futures):
+                if self.cancelled:
+                    break
+                path = futures[future]
+                try:
+                    info = future.result()
+                except Exception as e:
+                    print(f"Error leyendo mundo {path}: {e}")
+                    continue
+                index.store_info(path, WorldIndex.info_stamp(path), info)
+                self.world_info.emit(str(path), info)
+        
+        for path in self.size_paths:
+            if self.cancelled:
+                break
+            stamp = WorldIndex.size_stamp(path)
+            size = parallel_tree_size(path)
+            index.store_size(path, stamp, size)
+            self.world_size.emit(str(path), size)
+        
+        index.save()
+
+class ApkManifest:
+    """Lector del AndroidManifest.xml binario (AXML) de un APK.
+    
+    Solo lee esa entrada del zip: no hace falta extraer el APK para saber
+    qué versión de Minecraft contiene.
+    """
+    
+    RES_XML_TYPE = 0x0003
+    RES_STRING_POOL_TYPE = 0x0001
+    RES_XML_RESOURCE_MAP_TYPE = 0x0180
+    RES_XML_START_ELEMENT_TYPE = 0x0102
+    UTF8_FLAG = 0x100
+    
+    TYPE_STRING = 0x03
+    TYPE_INT_DEC = 0x10
+    TYPE_INT_HEX = 0x11
+    TYPE_INT_BOOLEAN = 0x12
+    
+    # Identificadores de atributos android:* (los nombres pueden venir ofuscados)
+    ATTR_IDS = {
+        0x0101021b: "versionCode",
+        0x0101021c: "versionName",
+        0x0101020c: "minSdkVersion",
+        0x01010270: "targetSdkVersion",
+    }
+    
+    @classmethod
+    def read_string_pool(cls, data: bytes, offset: int) -> list:
+        header_size, = struct.unpack_from("<H", data, offset + 2)
+        count, _, flags, strings_start = struct.unpack_from("<IIII", data, offset + 8)
+        utf8 = bool(flags & cls.UTF8_FLAG)
+        offsets = struct.unpack_from(f"<{count}I", data, offset + header_size)
+        base = offset + strings_start
+        strings = []
+        for string_offset in offsets:
+            pos = base + string_offset
+            if utf8:
+                # Longitud en caracteres y luego en bytes (1 o 2 bytes cada una)
+                pos += 2 if data[pos] & 0x80 else 1
+                length = data[pos]
+                if length & 0x80:
+                    length = ((length & 0x7F) << 8) | data[pos + 1]
+                    pos += 1
+                pos += 1
+                strings.append(data[pos:pos + length].decode("utf-8", errors="replace"))
+            else:
+                length, = struct.unpack_from("<H", data, pos)
+                if length & 0x8000:
+                    low, = struct.unpack_from("<H", data, pos + 2)
+                    length = ((length & 0x7FFF) << 16) | low
+                    pos += 2
+                pos += 2
+                strings.append(data[pos:pos + length * 2].decode("utf-16-le", errors="replace"))
+        return strings
+    
+    @classmethod
+    def parse(cls, data: bytes) -> dict:
+        """Atributos de los elementos <manifest> y <uses-sdk>: {elemento: {atributo: valor}}."""
+        doc_type, _, doc_size = struct.unpack_from("<HHI", data, 0)
+        if doc_type != cls.RES_XML_TYPE:
+            raise ValueError("AndroidManifest.xml no es AXML")
+        
+        strings, resource_ids, elements = [], [], {}
+        offset = 8
+        end = min(doc_size, len(data))
+        while offset + 8 <= end:
+            chunk_type, header_size, chunk_size = struct.unpack_from("<HHI", data, offset)
+            if chunk_size < 8:
+                raise ValueError("Chunk AXML inválido")
+            
+            if chunk_type == cls.RES_STRING_POOL_TYPE:
+                strings = cls.read_string_pool(data, offset)
+            elif chunk_type == cls.RES_XML_RESOURCE_MAP_TYPE:
+                count = (chunk_size - header_size) // 4
+                resource_ids = struct.unpack_from(f"<{count}I", data, offset + header_size)
+            elif chunk_type == cls.RES_XML_START_ELEMENT_TYPE:
+                ext = offset + header_size
+                _, name, attr_start, attr_size, attr_count = struct.unpack_from("<IIHHH", data, ext)
+                tag = strings[name] if name < len(strings) else ""
+                if tag in ("manifest", "uses-sdk") and tag not in elements:
+                    attrs = {}
+                    for i in range(attr_count):
+                        pos = ext + attr_start + i * attr_size
+                        _, attr_name, raw, _, _, value_type, value = struct.unpack_from("<IIIHBBI", data, pos)
+                        key = cls.ATTR_IDS.get(resource_ids[attr_name]) if attr_name < len(resource_ids) else None
+                        if key is None and attr_name < len(strings):
+                            key = strings[attr_name]
+                        if value_type == cls.TYPE_STRING:
+                            attrs[key] = strings[raw] if raw < len(strings) else ""
+                        elif value_type in (cls.TYPE_INT_DEC, cls.TYPE_INT_HEX, cls.TYPE_INT_BOOLEAN):
+                            attrs[key] = value
+                        elif raw != 0xFFFFFFFF and raw < len(strings):
+                            attrs[key] = strings[raw]
+                    elements[tag] = attrs
+                    if len(elements) == 2:
+                        break
+            offset += chunk_size
+        return elements
+    
+    @classmethod
+    def read_apk_info(cls, apk_path) -> dict:
+        """Versión del juego, SDK mínimo y ABIs de un APK."""
+        info = {'package': None, 'game_version': None, 'version_code': None,
+                'min_sdk': None, 'target_sdk': None, 'abis': [], 'valid': False}
+        try:
+            with ApkBundle.open_zip(apk_path) as apk:
+                names = apk.namelist()
+                info['abis'] = sorted({name.split("/")[1] for name in names
+                                       if name.startswith("lib/") and name.count("/") >= 2})
+                elements = cls.parse(apk.read("AndroidManifest.xml"))
+        except (OSError, KeyError, ValueError, IndexError, struct.error, zipfile.BadZipFile) as e:
+            print(f"No se pudo leer el manifiesto de {apk_path}: {e}")
+            return info
+        
+        manifest = elements.get("manifest", {})
+        uses_sdk = elements.get("uses-sdk", {})
+        info['package'] = manifest.get("package")
+        info['game_version'] = manifest.get("versionName")
+        info['version_code'] = manifest.get("versionCode")
+        info['min_sdk'] = uses_sdk.get("minSdkVersion")
+        info['target_sdk'] = uses_sdk.get("targetSdkVersion")
+        info['valid'] = info['game_version'] is not None or info['version_code'] is not None
+        return info
+    
+    @staticmethod
+    def version_key(game_version) -> tuple:
+        """Clave para ordenar versiones tipo 1.21.50.07 de forma numérica."""
+        return tuple(int(part) if part.isdigit() else 0
+                     for part in re.split(r"[.\-]", str(game_version or "")) if part)
+
+class VersionIndex(JsonIndex):
+    """Índice de versiones instaladas, revalidado con los mtimes de los directorios.
+    
+    Si el mtime de VERSIONS_DIR no cambió, listar versiones no toca el disco.
+    Cuando cambia, solo se revisan las carpetas cuyo mtime es distinto.
+    """
+    
+    LIB_PATH = ("lib", "x86_64", "libminecraftpe.so")
+    FIELDS = ('name', 'valid', 'size', 'game_version', 'version_code', 'min_sdk', 'abis',
+              'apk_digest', 'extractor', 'installed_at', 'last_played', 'dir_mtime', 'slim')
+    _shared = None
+    
+    def __init__(self, index_file: Path, versions_dir: Path):
+        super().__init__(index_file)
+        self.versions_dir = versions_dir
+    
+    @classmethod
+    def shared(cls) -> "VersionIndex":
+        if cls._shared is None:
+            cls._shared = cls(VERSION_INDEX_FILE, VERSIONS_DIR)
+        return cls._shared
+    
+    @staticmethod
+    def mtime_of(path: Path) -> Optional[int]:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+    
+    def check_version(self, name: str, entry: Optional[dict] = None) -> dict:
+        """Entrada actualizada para una carpeta, conservando los metadatos conocidos."""
+        version_path = self.versions_dir / name
+        entry = dict(entry or {})
+        entry['name'] = name
+        entry['valid'] = version_path.joinpath(*self.LIB_PATH).is_file()
+        entry['dir_mtime'] = self.mtime_of(version_path)
+        entry.setdefault('installed_at', (entry['dir_mtime'] or 0) / 1e9 or time.time())
+        for field in self.FIELDS:
+            entry.setdefault(field, None)
+        return entry
+    
+    def refresh(self, force: bool = False):
+        """Revalida el índice si VERSIONS_DIR cambió desde la última vez."""
+        root_mtime = self.mtime_of(self.versions_dir)
+        with self.lock:
+            if not force and root_mtime is not None and self.get("dir:versions") == root_mtime:
+                return
+            
+            seen = set()
+            if root_mtime is not None:
+                with os.scandir(self.versions_dir) as entries:
+                    for item in entries:
+                        # Los árboles temporales del benchmark empiezan por "."
+                        if item.name.startswith(".") or not item.is_dir(follow_symlinks=False):
+                            continue
+                        key = f"version:{item.name}"
+                        seen.add(key)
+                        # Una versión restaurada de la papelera recupera sus metadatos
+                        entry = self.get(key)
+                        if not entry:
+                            entry = self.get(f"trashed:{item.name}")
+                            self.remove(f"trashed:{item.name}")
+                        elif not force and entry.get('dir_mtime') == item.stat().st_mtime_ns:
+                            continue
+                        self.set(key, self.check_version(item.name, entry))
+            
+            self.prune("version:", seen)
+            if self.get("dir:versions") != root_mtime:
+                self.set("dir:versions", root_mtime)
+            self.save()
+    
+    def versions(self, valid_only: bool = True, order: str = "name") -> list:
+        """Entradas del índice ordenadas por nombre o por versión real del juego.
+        
+        Con order="game_version" van primero las más nuevas y al final, por
+        nombre, las que no tienen metadatos del APK.
+        """
+        self.refresh()
+        with self.lock:
+            entries = [entry for key, entry in self.entries.items()
+                       if key.startswith("version:") and (entry.get('valid') or not valid_only)]
+        entries.sort(key=lambda entry: entry['name'])
+        if order == "game_version":
+            known = [entry for entry in entries if entry.get('game_version') is not None]
+            unknown = [entry for entry in entries if entry.get('game_version') is None]
+            known.sort(key=lambda entry: (entry.get('version_code') or 0,
+                                          ApkManifest.version_key(entry['game_version'])),
+                       reverse=True)
+            entries = known + unknown
+        return entries
+    
+    def entry(self, name: str) -> Optional[dict]:
+        self.refresh()
+        return self.get(f"version:{name}")
+    
+    def record(self, name: str, **fields):
+        """Registra o actualiza una versión (tras extraer o importar)."""
+        with self.transaction():
+            key = f"version:{name}"
+            entry = self.check_version(name, self.get(key))
+            entry.update(fields)
+            self.set(key, entry)
+            self.set("dir:versions", self.mtime_of(self.versions_dir))
+    
+    def forget(self, name: str):
+        """Quita una versión del índice (tras eliminarla).
+        
+        Se guarda la última entrada eliminada por si se deshace el borrado.
+        """
+        with self.transaction():
+            entry = self.get(f"version:{name}")
+            self.prune("trashed:", set())
+            if entry:
+                self.set(f"trashed:{name}", entry)
+            self.remove(f"version:{name}")
+            self.set("dir:versions", self.mtime_of(self.versions_dir))
+    
+    def update(self, name: str, **fields):
+        """Cambia campos de una versión ya registrada sin revalidarla."""
+        with self.transaction():
+            entry = self.get(f"version:{name}")
+            if entry:
+                self.set(f"version:{name}", dict(entry, **fields))
+
+class ContentWatcher(QObject):
+    """Vigila carpetas de contenido (inotify vía QFileSystemWatcher) y emite diferencias.
+    
+    Las ráfagas de eventos (una instalación crea cientos de archivos) se agrupan
+    con un temporizador y cada carpeta se compara contra una instantánea
+    nombre -> inodo, de modo que un renombrado se detecta como tal.
+    """
+    
+    entries_added = Signal(str, list)    # clave, rutas nuevas
+    entries_removed = Signal(str, list)  # clave, rutas eliminadas
+    entries_renamed = Signal(str, list)  # clave, [(ruta anterior, ruta nueva)]
+    entries_changed = Signal(str, list)  # clave, rutas con contenido modificado
+    
+    def __init__(self, directories: dict, watch_children=(), delay_ms: int = 400, parent=None):
+        super().__init__(parent)
+        self.directories = {key: Path(path) for key, path in directories.items()}
+        self.watch_children = set(watch_children)
+        self.snapshots = {}
+        self.dirty = set()
+        self.changed_children = {}
+        
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.on_directory_changed)
+        
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay_ms)
+        self.timer.timeout.connect(self.flush)
+        
+        for key, path in self.directories.items():
+            self.snapshots[key] = self.scan(path)
+            self.watcher.addPath(str(path))
+            if key in self.watch_children:
+                self.add_child_paths(self.snapshots[key].keys(), path)
+    
+    def is_watching(self, key: str) -> bool:
+        """Indica si la carpeta está vigilada (si no, hay que recargar a mano)."""
+        path = self.directories.get(key)
+        return path is not None and str(path) in self.watcher.directories()
+    
+    @staticmethod
+    def scan(path: Path) -> dict:
+        """Instantánea nombre -> inodo de una carpeta."""
+        snapshot = {}
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        snapshot[entry.name] = entry.inode()
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return snapshot
+    
+    def add_child_paths(self, names, parent_path: Path):
+        paths = [str(parent_path / name) for name in names if (parent_path / name).is_dir()]
+        if paths:
+            self.watcher.addPaths(paths)
+    
+    def on_directory_changed(self, path: str):
+        changed = Path(path)
+        for key, directory in self.directories.items():
+            if changed == directory:
+                self.dirty.add(key)
+            elif changed.parent == directory and key in self.watch_children:
+                self.changed_children.setdefault(key, set()).add(path)
+        self.timer.start()  # reinicia la espera: agrupa la ráfaga
+    
+    def flush(self):
+        """Aplica los cambios acumulados desde el último evento."""
+        for key in list(self.dirty):
+            directory = self.directories[key]
+            old = self.snapshots.get(key, {})
+            new = self.scan(directory)
+            self.snapshots[key] = new
+            
+            removed = {name: inode for name, inode in old.items() if new.get(name) != inode}
+            added = {name: inode for name, inode in new.items() if old.get(name) != inode}
+            
+            # Mismo inodo con otro nombre: renombrado
+            by_inode = {inode: name for name, inode in removed.items()}
+            renamed = []
+            for name, inode in list(added.items()):
+                old_name = by_inode.get(inode)
+                if old_name is not None and old_name not in new:
+                    renamed.append((str(directory / old_name), str(directory / name)))
+                    del added[name]
+                    del removed[old_name]
+            
+            if key in self.watch_children:
+                watched = set(self.watcher.directories())
+                stale = [str(directory / name) for name in removed] + [old_path for old_path, _ in renamed]
+                stale = [path for path in stale if path in watched]
+                if stale:
+                    self.watcher.removePaths(stale)
+                self.add_child_paths(list(added) + [Path(new_path).name for _, new_path in renamed], directory)
+            
+            if removed:
+                self.entries_removed.emit(key, [str(directory / name) for name in sorted(removed)])
+            if renamed:
+                self.entries_renamed.emit(key, renamed)
+            if added:
+                self.entries_added.emit(key, [str(directory / name) for name in sorted(added)])
+        self.dirty.clear()
+        
+        for key, paths in self.changed_children.items():
+            existing = sorted(p for p in paths if Path(p).is_dir())
+            if existing:
+                self.entries_changed.emit(key, existing)
+        self.changed_children.clear()
+
+# ============================================================================
+# MOTOR DE COPIA RÁPIDA
+# ============================================================================
+
+class FastCopier:
+    """Copia archivos y árboles usando reflinks, copy_file_range o enlaces duros.
+    
+    Orden de preferencia por archivo: enlace duro (solo si se pide, para
+    contenido de solo lectura), reflink FICLONE (btrfs/XFS, instantáneo),
+    os.copy_file_range (copia dentro del kernel) y, como último recurso,
+    shutil.copyfile.
+    """
+    
+    FICLONE = 0x40049409  # _IOW(0x94, 9, int)
+    
+    def __init__(self, hardlink: bool = False, max_workers: int = 0,
+                 progress_callback=None, cancel_check=None):
+        self.hardlink = hardlink
+        self.max_workers = max_workers or min(16, (os.cpu_count() or 2) * 2)
+        self.progress_callback = progress_callback
+        self.cancel_check = cancel_check
+        self.lock = threading.Lock()
+        self.bytes_done = 0
+        self.bytes_total = 0
+        self.stats = {'hardlink': 0, 'reflink': 0, 'copy_file_range': 0, 'copy': 0}
+        # Pares de dispositivos (origen, destino) donde un método ya falló
+        self.no_reflink = set()
+        self.no_copy_range = set()
+        self.no_hardlink = set()
+    
+    def _count(self, method: str, size: int):
+        with self.lock:
+            self.stats[method] += 1
+            self.bytes_done += size
+            done, total = self.bytes_done, self.bytes_total
+        if self.progress_callback:
+            self.progress_callback(done, total)
+    
+    # Errores que indican que el sistema de archivos no admite el método
+    UNSUPPORTED_ERRNOS = (errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL, errno.ENOSYS)
+    
+    def _try_reflink(self, src_fd: int, dst_fd: int, devices: tuple) -> bool:
+        try:
+            fcntl.ioctl(dst_fd, self.FICLONE, src_fd)
+            return True
+        except OSError as e:
+            if e.errno in self.UNSUPPORTED_ERRNOS:
+                self.no_reflink.add(devices)
+            return False
+    
+    def _copy_range(self, src_fd: int, dst_fd: int, size: int, devices: tuple) -> bool:
+        if not hasattr(os, "copy_file_range"):
+            self.no_copy_range.add(devices)
+            return False
+        offset = 0
+        try:
+            while offset < size:
+                copied = os.copy_file_range(src_fd, dst_fd, min(size - offset, 1 << 30))
+                if copied == 0:
+                    break
+                offset += copied
+            return offset >= size
+        except OSError as e:
+            if offset == 0:
+                if e.errno in self.UNSUPPORTED_ERRNOS:
+                    self.no_copy_range.add(devices)
+                return False
+            raise
+    
+    def copy_file(self, src, dst, size: int = -1) -> str:
+        """Copia un archivo conservando permisos y fechas. Retorna el método usado."""
+        src, dst = str(src), str(dst)
+        st = os.stat(src)
+        size = st.st_size if size < 0 else size
+        dst_dev = os.stat(os.path.dirname(dst) or ".").st_dev
+        devices = (st.st_dev, dst_dev)
+        
+        if self.hardlink and st.st_dev == dst_dev and devices not in self.no_hardlink:
+            try:
+                if os.path.lexists(dst):
+                    os.unlink(dst)
+                os.link(src, dst)
+                self._count('hardlink', size)
+                return 'hardlink'
+            except OSError:
+                self.no_hardlink.add(devices)
+        
+        method = 'copy'
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            src_fd, dst_fd = fsrc.fileno(), fdst.fileno()
+            if size == 0:
+                method = 'copy'
+            elif devices not in self.no_reflink and self._try_reflink(src_fd, dst_fd, devices):
+                method = 'reflink'
+            elif devices not in self.no_copy_range and self._copy_range(src_fd, dst_fd, size, devices):
+                method = 'copy_file_range'
+            else:
+                fsrc.seek(0)
+                fdst.seek(0)
+                fdst.truncate()
+                shutil.copyfileobj(fsrc, fdst, 1024 * 1024)
+        shutil.copystat(src, dst)
+        self._count(method, size)
+        return method
+    
+    def collect_tree(self, src: Path, dst: Path):
+        """Lista directorios, archivos y enlaces simbólicos de un árbol."""
+        dirs, files, links = [], [], []
+        stack = [(str(src), str(dst))]
+        while stack:
+            current_src, current_dst = stack.pop()
+            dirs.append((current_src, current_dst))
+            with os.scandir(current_src) as entries:
+                for entry in entries:
+                    target = os.path.join(current_dst, entry.name)
+                    if entry.is_symlink():
+                        links.append((entry.path, target))
+                    elif entry.is_dir():
+                        stack.append((entry.path, target))
+                    else:
+                        files.append((entry.path, target, entry.stat().st_size))
+        return dirs, files, links
+    
+    def copy_tree(self, src, dst) -> Tuple[int, int]:
+        """Copia un árbol completo repartiendo los archivos en un pool de hilos.
+        
+        Retorna (número de archivos, bytes copiados).
+        """
+        src, dst = Path(src), Path(dst)
+        dirs, files, links = self.collect_tree(src, dst)
+        with self.lock:
+            self.bytes_total += sum(size for _, _, size in files)
+        
+        for _, dst_dir in dirs:
+            os.makedirs(dst_dir, exist_ok=True)
+        for src_link, dst_link in links:
+            os.symlink(os.readlink(src_link), dst_link)
+        
+        # Archivos grandes primero para equilibrar el trabajo entre hilos
+        files.sort(key=lambda f: f[2], reverse=True)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = []
+            for src_file, dst_file, size in files:
+                futures.append(pool.submit(self._copy_one, src_file, dst_file, size))
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    future.result()
+                except Exception:
+                    for f in futures:
+                        f.cancel()
+                    raise
+        
+        # Fechas de directorios al final (copiar archivos las modifica)
+        for src_dir, dst_dir in reversed(dirs):
+            try:
+                shutil.copystat(src_dir, dst_dir)
+            except OSError:
+                pass
+        return len(files), sum(size for _, _, size in files)
+    
+    def _copy_one(self, src_file, dst_file, size):
+        if self.cancel_check and self.cancel_check():
+            raise InterruptedError("Copia cancelada")
+        return self.copy_file(src_file, dst_file, size)
+    
+    def copy(self, src, dst) -> Tuple[int, int]:
+        """Copia un archivo o un directorio."""
+        if Path(src).is_dir():
+            return self.copy_tree(src, dst)
+        size = os.path.getsize(src)
+        with self.lock:
+            self.bytes_total += size
+        self.copy_file(src, dst, size)
+        return 1, size
+
+class CopyThread(BackgroundThread):
+    """Copia en segundo plano con FastCopier, informando del progreso."""
+    
+    copy_progress = Signal(object, object)  # bytes copiados, bytes totales
+    copy_finished = Signal(bool, str)
+    
+    def __init__(self, source, destination, hardlink: bool = False, parent=None):
+        super().__init__(parent)
+        self.source = Path(source)
+        self.destination = Path(destination)
+        self.hardlink = hardlink
+    
+    def run(self):
+        copier = FastCopier(
+            hardlink=self.hardlink,
+            progress_callback=lambda done, total: self.copy_progress.emit(done, total),
+            cancel_check=lambda: self.cancelled
+        )
+        try:
+            files, size = copier.copy(self.source, self.destination)
+            self.copy_finished.emit(True, f"{files} archivos copiados ({format_size(size)})")
+        except Exception as e:
+            self.copy_finished.emit(False, str(e))
+
+# ============================================================================
+# PAPELERA (ELIMINACIÓN DIFERIDA)
+# ============================================================================
+
+class TrashManager:
+    """Elimina renombrando a una papelera del mismo sistema de archivos.
+    
+    El renombrado es instantáneo; el borrado real lo hace un hilo de baja
+    prioridad una vez pasada la ventana para deshacer. Cada entrada guarda
+    su ruta de origen en origin.json, así que una purga interrumpida (cierre
+    o fallo del launcher) se reanuda en el siguiente arranque.
+    """
+    
+    UNDO_WINDOW = 20  # segundos
+    ORIGIN_FILE = "origin.json"
+    PAYLOAD = "payload"
+    PURGE_SUFFIX = ".purge"
+    PENDING_SUFFIX = ".new"   # entrada a medio crear: la purga no la toca
+    STALE_PENDING = 3600      # segundos tras los que una entrada a medio crear se da por abandonada
+    
+    _shared = None
+    
+    @classmethod
+    def shared(cls) -> "TrashManager":
+        if cls._shared is None:
+            cls._shared = cls(TRASH_DIR)
+        return cls._shared
+    
+    def __init__(self, trash_dir: Path):
+        self.trash_dir = trash_dir
+        self.locations_file = trash_dir / "locations.json"
+        self.condition = threading.Condition()
+        self.worker = None
+        self.idle_callbacks = []  # tareas a ejecutar cuando la papelera quede vacía
+        self.locations = {str(trash_dir)}
+        try:
+            self.locations.update(json.loads(self.locations_file.read_text(encoding='utf-8')))
+        except (OSError, ValueError, TypeError):
+            pass
+    
+    def trash_dir_for(self, path: Path) -> Optional[Path]:
+        """Papelera en el mismo sistema de archivos que `path` (para poder renombrar)."""
+        try:
+            device = path.lstat().st_dev
+            self.trash_dir.mkdir(parents=True, exist_ok=True)
+            if self.trash_dir.stat().st_dev == device:
+                return self.trash_dir
+            # Otro sistema de archivos: papelera oculta junto a la carpeta de contenido
+            fallback = path.parent.parent / ".boxcraft-trash"
+            fallback.mkdir(exist_ok=True)
+            if fallback.stat().st_dev == device:
+                self.register_location(fallback)
+                return fallback
+        except OSError:
+            pass
+        return None
+    
+    def register_location(self, location: Path):
+        with self.condition:
+            if str(location) in self.locations:
+                return
+            self.locations.add(str(location))
+            try:
+                self.trash_dir.mkdir(parents=True, exist_ok=True)
+                self.locations_file.write_text(json.dumps(sorted(self.locations)), encoding='utf-8')
+            except OSError as e:
+                print(f"Error guardando ubicaciones de papelera: {e}")
+    
+    def delete(self, path, undo: bool = True) -> Optional[str]:
+        """Mueve `path` a la papelera. Retorna el id de la entrada (para deshacer)."""
+        path = Path(path)
+        if not path.exists() and not path.is_symlink():
+            raise FileNotFoundError(str(path))
+        
+        trash_dir = self.trash_dir_for(path)
+        if trash_dir is None:
+            # Sin papelera posible: borrado síncrono como antes
+            if path.is_dir() and not path.is_symlink():
+                shutil.rmtree(path)
+            else:
+                path.unlink()
+            return None
+        
+        # Se prepara con PENDING_SUFFIX (la purga no la ve), se mete el contenido,
+        # se escribe origin.json y solo entonces se publica con su nombre final
+        entry = trash_dir / f"{time.time_ns()}-{os.getpid()}-{threading.get_ident() & 0xffff:x}"
+        pending = entry.with_name(entry.name + self.PENDING_SUFFIX)
+        pending.mkdir()
+        try:
+            os.rename(path, pending / self.PAYLOAD)
+        except OSError:
+            shutil.rmtree(pending, ignore_errors=True)
+            raise
+        expires = time.time() + (self.UNDO_WINDOW if undo else 0)
+        tmp_origin = pending / f".{self.ORIGIN_FILE}.tmp"
+        try:
+            tmp_origin.write_text(json.dumps({'path': str(path), 'expires': expires}), encoding='utf-8')
+            os.replace(tmp_origin, pending / self.ORIGIN_FILE)
+            os.rename(pending, entry)
+        except OSError:
+            os.rename(pending / self.PAYLOAD, path)  # devolverlo a su sitio
+            shutil.rmtree(pending, ignore_errors=True)
+            raise
+        
+        self.start_worker()
+        with self.condition:
+            self.condition.notify()
+        return str(entry)
+    
+    def restore(self, entry_id: str) -> Tuple[bool, str]:
+        """Deshace una eliminación si todavía no se ha purgado."""
+        entry = Path(entry_id)
+        with self.condition:
+            try:
+                origin = json.loads((entry / self.ORIGIN_FILE).read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                return False, "El elemento ya fue eliminado definitivamente"
+            original = Path(origin['path'])
+            if original.exists():
+                return False, f"Ya existe un elemento en {original}"
+            try:
+                original.parent.mkdir(parents=True, exist_ok=True)
+                os.rename(entry / self.PAYLOAD, original)
+            except OSError as e:
+                return False, f"No se pudo restaurar: {str(e)}"
+            shutil.rmtree(entry, ignore_errors=True)
+            return True, f"{original.name} restaurado"
+    
+    def pending_entries(self):
+        """Entradas de todas las papeleras: (ruta, expiración)."""
+        entries = []
+        for location in list(self.locations):
+            try:
+                with os.scandir(location) as it:
+                    for item in it:
+                        if not item.is_dir(follow_symlinks=False):
+                            continue
+                        if item.name.endswith(self.PURGE_SUFFIX):
+                            entries.append((Path(item.path), 0))
+                            continue
+                        if item.name.endswith(self.PENDING_SUFFIX):
+                            # Solo se recoge si quedó abandonada (cierre a mitad de delete)
+                            try:
+                                if time.time() - item.stat(follow_symlinks=False).st_mtime > self.STALE_PENDING:
+                                    entries.append((Path(item.path), 0))
+                            except OSError:
+                                pass
+                            continue
+                        try:
+                            origin = json.loads((Path(item.path) / self.ORIGIN_FILE).read_text(encoding='utf-8'))
+                            entries.append((Path(item.path), float(origin.get('expires', 0))))
+                        except (OSError, ValueError):
+                            entries.append((Path(item.path), 0))  # entrada incompleta
+            except OSError:
+                continue
+        return entries
+    
+    def purge_entry(self, entry: Path):
+        """Marca la entrada como en purga (ya no se puede restaurar) y la borra."""
+        with self.condition:
+            if not entry.name.endswith(self.PURGE_SUFFIX):
+                marked = entry.with_name(entry.name + self.PURGE_SUFFIX)
+                try:
+                    os.rename(entry, marked)
+                except OSError:
+                    return  # restaurada o purgada mientras tanto
+                entry = marked
+        shutil.rmtree(entry, ignore_errors=True)
+    
+    def when_idle(self, callback):
+        """Ejecuta `callback` en el hilo de purga cuando la papelera quede vacía."""
+        with self.condition:
+            self.idle_callbacks.append(callback)
+        self.start_worker()
+    
+    def start_worker(self):
+        """Arranca (una sola vez) el hilo de purga en segundo plano."""
+        with self.condition:
+            if self.worker is not None and self.worker.is_alive():
+                return
+            self.worker = threading.Thread(target=self.purge_loop, name="boxcraft-trash", daemon=True)
+            self.worker.start()
+    
+    def resume(self):
+        """Reanuda purgas pendientes de sesiones anteriores."""
+        if self.pending_entries():
+            self.start_worker()
+    
+    def purge_loop(self):
+        # Prioridad mínima de CPU para este hilo (en Linux nice es por hilo)
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+        except (AttributeError, OSError):
+            pass
+        
+        while True:
+            now = time.time()
+            next_expiry = None
+            for entry, expires in self.pending_entries():
+                if expires <= now:
+                    self.purge_entry(entry)
+                elif next_expiry is None or expires < next_expiry:
+                    next_expiry = expires
+            
+            with self.condition:
+                if next_expiry is None and not self.pending_entries():
+                    self.worker = None
+                    callbacks, self.idle_callbacks = self.idle_callbacks, []
+                    break
+                timeout = max(0.5, (next_expiry or now + 1) - time.time())
+                self.condition.wait(timeout)
+        
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error en tarea posterior a la purga: {e}")
+
+# ============================================================================
+# ALMACÉN DE OBJETOS DEDUPLICADO
+# ============================================================================
+
+class ObjectStore(JsonIndex):
+    """Almacén direccionado por contenido (SHA-256) para los archivos de las versiones.
+    
+    Cada objeto vive en objects/ab/cdef... y las versiones lo referencian con
+    enlaces duros, así los archivos idénticos entre versiones ocupan disco y
+    caché de páginas una sola vez. El índice recuerda el digest de cada inodo
+    (por mtime y tamaño) para no volver a leer archivos ya procesados.
+    """
+    
+    CHUNK_SIZE = 4 * 1024 * 1024
+    MIN_SIZE = 1  # los archivos vacíos no se enlazan
+    # Archivos propios de cada versión que se reescriben: nunca se comparten
+    EXCLUDED_NAMES = frozenset({"boxcraft-config.txt"})
+    _shared = None
+    
+    def __init__(self, objects_dir: Path):
+        super().__init__(objects_dir / "index.json")
+        self.objects_dir = objects_dir
+    
+    @classmethod
+    def shared(cls) -> "ObjectStore":
+        if cls._shared is None:
+            cls._shared = cls(OBJECTS_DIR)
+        return cls._shared
+    
+    def object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest[2:]
+    
+    def same_filesystem(self, root: Path) -> bool:
+        """Los enlaces duros solo funcionan dentro del mismo sistema de archivos."""
+        try:
+            self.objects_dir.mkdir(parents=True, exist_ok=True)
+            return os.stat(self.objects_dir).st_dev == os.stat(root).st_dev
+        except OSError:
+            return False
+    
+    def file_digest(self, path: str, st: os.stat_result) -> str:
+        key = f"ino:{st.st_dev}:{st.st_ino}"
+        cached = self.get(key)
+        if cached and cached[:2] == [st.st_mtime_ns, st.st_size]:
+            return cached[2]
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(self.CHUNK_SIZE), b""):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        self.set(key, [st.st_mtime_ns, st.st_size, digest])
+        return digest
+    
+    def link_file(self, path: str) -> int:
+        """Sustituye el archivo por un enlace al objeto. Retorna los bytes liberados."""
+        st = os.lstat(path)
+        if st.st_size < self.MIN_SIZE:
+            return 0
+        digest = self.file_digest(path, st)
+        obj = self.object_path(digest)
+        
+        try:
+            obj_st = os.stat(obj)
+        except FileNotFoundError:
+            obj.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.link(path, obj)  # el archivo pasa a ser el objeto
+                return 0
+            except FileExistsError:
+                obj_st = os.stat(obj)  # otro hilo lo adoptó primero
+        
+        if obj_st.st_ino == st.st_ino or obj_st.st_size != st.st_size:
+            return 0
+        
+        # Enlazar al lado y reemplazar de forma atómica
+        tmp = f"{path}.boxcraft-link"
+        os.link(obj, tmp)
+        os.replace(tmp, path)
+        # Solo se libera espacio si nadie más apuntaba al inodo anterior
+        return st.st_size if st.st_nlink == 1 else 0
+    
+    def dedupe(self, roots, max_workers: int = 0, progress_callback=None, cancel_check=None,
+               exclude=()) -> dict:
+        """Pasa los archivos de `roots` al almacén. Retorna estadísticas de la pasada.
+        
+        Las carpetas de `exclude` (extracciones en curso) no se tocan: un archivo
+        a medio escribir no puede convertirse en objeto.
+        """
+        excluded = {os.path.abspath(path) for path in exclude}
+        files = []
+        for root in roots:
+            root = Path(root)
+            if not root.is_dir() or os.path.abspath(root) in excluded:
+                continue
+            if not self.same_filesystem(root):
+                print(f"{root} está en otro sistema de archivos; no se deduplica")
+                continue
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames[:] = [name for name in dirnames
+                               if os.path.abspath(os.path.join(dirpath, name)) not in excluded]
+                files.extend(os.path.join(dirpath, name) for name in filenames
+                             if name not in self.EXCLUDED_NAMES)
+        
+        result = {'files': len(files), 'linked': 0, 'saved': 0, 'errors': 0}
+        lock = threading.Lock()
+        done = [0]
+        
+        def process(path):
+            if cancel_check and cancel_check():
+                raise InterruptedError("Deduplicación cancelada")
+            try:
+                if os.path.islink(path):
+                    saved = 0
+                else:
+                    saved = self.link_file(path)
+            except OSError as e:
+                print(f"No se pudo deduplicar {path}: {e}")
+                with lock:
+                    result['errors'] += 1
+                saved = 0
+            with lock:
+                done[0] += 1
+                result['saved'] += saved
+                result['linked'] += 1 if saved else 0
+                count = done[0]
+            if progress_callback:
+                progress_callback(count, len(files))
+        
+        workers = max_workers or min(8, (os.cpu_count() or 2))
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(process, path) for path in files]
+                try:
+                    for future in concurrent.futures.as_completed(futures):
+                        future.result()
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+        finally:
+            self.save()
+        return result
+    
+    def gc(self) -> Tuple[int, int]:
+        """Borra los objetos que ya no usa ninguna versión (nlink == 1)."""
+        removed, freed = 0, 0
+        if not self.objects_dir.exists():
+            return removed, freed
+        for bucket in self.objects_dir.iterdir():
+            if not bucket.is_dir():
+                continue
+            for obj in bucket.iterdir():
+                try:
+                    st = obj.stat()
+                    if st.st_nlink == 1:
+                        obj.unlink()
+                        removed += 1
+                        freed += st.st_size
+                except OSError:
+                    continue
+            try:
+                bucket.rmdir()  # solo si quedó vacío
+            except OSError:
+                pass
+        
+        # Olvidar los inodos que ya no existen
+        with self.lock:
+            live = set()
+            for bucket in self.objects_dir.iterdir():
+                if bucket.is_dir():
+                    for obj in bucket.iterdir():
+                        try:
+                            st = obj.stat()
+                            live.add(f"ino:{st.st_dev}:{st.st_ino}")
+                        except OSError:
+                            pass
+            self.prune("ino:", live)
+        self.save()
+        if removed:
+            print(f"Almacén de objetos: {removed} objetos sin uso eliminados ({format_size(freed)})")
+        return removed, freed
+    
+    def report(self) -> dict:
+        """Espacio del almacén y lo que se ahorra gracias a compartir objetos."""
+        report = {'objects': 0, 'store_bytes': 0, 'references': 0, 'saved_bytes': 0}
+        if not self.objects_dir.exists():
+            return report
+        for bucket in self.objects_dir.iterdir():
+            if not bucket.is_dir():
+                continue
+            for obj in bucket.iterdir():
+                try:
+                    st = obj.stat()
+                except OSError:
+                    continue
+                references = st.st_nlink - 1  # el propio almacén no cuenta
+                report['objects'] += 1
+                report['store_bytes'] += st.st_size
+                report['references'] += references
+                report['saved_bytes'] += st.st_size * max(references - 1, 0)
+        return report
+
+class DedupeThread(BackgroundThread):
+    """Deduplica versiones en segundo plano."""
+    
+    dedupe_progress = Signal(object, object)  # archivos procesados, archivos totales
+    dedupe_finished = Signal(bool, str, dict)
+    
+    def __init__(self, roots, parent=None):
+        super().__init__(parent)
+        self.roots = list(roots)
+        # Se fija al crear el hilo (en la interfaz, dueña de las extracciones)
+        self.exclude = ExtractionJob.busy_dirs()
+        self.skipped_versions = [job.version_name for job in ExtractionJob.active_jobs()]
+    
+    def run(self):
+        store = ObjectStore.shared()
+        try:
+            result = store.dedupe(
+                self.roots,
+                progress_callback=lambda done, total: self.dedupe_progress.emit(done, total),
+                cancel_check=lambda: self.cancelled,
+                exclude=self.exclude
+            )
+            result.update(store.report())
+            self.dedupe_finished.emit(True, f"{format_size(result['saved'])} liberados en esta pasada", result)
+        except InterruptedError:
+            self.dedupe_finished.emit(False, "Cancelado por el usuario", {})
+        except Exception as e:
+            self.dedupe_finished.emit(False, str(e), {})
+
+# ============================================================================
+# EXTRACCIÓN DE APK (PROCESO NO BLOQUEANTE)
+# ============================================================================
+
+class ZipWindow(io.RawIOBase):
+    """Vista de solo lectura sobre un rango de bytes de un archivo."""
+    
+    def __init__(self, path, offset: int, size: int):
+        super().__init__()
+        self.file = open(path, 'rb')
+        self.offset = offset
+        self.size = size
+        self.position = 0
+    
+    def readable(self):
+        return True
+    
+    def seekable(self):
+        return True
+    
+    def tell(self):
+        return self.position
+    
+    def seek(self, position, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            position += self.position
+        elif whence == io.SEEK_END:
+            position += self.size
+        self.position = max(0, min(position, self.size))
+        return self.position
+    
+    def readinto(self, buffer):
+        length = min(len(buffer), self.size - self.position)
+        if length <= 0:
+            return 0
+        self.file.seek(self.offset + self.position)
+        read = self.file.readinto(memoryview(buffer)[:length])
+        self.position += read
+        return read
+    
+    def close(self):
+        self.file.close()
+        super().close()
+
+class BundledZipFile(zipfile.ZipFile):
+    """ZipFile de una división guardada dentro de un paquete; al cerrarse cierra su ventana."""
+    
+    def __init__(self, window):
+        super().__init__(window)
+        self.window = window
+    
+    def close(self):
+        super().close()
+        self.window.close()
+
+class ApkBundle:
+    """Paquetes de APK divididos: .apks, .xapk o varios APK sueltos.
+    
+    Las divisiones se nombran "paquete.apks!/ruta/split.apk". Como suelen ir
+    almacenadas sin comprimir se leen directamente dentro del paquete, sin
+    desempaquetarlas, salvo para el extractor externo, que necesita archivos.
+    """
+    
+    SEPARATOR = "!/"
+    ABIS = {"arm64_v8a", "armeabi_v7a", "armeabi", "arm64", "x86", "x86_64", "mips", "mips64"}
+    KEPT_ABIS = {"x86_64", "x86"}
+    
+    @classmethod
+    def split_source(cls, source) -> Tuple[str, Optional[str]]:
+        """(archivo, miembro) de una fuente; miembro es None para un APK suelto."""
+        source = str(source)
+        if cls.SEPARATOR in source:
+            path, member = source.split(cls.SEPARATOR, 1)
+            return path, member
+        return source, None
+    
+    @classmethod
+    def split_abi(cls, member: str) -> Optional[str]:
+        """ABI de una división por su nombre (config.arm64_v8a.apk, base-x86_64.apk...)."""
+        tokens = re.split(r"[.\-/]", member.lower())
+        for token in tokens:
+            if token in cls.ABIS:
+                return token
+        return None
+    
+    @classmethod
+    def bundle_members(cls, path) -> Optional[list]:
+        """Divisiones útiles de un paquete, o None si `path` es un APK normal."""
+        with zipfile.ZipFile(path) as bundle:
+            names = bundle.namelist()
+            if "AndroidManifest.xml" in names:
+                return None
+            splits = [name for name in names if name.lower().endswith(".apk")]
+            if not splits:
+                return None
+            # Las divisiones de otras arquitecturas no aportan nada al launcher
+            return sorted(name for name in splits
+                          if cls.split_abi(name) in cls.KEPT_ABIS or cls.split_abi(name) is None)
+    
+    @classmethod
+    def expand(cls, paths) -> list:
+        """Convierte la selección del usuario en la lista de APK a extraer."""
+        if isinstance(paths, (str, Path)):
+            paths = [paths]
+        sources = []
+        for path in paths:
+            members = cls.bundle_members(path)
+            if members is None:
+                sources.append(str(path))
+            else:
+                sources.extend(f"{path}{cls.SEPARATOR}{member}" for member in members)
+        return sources
+    
+    @staticmethod
+    def stored_range(bundle: zipfile.ZipFile, info: zipfile.ZipInfo) -> Optional[Tuple[int, int]]:
+        """(offset, tamaño) de los datos de un miembro sin comprimir."""
+        if info.compress_type != zipfile.ZIP_STORED or info.flag_bits & 0x1:
+            return None
+        # Cabecera local: 30 bytes fijos, luego nombre y campo extra (longitudes al final)
+        bundle.fp.seek(info.header_offset)
+        header = bundle.fp.read(30)
+        if header[:4] != b"PK\x03\x04":
+            return None
+        name_length, extra_length = struct.unpack("<HH", header[26:30])
+        return info.header_offset + 30 + name_length + extra_length, info.file_size
+    
+    @classmethod
+    def open_zip(cls, source) -> zipfile.ZipFile:
+        """Abre un APK suelto o una división dentro de un paquete."""
+        path, member = cls.split_source(source)
+        if member is None:
+            return zipfile.ZipFile(path)
+        with zipfile.ZipFile(path) as bundle:
+            info = bundle.getinfo(member)
+            data_range = cls.stored_range(bundle, info)
+            if data_range is None:
+                # División comprimida (poco habitual): leerla a memoria
+                return zipfile.ZipFile(io.BytesIO(bundle.read(member)))
+        return BundledZipFile(ZipWindow(path, *data_range))
+    
+    @classmethod
+    def unpack(cls, source, target_dir: Path) -> str:
+        """Deja la división como archivo propio (copy_file_range si está sin comprimir)."""
+        path, member = cls.split_source(source)
+        if member is None:
+            return path
+        target = Path(target_dir) / member.replace("/", "_")
+        with zipfile.ZipFile(path) as bundle:
+            info = bundle.getinfo(member)
+            data_range = cls.stored_range(bundle, info)
+            with open(target, 'wb') as dst:
+                if data_range is None or not hasattr(os, "copy_file_range"):
+                    with bundle.open(info) as src:
+                        shutil.copyfileobj(src, dst, 1024 * 1024)
+                else:
+                    offset, remaining = data_range
+                    with open(path, 'rb') as src:
+                        while remaining > 0:
+                            copied = os.copy_file_range(src.fileno(), dst.fileno(),
+                                                        min(remaining, 1 << 30), offset)
+                            if copied == 0:
+                                raise OSError(f"Copia incompleta de {member}")
+                            offset += copied
+                            remaining -= copied
+        return str(target)
+
+class SplitUnpackThread(BackgroundThread):
+    """Desempaqueta en paralelo las divisiones de un paquete (para el extractor externo)."""
+    
+    unpack_finished = Signal(bool, str, list)  # éxito, mensaje, rutas resultantes
+    
+    def __init__(self, sources, target_dir: Path, parent=None):
+        super().__init__(parent)
+        self.sources = list(sources)
+        self.target_dir = Path(target_dir)
+    
+    def run(self):
+        try:
+            self.target_dir.mkdir(parents=True, exist_ok=True)
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max(len(self.sources), 1)) as pool:
+                paths = list(pool.map(lambda source: ApkBundle.unpack(source, self.target_dir), self.sources))
+            if self.cancelled:
+                self.unpack_finished.emit(False, "Cancelado por el usuario", [])
+            else:
+                self.unpack_finished.emit(True, "", paths)
+        except Exception as e:
+            self.unpack_finished.emit(False, f"No se pudo leer el paquete: {e}", [])
+
+class PythonApkExtractor:
+    """Backend integrado: extrae el APK en paralelo a partir del directorio central del zip."""
+    
+    NAME = "python"
+    VERSION = 1  # cambia si cambia lo que se extrae (las exportaciones por referencia lo guardan)
+    PREFIXES = ("lib/x86_64/", "lib/x86/", "assets/", "res/")
+    REQUIRED_LIB = "lib/x86_64/libminecraftpe.so"
+    CHUNK_SIZE = 1024 * 1024
+    
+    def __init__(self, max_workers: int = 0, progress_callback=None, cancel_check=None):
+        self.max_workers = max_workers or min(8, (os.cpu_count() or 2))
+        self.progress_callback = progress_callback
+        self.cancel_check = cancel_check
+        self.local = threading.local()  # un ZipFile por hilo y APK
+        self.handles = []
+        self.lock = threading.Lock()
+        self.done_bytes = 0
+        self.total_bytes = 0
+    
+    def plan(self, apk_paths) -> list:
+        """Elige qué miembros extraer; si varios APK traen el mismo archivo gana el último."""
+        members = {}
+        for apk_path in apk_paths:
+            with ApkBundle.open_zip(apk_path) as apk:
+                for info in apk.infolist():
+                    if info.is_dir() or not info.filename.startswith(self.PREFIXES):
+                        continue
+                    members[info.filename] = (str(apk_path), info)
+        
+        if self.REQUIRED_LIB not in members:
+            raise ValueError("libminecraftpe.so (x86_64) no está en el APK; "
+                             "el APK no es compatible con el launcher")
+        
+        # Los archivos grandes primero para repartir mejor la carga
+        return sorted(members.values(), key=lambda item: item[1].file_size, reverse=True)
+    
+    @staticmethod
+    def safe_target(dest_dir: Path, name: str) -> Optional[Path]:
+        """Ruta de destino, o None si el nombre intenta salir del directorio."""
+        parts = Path(name).parts
+        if not parts or Path(name).is_absolute() or ".." in parts:
+            return None
+        return dest_dir.joinpath(*parts)
+    
+    def open_apk(self, apk_path: str) -> zipfile.ZipFile:
+        """ZipFile propio del hilo actual (ZipFile no admite lecturas concurrentes)."""
+        handles = getattr(self.local, "zips", None)
+        if handles is None:
+            handles = self.local.zips = {}
+        if apk_path not in handles:
+            handles[apk_path] = ApkBundle.open_zip(apk_path)
+            with self.lock:
+                self.handles.append(handles[apk_path])
+        return handles[apk_path]
+    
+    def check_cancelled(self):
+        if self.cancel_check and self.cancel_check():
+            raise InterruptedError("Extracción cancelada")
+    
+    def extract_member(self, apk_path: str, info: zipfile.ZipInfo, target: Path):
+        self.check_cancelled()
+        apk = self.open_apk(apk_path)
+        with apk.open(info) as src, open(target, "wb") as dst:
+            while True:
+                chunk = src.read(self.CHUNK_SIZE)
+                if not chunk:
+                    break
+                dst.write(chunk)
+                with self.lock:
+                    self.done_bytes += len(chunk)
+                    done = self.done_bytes
+                if self.progress_callback:
+                    self.progress_callback(done, self.total_bytes)
+                self.check_cancelled()
+    
+    def extract(self, apk_paths, dest_dir: Path) -> Tuple[int, int]:
+        """Extrae uno o varios APK en dest_dir. Retorna (archivos, bytes)."""
+        if isinstance(apk_paths, (str, Path)):
+            apk_paths = [apk_paths]
+        dest_dir = Path(dest_dir)
+        
+        jobs = []
+        for apk_path, info in self.plan(apk_paths):
+            target = self.safe_target(dest_dir, info.filename)
+            if target is not None:
+                jobs.append((apk_path, info, target))
+        
+        # Directorios primero, en el hilo actual
+        for directory in sorted({target.parent for _, _, target in jobs}):
+            directory.mkdir(parents=True, exist_ok=True)
+        
+        self.done_bytes = 0
+        self.total_bytes = sum(info.file_size for _, info, _ in jobs)
+        
+        try:
+            # zlib libera el GIL al descomprimir, así que los hilos escalan
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = [pool.submit(self.extract_member, *job) for job in jobs]
+                try:
+                    for future in concurrent.futures.as_completed(futures):
+                        future.result()
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+        finally:
+            with self.lock:
+                for handle in self.handles:
+                    handle.close()
+                self.handles.clear()
+        
+        return len(jobs), self.done_bytes
+
+class PythonExtractThread(BackgroundThread):
+    """Ejecuta PythonApkExtractor fuera del hilo de la interfaz."""
+    
+    extract_progress = Signal(object, object)  # bytes escritos, bytes totales
+    extract_finished = Signal(bool, str)
+    
+    def __init__(self, apk_paths, dest_dir: Path, max_workers: int = 0, parent=None):
+        super().__init__(parent)
+        self.apk_paths = apk_paths
+        self.dest_dir = Path(dest_dir)
+        self.max_workers = max_workers
+    
+    def run(self):
+        extractor = PythonApkExtractor(
+            max_workers=self.max_workers,
+            progress_callback=lambda done, total: self.extract_progress.emit(done, total),
+            cancel_check=lambda: self.cancelled
+        )
+        try:
+            files, size = extractor.extract(self.apk_paths, self.dest_dir)
+            self.extract_finished.emit(True, f"{files} archivos extraídos ({format_size(size)})")
+        except InterruptedError:
+            self.extract_finished.emit(False, "Cancelado por el usuario")
+        except Exception as e:
+            self.extract_finished.emit(False, f"Error en extracción: {str(e)}")
+
+def benchmark_extractors(apk_path: str, runs: int = 1) -> list:
+    """Compara los backends de extracción sobre un APK. Retorna [(backend, segundos, bytes)]."""
+    results = []
+    bench_root = Path(tempfile.mkdtemp(prefix=".bench-", dir=VERSIONS_DIR))
+    
+    def drop(path):
+        shutil.rmtree(path, ignore_errors=True)
+    
+    try:
+        for run in range(runs):
+            if MCPELAUNCHER_EXTRACT.exists():
+                dest = bench_root / f"external-{run}"
+                start = time.perf_counter()
+                try:
+                    completed = subprocess.run([str(MCPELAUNCHER_EXTRACT), apk_path, str(dest)],
+                                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                    elapsed = time.perf_counter() - start
+                    if completed.returncode == 0:
+                        results.append(("external", elapsed, parallel_tree_size(dest)))
+                    else:
+                        print(f"mcpelauncher-extract falló (código {completed.returncode})")
+                except OSError as e:
+                    print(f"No se pudo ejecutar mcpelauncher-extract: {e}")
+                drop(dest)
+            
+            dest = bench_root / f"python-{run}"
+            start = time.perf_counter()
+            _, size = PythonApkExtractor().extract(apk_path, dest)
+            results.append(("python", time.perf_counter() - start, size))
+            drop(dest)
+    finally:
+        drop(bench_root)
+    
+    return results
+
+class ApkCache(JsonIndex):
+    """Árboles ya extraídos, indexados por el SHA-256 del APK.
+    
+    Entradas "apk:<digest>" describen un árbol en trees/<digest>; las entradas
+    "stamp:<ruta>" recuerdan el digest de un archivo mientras no cambien su
+    mtime ni su tamaño, para no volver a leer APKs de varios GB.
+    """
+    
+    CHUNK_SIZE = 4 * 1024 * 1024
+    MAX_TREES = 8
+    _shared = None
+    
+    def __init__(self, cache_dir: Path):
+        super().__init__(cache_dir / "index.json")
+        self.cache_dir = cache_dir
+        self.trees_dir = cache_dir / "trees"
+    
+    @classmethod
+    def shared(cls) -> "ApkCache":
+        if cls._shared is None:
+            cls._shared = cls(APK_CACHE_DIR)
+        return cls._shared
+    
+    def tree_path(self, digest: str) -> Path:
+        return self.trees_dir / digest
+    
+    @staticmethod
+    def file_stamp(path) -> Optional[list]:
+        try:
+            st = os.stat(path)
+            return [st.st_mtime_ns, st.st_size]
+        except OSError:
+            return None
+    
+    def hash_file(self, path, progress_callback=None, cancel_check=None, offset: int = 0, total: int = 0) -> str:
+        """SHA-256 en streaming; reutiliza el digest guardado si el archivo no cambió."""
+        key = f"stamp:{os.path.abspath(path)}"
+        stamp = self.file_stamp(path)
+        cached = self.get(key)
+        if cached and stamp and cached.get('stamp') == stamp:
+            return cached['digest']
+        
+        # hashlib libera el GIL con bloques grandes: no frena la interfaz
+        sha = hashlib.sha256()
+        done = 0
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(self.CHUNK_SIZE)
+                if not chunk:
+                    break
+                sha.update(chunk)
+                done += len(chunk)
+                if progress_callback:
+                    progress_callback(offset + done, total)
+                if cancel_check and cancel_check():
+                    raise InterruptedError("Cálculo cancelado")
+        
+        digest = sha.hexdigest()
+        if stamp:
+            self.set(key, {'stamp': stamp, 'digest': digest})
+        return digest
+    
+    def hash_apks(self, apk_paths, progress_callback=None, cancel_check=None) -> str:
+        """Digest de uno o varios APK (los conjuntos se combinan en orden estable)."""
+        apk_paths = [str(p) for p in apk_paths]
+        sizes = [os.path.getsize(p) for p in apk_paths]
+        total = sum(sizes)
+        digests, offset = [], 0
+        for path, size in zip(apk_paths, sizes):
+            digests.append(self.hash_file(path, progress_callback, cancel_check, offset, total))
+            offset += size
+        self.save()
+        if len(digests) == 1:
+            return digests[0]
+        return hashlib.sha256("\n".join(sorted(digests)).encode()).hexdigest()
+    
+    def lookup(self, digest: str) -> Optional[Path]:
+        """Árbol extraído para el digest, si sigue completo en disco."""
+        if not digest or not self.get(f"apk:{digest}"):
+            return None
+        tree = self.tree_path(digest)
+        if (tree / PythonApkExtractor.REQUIRED_LIB).is_file():
+            return tree
+        self.remove(f"apk:{digest}")
+        self.save()
+        return None
+    
+    def store(self, digest: str, source_dir: Path, apk_paths=()) -> bool:
+        """Guarda en la caché una versión recién extraída (enlaces duros: sin copiar datos)."""
+        tree = self.tree_path(digest)
+        tmp_tree = self.trees_dir / f".{digest}.{os.getpid()}.tmp"
+        try:
+            self.trees_dir.mkdir(parents=True, exist_ok=True)
+            if tmp_tree.exists():
+                shutil.rmtree(tmp_tree)
+            files, size = FastCopier(hardlink=True).copy_tree(source_dir, tmp_tree)
+            if tree.exists():
+                TrashManager.shared().delete(tree, undo=False)
+            os.replace(tmp_tree, tree)
+        except OSError as e:
+            print(f"No se pudo guardar el APK en la caché: {e}")
+            shutil.rmtree(tmp_tree, ignore_errors=True)
+            return False
+        
+        now = time.time()
+        self.set(f"apk:{digest}", {
+            'files': files,
+            'size': size,
+            'apks': [os.path.basename(str(p)) for p in apk_paths],
+            'created': now,
+            'last_used': now,
+        })
+        self.evict(self.MAX_TREES)
+        return self.save()
+    
+    def touch(self, digest: str):
+        entry = self.get(f"apk:{digest}")
+        if entry:
+            self.set(f"apk:{digest}", dict(entry, last_used=time.time()))
+            self.save()
+    
+    def evict(self, max_trees: int):
+        """Descarta los árboles usados hace más tiempo."""
+        with self.lock:
+            trees = sorted((key for key in self.entries if key.startswith("apk:")),
+                           key=lambda key: self.entries[key].get('last_used', 0), reverse=True)
+            for key in trees[max_trees:]:
+                tree = self.tree_path(key[len("apk:"):])
+                self.remove(key)
+                if tree.exists():
+                    TrashManager.shared().delete(tree, undo=False)
+
+class ApkInspector:
+    """Comprobación previa de un APK: solo lee el directorio central del zip."""
+    
+    SPACE_MARGIN = 1.10  # avisar si el espacio libre queda por debajo del 110 % necesario
+    
+    @staticmethod
+    def free_space(path: Path) -> Optional[int]:
+        """Espacio libre en el sistema de archivos que contendrá `path`."""
+        for candidate in [path, *path.parents]:
+            if candidate.exists():
+                try:
+                    return shutil.disk_usage(candidate).free
+                except OSError:
+                    return None
+        return None
+    
+    @classmethod
+    def inspect(cls, apk_paths, dest_dir: Path, backend: str = None) -> dict:
+        """Retorna {'errors', 'warnings', 'payload_bytes', 'free_bytes', 'abis', 'game_version', 'cached'}."""
+        prefixes = ExtractionJob.payload_prefixes(backend or LauncherSettings().extract_backend())
+        source_paths = [apk_paths] if isinstance(apk_paths, (str, Path)) else list(apk_paths)
+        report = {'errors': [], 'warnings': [], 'payload_bytes': 0, 'free_bytes': None,
+                  'abis': [], 'game_version': None, 'cached': False}
+        
+        try:
+            apk_paths = ApkBundle.expand(source_paths)
+        except (OSError, zipfile.BadZipFile) as e:
+            report['errors'].append(f"El archivo no es un APK ni un paquete válido: {e}")
+            return report
+        
+        names = set()
+        with_manifest = []  # APK (o divisiones) que traen su propio AndroidManifest.xml
+        for apk_path in apk_paths:
+            try:
+                with ApkBundle.open_zip(apk_path) as apk:
+                    for info in apk.infolist():
+                        names.add(info.filename)
+                        if info.filename == "AndroidManifest.xml":
+                            with_manifest.append(apk_path)
+                        if not info.is_dir() and info.filename.startswith(prefixes):
+                            report['payload_bytes'] += info.file_size
+            except (OSError, KeyError, zipfile.BadZipFile) as e:
+                report['errors'].append(f"{Path(apk_path).name} no es un APK válido: {e}")
+        if report['errors']:
+            return report
+        
+        report['abis'] = sorted({name.split("/")[1] for name in names
+                                 if name.startswith("lib/") and name.count("/") >= 2})
+        if PythonApkExtractor.REQUIRED_LIB not in names:
+            if not report['abis']:
+                report['errors'].append(
+                    "El APK no contiene bibliotecas nativas. Puede ser el APK base de un "
+                    "paquete dividido: importa el paquete completo (.apks / .xapk).")
+            else:
+                report['errors'].append(
+                    "El APK no incluye libminecraftpe.so para x86_64 (ABIs encontradas: "
+                    f"{', '.join(report['abis'])}). Este launcher necesita la versión x86_64.")
+            return report
+        
+        for apk_path in with_manifest:
+            report['game_version'] = ApkManifest.read_apk_info(apk_path).get('game_version')
+            if report['game_version']:
+                break
+        
+        # Si el APK ya está en la caché la versión se crea con enlaces: no ocupa espacio nuevo
+        if len(source_paths) == 1 and LauncherSettings().get("apk_cache"):
+            cache = ApkCache.shared()
+            cached = cache.get(f"stamp:{os.path.abspath(source_paths[0])}")
+            if cached and cached.get('stamp') == cache.file_stamp(source_paths[0]):
+                report['cached'] = cache.lookup(cached['digest']) is not None
+        
+        needed = 0 if report['cached'] else report['payload_bytes']
+        report['free_bytes'] = cls.free_space(Path(dest_dir))
+        if report['free_bytes'] is not None and needed:
+            if report['free_bytes'] < needed:
+                report['errors'].append(
+                    f"No hay espacio suficiente: se necesitan {format_size(needed)} "
+                    f"y quedan {format_size(report['free_bytes'])} libres.")
+            elif report['free_bytes'] < needed * cls.SPACE_MARGIN:
+                report['warnings'].append(
+                    f"El disco quedará casi lleno: se necesitan {format_size(needed)} "
+                    f"y quedan {format_size(report['free_bytes'])} libres.")
+        return report
+
+class ApkDigestThread(BackgroundThread):
+    """Calcula el digest de los APK fuera del hilo de la interfaz."""
+    
+    digest_progress = Signal(object, object)  # bytes leídos, bytes totales
+    digest_finished = Signal(str, str)        # digest ("" si falló), mensaje de error
+    
+    def __init__(self, apk_paths, parent=None):
+        super().__init__(parent)
+        self.apk_paths = apk_paths
+    
+    def run(self):
+        try:
+            digest = ApkCache.shared().hash_apks(
+                self.apk_paths,
+                progress_callback=lambda done, total: self.digest_progress.emit(done, total),
+                cancel_check=lambda: self.cancelled
+            )
+            self.digest_finished.emit(digest, "")
+        except InterruptedError:
+            self.digest_finished.emit("", "Cancelado por el usuario")
+        except Exception as e:
+            self.digest_finished.emit("", str(e))
+
+class VersionRecordThread(BackgroundThread):
+    """Cierra una extracción fuera de la interfaz: caché de APK, tamaño e índice de versiones."""
+    
+    record_finished = Signal(object)  # bytes de la versión
+    
+    def __init__(self, job: "ExtractionJob", store_in_cache: bool, parent=None):
+        super().__init__(parent)
+        self.dest_dir = job.dest_dir
+        self.version_name = job.version_name
+        self.source_paths = list(job.source_paths)
+        self.apk_paths = list(job.apk_paths)
+        self.digest = job.digest
+        self.backend = job.backend
+        self.store_in_cache = store_in_cache
+    
+    def run(self):
+        size = 0
+        try:
+            if self.store_in_cache:
+                ApkCache.shared().store(self.digest, self.dest_dir, self.source_paths)
+            # El manifiesto del APK base dice qué versión del juego es (sin extraer nada más)
+            apk_info = {}
+            for apk_path in self.apk_paths:
+                apk_info = ApkManifest.read_apk_info(apk_path)
+                if apk_info['valid']:
+                    break
+            size = parallel_tree_size(self.dest_dir)
+            VersionIndex.shared().record(self.version_name,
+                                         size=size,
+                                         apk_digest=self.digest or None,
+                                         extractor=self.backend,
+                                         installed_at=time.time(),
+                                         game_version=apk_info.get('game_version'),
+                                         version_code=apk_info.get('version_code'),
+                                         min_sdk=apk_info.get('min_sdk'),
+                                         abis=apk_info.get('abis'))
+        except Exception as e:
+            # La versión ya está extraída: un fallo aquí solo deja el índice sin actualizar
+            print(f"No se pudo registrar la versión {self.version_name}: {e}")
+        self.record_finished.emit(size)
+
+class ExtractorProcess(QObject):
+    """Un proceso de mcpelauncher-extract para un APK, con su salida interpretada."""
+    
+    progress_changed = Signal(int, str)    # porcentaje 0-100 de este proceso, fase
+    process_finished = Signal(bool, str)   # éxito, mensaje de error
+    
+    COLLECT_RE = re.compile(r"Collecting files to extract file (\d+)/(\d+)")
+    EXTRACT_RE = re.compile(r"Extracting: (\d+)%")
+    COLLECT_SHARE = 10  # parte de la barra reservada a la recolección
+    PREFIXES = ("assets/", "res/raw/", "lib/x86_64/", "lib/x86/")  # lo que escribe mcpelauncher-extract
+    
+    def __init__(self, apk_path: str, dest_dir: Path, parent=None):
+        super().__init__(parent)
+        self.apk_path = apk_path
+        self.dest_dir = dest_dir
+        self.process = None
+        self.percent = 0
+        self.output_buffer = ""
+        self.output_tail = []  # últimas líneas, para los mensajes de error
+        self.done = False
+    
+    def start(self):
+        # Un solo canal: el extractor mezcla progreso y avisos entre stdout y stderr
+        self.process = QProcess(self)
+        self.process.setProcessChannelMode(QProcess.MergedChannels)
+        self.process.readyReadStandardOutput.connect(self.on_output)
+        self.process.finished.connect(self.on_finished)
+        self.process.errorOccurred.connect(self.on_error)
+        self.process.start(str(MCPELAUNCHER_EXTRACT), [self.apk_path, str(self.dest_dir)])
+    
+    def is_running(self) -> bool:
+        return self.process is not None and self.process.state() != QProcess.NotRunning
+    
+    def terminate(self):
+        if self.is_running():
+            self.process.terminate()
+    
+    def kill(self):
+        if self.is_running():
+            self.process.kill()
+    
+    def on_output(self):
+        """Lee la salida disponible; el extractor separa sus líneas con \\r o \\n."""
+        data = bytes(self.process.readAllStandardOutput()).decode("utf-8", errors="replace")
+        self.output_buffer += data.replace("\r", "\n")
+        *lines, self.output_buffer = self.output_buffer.split("\n")
+        for line in lines:
+            self.parse_line(line.strip())
+    
+    def parse_line(self, line: str):
+        """Convierte una línea del extractor en progreso."""
+        if not line:
+            return
+        
+        match = self.EXTRACT_RE.search(line)
+        if match:
+            share = 100 - self.COLLECT_SHARE
+            self.percent = max(self.percent, self.COLLECT_SHARE + int(match.group(1)) * share // 100)
+            self.progress_changed.emit(self.percent, "Extrayendo archivos...")
+            return
+        
+        match = self.COLLECT_RE.search(line)
+        if match:
+            current, total = int(match.group(1)), max(int(match.group(2)), 1)
+            self.percent = max(self.percent, current * self.COLLECT_SHARE // total)
+            self.progress_changed.emit(self.percent, f"Analizando archivos ({current}/{total})...")
+            return
+        
+        self.output_tail = (self.output_tail + [line])[-5:]
+    
+    def on_error(self, error):
+        if error == QProcess.FailedToStart and not self.done:
+            self.done = True
+            self.process_finished.emit(False, f"No se pudo ejecutar el extractor: {self.process.errorString()}")
+    
+    def on_finished(self, exit_code, exit_status):
+        self.on_output()
+        self.parse_line(self.output_buffer.strip())
+        self.output_buffer = ""
+        if self.done:
+            return
+        self.done = True
+        
+        if exit_status != QProcess.NormalExit:
+            self.process_finished.emit(False, "El extractor terminó de forma inesperada")
+        elif exit_code != 0:
+            self.process_finished.emit(False, "\n".join(self.output_tail) or "Error desconocido")
+        else:
+            self.percent = 100
+            self.process_finished.emit(True, "")
+
+class ExtractionJob(QObject):
+    """Extrae uno o varios APK (o un paquete dividido) en una versión sin bloquear la interfaz."""
+    
+    progress_changed = Signal(int, str)      # porcentaje 0-100, descripción de la fase
+    bytes_written = Signal(object)           # bytes escritos (estimados hasta terminar)
+    extraction_finished = Signal(bool, str)  # éxito, mensaje
+    
+    KILL_TIMEOUT_MS = 2000    # margen entre SIGTERM y SIGKILL al cancelar
+    
+    # Trabajos en curso: mantiene vivos los objetos aunque la página se reconstruya
+    _active = set()
+    
+    def __init__(self, apk_paths, dest_dir: Path, version_name: str, backend: str = None, parent=None):
+        super().__init__(parent)
+        # Lo que eligió el usuario (APK, varios APK o un paquete) y los APK que contiene
+        self.source_paths = [str(apk_paths)] if isinstance(apk_paths, (str, Path)) else [str(p) for p in apk_paths]
+        self.apk_paths = list(self.source_paths)
+        self.dest_dir = Path(dest_dir)
+        self.version_name = version_name
+        self.backend = backend or LauncherSettings().extract_backend()
+        self.use_cache = bool(LauncherSettings().get("apk_cache"))
+        self.digest = ""
+        self.processes = []
+        self.weights = []
+        self.staging_dir = None
+        self.thread = None
+        self.cancelled = False
+        self.percent = 0
+        self.expected_bytes = 0
+        self.done = False
+        self.success_message = ""
+        self.run_passes = False
+    
+    @classmethod
+    def active_jobs(cls) -> list:
+        """Extracciones todavía en marcha."""
+        return [job for job in cls._active if not job.done]
+    
+    @classmethod
+    def busy_dirs(cls) -> list:
+        """Carpetas en las que escriben las extracciones en marcha (destino y divisiones)."""
+        dirs = []
+        for job in cls.active_jobs():
+            dirs.append(job.dest_dir)
+            if job.staging_dir is not None:
+                dirs.append(job.staging_dir)
+        return dirs
+    
+    @staticmethod
+    def payload_prefixes(backend: str) -> tuple:
+        """Prefijos de lo que extrae cada backend (los mismos para estimar y para el progreso)."""
+        return PythonApkExtractor.PREFIXES if backend == "python" else ExtractorProcess.PREFIXES
+    
+    @staticmethod
+    def payload_size(apk_path: str, prefixes: tuple) -> int:
+        """Tamaño sin comprimir de lo que el extractor va a escribir (leído del índice del zip)."""
+        try:
+            with ApkBundle.open_zip(apk_path) as apk:
+                return sum(info.file_size for info in apk.infolist()
+                           if not info.is_dir() and info.filename.startswith(prefixes))
+        except (OSError, KeyError, zipfile.BadZipFile):
+            return 0
+    
+    def start(self):
+        """Lanza la extracción. El resultado llega siempre por extraction_finished."""
+        ExtractionJob._active.add(self)
+        try:
+            self.apk_paths = ApkBundle.expand(self.source_paths)
+        except (OSError, zipfile.BadZipFile) as e:
+            message = f"No se pudo leer el archivo: {e}"
+            QTimer.singleShot(0, lambda: self.finish(False, message))
+            return
+        
+        if self.use_cache:
+            self.start_digest()
+        else:
+            self.start_extraction()
+    
+    def prepare_dest(self) -> bool:
+        """Deja el directorio de destino vacío (la purga real ocurre en segundo plano)."""
+        try:
+            if self.dest_dir.exists():
+                TrashManager.shared().delete(self.dest_dir, undo=False)
+            self.dest_dir.mkdir(parents=True, exist_ok=True)
+            return True
+        except Exception as e:
+            # `e` deja de existir al salir del except: el mensaje se fija aquí
+            message = f"Error: {str(e)}"
+            QTimer.singleShot(0, lambda: self.finish(False, message))
+            return False
+    
+    def start_digest(self):
+        """Primera fase: identificar el APK para reutilizar una extracción anterior."""
+        self.thread = ApkDigestThread(self.source_paths)
+        self.thread.digest_progress.connect(
+            lambda done, total: self.set_progress(done * 100 // total if total else 0,
+                                                  "Calculando huella del APK..."))
+        self.thread.digest_finished.connect(self.on_digest_finished)
+        self.thread.start()
+        self.progress_changed.emit(0, "Calculando huella del APK...")
+    
+    def on_digest_finished(self, digest, error):
+        if self.cancelled:
+            self.finish(False, "Cancelado por el usuario")
+            return
+        if error:
+            print(f"No se pudo calcular el digest del APK ({error}); se extrae sin caché")
+        self.digest = digest
+        
+        tree = ApkCache.shared().lookup(digest)
+        if tree is None:
+            self.start_extraction()
+            return
+        
+        # APK ya conocido: enlazar el árbol guardado en lugar de extraer
+        if not self.prepare_dest():
+            return
+        self.percent = 0
+        self.thread = CopyThread(tree, self.dest_dir, hardlink=True)
+        self.thread.copy_progress.connect(self.on_builtin_progress)
+        self.thread.copy_finished.connect(self.on_materialized)
+        self.thread.start()
+        self.progress_changed.emit(0, "Reutilizando extracción anterior...")
+    
+    def on_materialized(self, success, message):
+        if success:
+            ApkCache.shared().touch(self.digest)
+            self.record_version(False, f"Versión {self.version_name} creada desde la caché de APK")
+        elif self.cancelled:
+            self.finish(False, "Cancelado por el usuario")
+        else:
+            # Caché dañada: extraer de verdad
+            print(f"No se pudo reutilizar la caché: {message}")
+            ApkCache.shared().remove(f"apk:{self.digest}")
+            self.digest = ""
+            self.start_extraction()
+    
+    def start_extraction(self):
+        """Extrae el APK con el backend configurado."""
+        self.percent = 0
+        if self.backend == "external" and not MCPELAUNCHER_EXTRACT.exists():
+            QTimer.singleShot(0, lambda: self.finish(False, "mcpelauncher-extract no encontrado en resources/"))
+            return
+        
+        if not self.prepare_dest():
+            return
+        
+        if self.backend == "python":
+            self.start_builtin()
+        elif any(ApkBundle.split_source(apk)[1] for apk in self.apk_paths):
+            self.start_unpack()
+        else:
+            self.start_external(self.apk_paths)
+    
+    def start_unpack(self):
+        """El extractor externo necesita archivos: sacar las divisiones del paquete."""
+        self.staging_dir = self.dest_dir.parent / f".{self.dest_dir.name}.splits"
+        self.thread = SplitUnpackThread(self.apk_paths, self.staging_dir)
+        self.thread.unpack_finished.connect(self.on_unpacked)
+        self.thread.start()
+        self.progress_changed.emit(0, "Leyendo el paquete...")
+    
+    def on_unpacked(self, success, message, paths):
+        if self.cancelled:
+            self.finish(False, "Cancelado por el usuario")
+        elif not success:
+            self.finish(False, message)
+        else:
+            self.start_external(paths)
+    
+    def start_external(self, apk_paths):
+        """Un proceso mcpelauncher-extract por APK, todos a la vez sobre el mismo destino."""
+        prefixes = ExtractorProcess.PREFIXES
+        self.weights = [max(self.payload_size(apk, prefixes), 1) for apk in apk_paths]
+        self.expected_bytes = sum(self.weights)
+        for apk_path in apk_paths:
+            process = ExtractorProcess(apk_path, self.dest_dir, self)
+            process.progress_changed.connect(self.on_external_progress)
+            process.process_finished.connect(self.on_external_finished)
+            self.processes.append(process)
+        for process in self.processes:
+            process.start()
+        self.progress_changed.emit(0, "Iniciando extractor...")
+    
+    def on_external_progress(self, _percent, phase):
+        # Progreso conjunto ponderado por el tamaño de cada APK
+        done = sum(weight * process.percent // 100 for weight, process in zip(self.weights, self.processes))
+        self.set_progress(done * 100 // self.expected_bytes, phase)
+        self.bytes_written.emit(done)
+    
+    def on_external_finished(self, success, message):
+        if self.done:
+            return
+        if not success:
+            if self.cancelled:
+                message = "Cancelado por el usuario"
+            else:
+                message = f"Error en extracción: {message}"
+            self.stop_processes()
+            self.finish(False, message)
+            return
+        if all(process.done for process in self.processes):
+            self.extraction_succeeded()
+    
+    def stop_processes(self):
+        """SIGTERM a los extractores y, si no responden, SIGKILL."""
+        for process in self.processes:
+            process.terminate()
+        QTimer.singleShot(self.KILL_TIMEOUT_MS, self.kill_processes)
+    
+    def kill_processes(self):
+        for process in self.processes:
+            process.kill()
+    
+    def extraction_succeeded(self):
+        """Comprueba el resultado; la caché y el registro se hacen en un hilo."""
+        if not (self.dest_dir / PythonApkExtractor.REQUIRED_LIB).is_file():
+            self.finish(False, "Error en extracción: libminecraftpe.so (x86_64) no se extrajo; "
+                               "el APK no es compatible con el launcher")
+            return
+        self.record_version(bool(self.use_cache and self.digest),
+                            f"Versión {self.version_name} extraída exitosamente", run_passes=True)
+    
+    def record_version(self, store_in_cache: bool, message: str, run_passes: bool = False):
+        """Guarda en la caché (enlaces duros), mide y registra la versión sin bloquear la interfaz."""
+        self.success_message = message
+        self.run_passes = run_passes
+        self.progress_changed.emit(100, "Guardando en la caché..." if store_in_cache else "Registrando la versión...")
+        self.thread = VersionRecordThread(self, store_in_cache)
+        self.thread.record_finished.connect(self.on_recorded)
+        self.thread.start()
+    
+    def on_recorded(self, size):
+        self.bytes_written.emit(size)
+        self.set_progress(100, "Completado")
+        self.finish(True, self.success_message)
+        if self.run_passes:
+            self.start_passes()
+    
+    def start_passes(self):
+        """Pasadas posteriores en segundo plano, una tras otra sobre el mismo árbol."""
+        dedupe = LauncherSettings().get("dedupe_versions")
+        if LauncherSettings().get("slim_versions"):
+            slim_thread = SlimThread(self.version_name)
+            if dedupe:
+                dest_dir = self.dest_dir
+                slim_thread.slim_finished.connect(lambda *_: DedupeThread([dest_dir]).start())
+            slim_thread.start()
+        elif dedupe:
+            DedupeThread([self.dest_dir]).start()
+    
+    def start_builtin(self):
+        """Extrae con el backend integrado en un hilo de trabajo (todas las divisiones a la vez)."""
+        self.thread = PythonExtractThread(self.apk_paths, self.dest_dir,
+                                          LauncherSettings().get("extract_threads") or 0)
+        self.thread.extract_progress.connect(self.on_builtin_progress)
+        self.thread.extract_finished.connect(self.on_builtin_finished)
+        self.thread.start()
+        self.progress_changed.emit(0, "Extrayendo archivos...")
+    
+    def on_builtin_progress(self, done, total):
+        self.set_progress(done * 100 // total if total else 0, "Extrayendo archivos...")
+        self.bytes_written.emit(done)
+    
+    def on_builtin_finished(self, success, message):
+        if success:
+            self.extraction_succeeded()
+        elif self.cancelled:
+            self.finish(False, "Cancelado por el usuario")
+        else:
+            self.finish(False, message)
+    
+    def set_progress(self, percent: int, phase: str):
+        """Emite el progreso sin retroceder la barra."""
+        self.percent = max(self.percent, min(percent, 100))
+        self.progress_changed.emit(self.percent, phase)
+    
+    def cancel(self):
+        """Cancela la extracción en la fase en la que esté."""
+        if self.done:
+            return
+        self.cancelled = True
+        if self.thread and self.thread.isRunning():
+            self.thread.cancel()
+        elif any(process.is_running() for process in self.processes):
+            self.stop_processes()
+        else:
+            self.finish(False, "Cancelado por el usuario")
+    
+    def finish(self, success: bool, message: str):
+        """Emite el resultado una sola vez y limpia lo extraído a medias."""
+        if self.done:
+            return
+        self.done = True
+        if self.staging_dir is not None:
+            shutil.rmtree(self.staging_dir, ignore_errors=True)
+        if not success and self.dest_dir.exists():
+            try:
+                TrashManager.shared().delete(self.dest_dir, undo=False)
+            except Exception as e:
+                print(f"No se pudo limpiar {self.dest_dir}: {e}")
+        self.extraction_finished.emit(success, message)
+        ExtractionJob._active.discard(self)
+
+# ============================================================================
+# VERSIONES ALIGERADAS
+# ============================================================================
+
+class VersionSlimmer:
+    """Retira de una versión lo que el cliente x86_64 nunca carga, de forma reversible.
+    
+    Se retiran las bibliotecas de otras ABIs (lib/x86, lib/arm64-v8a...) y los
+    recursos res/ que no son res/raw ni el icono (solo los escribe el backend
+    integrado).
+    Todo se guarda antes en un tar.xz dentro de la propia versión, así que
+    restaurar no necesita el APK y la versión sigue siendo reversible aunque
+    se exporte.
+    """
+    
+    ARCHIVE_DIR = ".boxcraft-slim"
+    KEPT_ABI = "x86_64"
+    XZ_PRESET = 6
+    
+    @classmethod
+    def archive_dir(cls, version_path: Path) -> Path:
+        return Path(version_path) / cls.ARCHIVE_DIR
+    
+    @classmethod
+    def is_slim(cls, version_path: Path) -> bool:
+        return any(cls.archive_dir(version_path).glob("*.tar.xz"))
+    
+    @classmethod
+    def candidates(cls, version_path: Path) -> list:
+        """Archivos retirables: [(ruta relativa, tamaño, nlink)]."""
+        version_path = Path(version_path)
+        roots = []
+        lib_dir = version_path / "lib"
+        if lib_dir.is_dir():
+            roots += [d for d in lib_dir.iterdir() if d.is_dir() and d.name != cls.KEPT_ABI]
+        res_dir = version_path / "res"
+        if res_dir.is_dir():
+            roots += [d for d in res_dir.iterdir() if d.is_dir() and d.name != "raw"]
+        
+        files = []
+        for root in roots:
+            for dirpath, _, filenames in os.walk(root):
+                for name in filenames:
+                    # El icono de la app lo puede usar el cliente para su ventana
+                    if name.startswith("icon"):
+                        continue
+                    path = os.path.join(dirpath, name)
+                    st = os.lstat(path)
+                    files.append((os.path.relpath(path, version_path), st.st_size, st.st_nlink))
+        return files
+    
+    @classmethod
+    def slim(cls, version_path: Path, cancel_check=None) -> dict:
+        """Archiva y borra los archivos retirables. Retorna las cifras del ahorro."""
+        version_path = Path(version_path)
+        files = cls.candidates(version_path)
+        result = {'files': len(files), 'removed_bytes': sum(size for _, size, _ in files),
+                  'freed_bytes': 0, 'archive_bytes': 0}
+        if not files:
+            return result
+        
+        archive_dir = cls.archive_dir(version_path)
+        archive_dir.mkdir(exist_ok=True)
+        archive = archive_dir / f"{time.strftime('%Y%m%d-%H%M%S')}.tar.xz"
+        tmp_archive = archive.with_name(archive.name + ".tmp")
+        try:
+            with tarfile.open(tmp_archive, "w:xz", preset=cls.XZ_PRESET) as tar:
+                for relative, _, _ in files:
+                    if cancel_check and cancel_check():
+                        raise InterruptedError("Cancelado por el usuario")
+                    tar.add(version_path / relative, arcname=relative, recursive=False)
+            # Comprobar el archivo antes de borrar nada
+            with tarfile.open(tmp_archive, "r:xz") as tar:
+                if len(tar.getmembers()) != len(files):
+                    raise OSError("El archivo de respaldo está incompleto")
+            os.replace(tmp_archive, archive)
+        except BaseException:
+            tmp_archive.unlink(missing_ok=True)
+            raise
+        
+        for relative, size, nlink in files:
+            os.unlink(version_path / relative)
+            # Los enlaces compartidos (caché de APK, almacén de objetos) no liberan disco
+            if nlink == 1:
+                result['freed_bytes'] += size
+        
+        # Quitar los directorios que quedaron vacíos
+        for relative in sorted({os.path.dirname(rel) for rel, _, _ in files}, key=len, reverse=True):
+            directory = version_path / relative
+            while directory != version_path:
+                try:
+                    directory.rmdir()
+                except OSError:
+                    break
+                directory = directory.parent
+        
+        result['archive_bytes'] = archive.stat().st_size
+        result['freed_bytes'] = max(result['freed_bytes'] - result['archive_bytes'], 0)
+        return result
+    
+    @classmethod
+    def restore(cls, version_path: Path) -> int:
+        """Devuelve a su sitio todo lo retirado. Retorna los archivos restaurados."""
+        version_path = Path(version_path)
+        archive_dir = cls.archive_dir(version_path)
+        restored = 0
+        for archive in sorted(archive_dir.glob("*.tar.xz")):
+            with tarfile.open(archive, "r:xz") as tar:
+                members = [m for m in tar.getmembers()
+                           if m.isfile() and PythonApkExtractor.safe_target(version_path, m.name)]
+                if hasattr(tarfile, "data_filter"):
+                    tar.extractall(version_path, members=members, filter="data")
+                else:
+                    tar.extractall(version_path, members=members)
+                restored += len(members)
+            archive.unlink()
+        shutil.rmtree(archive_dir, ignore_errors=True)
+        return restored
+
+class SlimThread(BackgroundThread):
+    """Aligera o restaura una versión en segundo plano."""
+    
+    slim_finished = Signal(bool, str, dict)
+    
+    def __init__(self, version_name: str, restore: bool = False, parent=None):
+        super().__init__(parent)
+        self.version_name = version_name
+        self.restore = restore
+    
+    def run(self):
+        version_path = VERSIONS_DIR / self.version_name
+        try:
+            if self.restore:
+                files = VersionSlimmer.restore(version_path)
+                result = {'files': files}
+                VersionIndex.shared().update(self.version_name, slim=None,
+                                             size=parallel_tree_size(version_path))
+                message = f"{files} archivos restaurados en {self.version_name}"
+            else:
+                result = VersionSlimmer.slim(version_path, cancel_check=lambda: self.cancelled)
+                if result['files']:
+                    VersionIndex.shared().update(self.version_name, size=parallel_tree_size(version_path),
+                                                 slim=dict(result, at=time.time()))
+                message = (f"{result['files']} archivos retirados de {self.version_name}"
+                           if result['files'] else f"{self.version_name} no tiene nada que retirar")
+            self.slim_finished.emit(True, message, result)
+        except InterruptedError as e:
+            self.slim_finished.emit(False, str(e), {})
+        except Exception as e:
+            self.slim_finished.emit(False, f"Error: {str(e)}", {})
+
+# ============================================================================
+# ARCHIVOS DE EXPORTACIÓN
+# ============================================================================
+
+class CountingReader(io.RawIOBase):
+    """Envuelve un archivo abierto y cuenta los bytes que se leen de él.
+    
+    Con `digest` (un objeto de hashlib) además calcula el hash de lo leído.
+    """
+    
+    def __init__(self, fileobj, on_read, digest=None):
+        super().__init__()
+        self.fileobj = fileobj
+        self.on_read = on_read
+        self.digest = digest
+    
+    def readable(self) -> bool:
+        return True
+    
+    def read(self, size: int = -1) -> bytes:
+        data = self.fileobj.read(size)
+        if data:
+            self.on_read(len(data))
+            if self.digest is not None:
+                self.digest.update(data)
+        return data
+
+class ParallelBlockWriter(io.RawIOBase):
+    """Comprime en paralelo bloques independientes y los escribe en orden.
+    
+    Cada bloque es un miembro gzip (o un flujo xz) completo; la concatenación
+    es un archivo válido para gzip -d / xz -d y para tarfile. zlib y lzma
+    liberan el GIL, así que los bloques escalan con los núcleos.
+    
+    Los bytes se etiquetan con set_mode(): pasar de comprimir a guardar tal
+    cual cierra el bloque en curso, y el tamaño comprimido de cada bloque se
+    reparte entre las etiquetas que contiene para el informe de ahorro.
+    """
+    
+    def __init__(self, raw, compress_block, block_size: int, threads: int):
+        super().__init__()
+        self.raw = raw
+        self.compress_block = compress_block  # (bloque, guardar_sin_comprimir) -> bytes
+        self.block_size = block_size
+        self.buffer = bytearray()
+        self.position = 0
+        self.label = None
+        self.store = False
+        self.segments = []  # [etiqueta, bytes] del búfer en curso
+        self.archived = collections.Counter()  # etiqueta -> bytes escritos (estimados)
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=threads)
+        self.pending = collections.deque()
+        self.max_pending = threads * 2  # acota la memoria en vuelo
+    
+    def writable(self) -> bool:
+        return True
+    
+    def tell(self) -> int:
+        """Posición en el flujo sin comprimir (la que espera tarfile)."""
+        return self.position
+    
+    def set_mode(self, label, store: Optional[bool] = None):
+        """Etiqueta los bytes siguientes; store=None mantiene el modo actual."""
+        if store is not None and store != self.store:
+            if self.buffer:
+                self._submit(len(self.buffer))
+            self.store = store
+        self.label = label
+    
+    def write(self, data) -> int:
+        size = len(data)
+        self.buffer += data
+        self.position += size
+        if self.segments and self.segments[-1][0] == self.label:
+            self.segments[-1][1] += size
+        else:
+            self.segments.append([self.label, size])
+        while len(self.buffer) >= self.block_size:
+            self._submit(self.block_size)
+        return size
+    
+    def _submit(self, size: int):
+        block = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        segments = []
+        remaining = size
+        while remaining:
+            label, count = self.segments[0]
+            take = min(count, remaining)
+            segments.append((label, take))
+            remaining -= take
+            if take == count:
+                self.segments.pop(0)
+            else:
+                self.segments[0][1] -= take
+        self.pending.append((self.pool.submit(self.compress_block, block, self.store), segments, size))
+        while len(self.pending) > self.max_pending:
+            self._write_next()
+    
+    def _write_next(self):
+        future, segments, size = self.pending.popleft()
+        data = future.result()
+        self.raw.write(data)
+        for label, count in segments:
+            self.archived[label] += len(data) * count / size
+    
+    def close(self):
+        """Comprime lo que queda y espera a todos los bloques."""
+        if self.closed:
+            return
+        try:
+            if self.buffer:
+                self._submit(len(self.buffer))
+            while self.pending:
+                self._write_next()
+        finally:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+            super().close()
+    
+    def discard(self):
+        """Abandona los bloques pendientes (exportación cancelada o fallida)."""
+        self.buffer.clear()
+        self.pending.clear()
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        super().close()
+
+class CompressionPolicy:
+    """Decide por archivo si se comprime o se guarda tal cual.
+    
+    La extensión resuelve los casos conocidos (PNG, OGG, ZIP y las tablas .ldb
+    de LevelDB ya vienen comprimidos); para el resto se comprime una muestra
+    con zlib rápido y, si apenas encoge, el archivo se guarda sin comprimir.
+    """
+    
+    # (clase, extensiones, guardar sin comprimir; None = decidir con una muestra)
+    CLASSES = (
+        ("imágenes", {".png", ".jpg", ".jpeg", ".webp"}, True),
+        ("audio", {".ogg", ".fsb", ".mp3", ".m4a"}, True),
+        ("comprimidos", {".zip", ".mcpack", ".mcaddon", ".mcworld", ".mctemplate",
+                         ".apk", ".gz", ".xz", ".zst", ".7z"}, True),
+        ("leveldb", {".ldb"}, True),
+        ("bibliotecas", {".so"}, None),
+        ("texto", {".json", ".lang", ".txt", ".material", ".xml", ".js",
+                   ".mcfunction", ".properties", ".glsl", ".fragment", ".vertex"}, False),
+    )
+    SAMPLE_SIZE = 64 * 1024
+    MIN_SAMPLE_FILE = 4096  # los archivos pequeños se comprimen sin probar
+    MAX_RATIO = 0.9         # si la muestra no baja de esto, no compensa
+    
+    def __init__(self):
+        self.by_extension = {ext: (label, store) for label, exts, store in self.CLASSES for ext in exts}
+    
+    def classify(self, path, size: int) -> Tuple[str, bool]:
+        """Clase del archivo y si se guarda sin comprimir."""
+        label, store = self.by_extension.get(os.path.splitext(str(path))[1].lower(), ("otros", None))
+        if store is None:
+            store = self.incompressible(path, size)
+        return label, store
+    
+    def incompressible(self, path, size: int) -> bool:
+        """Prueba con una muestra del centro del archivo."""
+        if size < self.MIN_SAMPLE_FILE:
+            return False
+        try:
+            with open(path, 'rb') as f:
+                if size > self.SAMPLE_SIZE * 2:
+                    f.seek(size // 2 - self.SAMPLE_SIZE // 2)
+                sample = f.read(self.SAMPLE_SIZE)
+        except OSError:
+            return False
+        return len(zlib.compress(sample, 1)) > len(sample) * self.MAX_RATIO
+
+class BcaArchive:
+    """Formato de exportación indexado (.bca) con acceso directo a cada miembro.
+    
+    Estructura: cabecera MAGIC, los datos de cada archivo en tramas de hasta
+    CHUNK_SIZE comprimidas por separado (deflate o guardadas tal cual), un
+    índice JSON comprimido con nombre, tipo, tamaño, desplazamiento, longitud
+    y CRC32 de cada miembro y, al final, un trailer de tamaño fijo que apunta
+    al índice. Listar el contenido o restaurar un solo mundo solo lee el
+    trailer, el índice y las tramas de lo que se pide.
+    """
+    
+    MAGIC = b"BCA1"
+    HEADER = MAGIC + b"\0\0\0\0"
+    TRAILER = struct.Struct("<QQI4s")  # desplazamiento, longitud y CRC del índice, MAGIC
+    FRAME = struct.Struct("<II")       # bytes guardados, bytes originales
+    CHUNK_SIZE = 4 << 20
+    
+    @classmethod
+    def read_index(cls, f) -> list:
+        """Lee el índice a partir del trailer (f es un archivo binario abierto)."""
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        if end < len(cls.HEADER) + cls.TRAILER.size:
+            raise ValueError("Archivo .bca incompleto")
+        f.seek(end - cls.TRAILER.size)
+        offset, length, crc, magic = cls.TRAILER.unpack(f.read(cls.TRAILER.size))
+        if magic != cls.MAGIC or offset + length > end - cls.TRAILER.size:
+            raise ValueError("Archivo .bca sin índice (¿exportación interrumpida?)")
+        f.seek(offset)
+        data = f.read(length)
+        if zlib.crc32(data) != crc:
+            raise ValueError("El índice del archivo .bca está dañado")
+        return json.loads(zlib.decompress(data))
+    
+    @classmethod
+    def list_members(cls, file_path) -> list:
+        with open(file_path, 'rb') as f:
+            return cls.read_index(f)
+
+class BcaMemberReader(io.RawIOBase):
+    """Lee un miembro de un .bca trama a trama, comprobando su CRC al final."""
+    
+    def __init__(self, f, entry: dict, on_read=None):
+        super().__init__()
+        self.f = f
+        self.entry = entry
+        self.on_read = on_read
+        self.position = entry['offset']
+        self.end = entry['offset'] + entry['length']
+        self.chunk = b""
+        self.chunk_pos = 0
+        self.crc = 0
+    
+    def readable(self) -> bool:
+        return True
+    
+    def _next_chunk(self) -> bool:
+        if self.position >= self.end:
+            if self.crc != self.entry['crc']:
+                raise ValueError(f"CRC incorrecto en {self.entry['name']}")
+            return False
+        self.f.seek(self.position)
+        stored, original = BcaArchive.FRAME.unpack(self.f.read(BcaArchive.FRAME.size))
+        data = self.f.read(stored)
+        self.position += BcaArchive.FRAME.size + stored
+        if self.on_read:
+            self.on_read(BcaArchive.FRAME.size + stored)
+        if self.entry['method'] == "deflate":
+            data = zlib.decompress(data, -15)
+        if len(data) != original:
+            raise ValueError(f"Trama dañada en {self.entry['name']}")
+        self.crc = zlib.crc32(data, self.crc)
+        self.chunk, self.chunk_pos = data, 0
+        return True
+    
+    def read(self, size: int = -1) -> bytes:
+        parts = []
+        while size != 0:
+            if self.chunk_pos >= len(self.chunk) and not self._next_chunk():
+                break
+            available = len(self.chunk) - self.chunk_pos
+            take = available if size < 0 else min(size, available)
+            parts.append(self.chunk[self.chunk_pos:self.chunk_pos + take])
+            self.chunk_pos += take
+            if size > 0:
+                size -= take
+        return b"".join(parts)
+
+class BcaReader:
+    """Lector de .bca con la interfaz de tarfile que usa ArchiveImporter.
+    
+    Iterar devuelve TarInfo construidos desde el índice, sin leer datos;
+    extractfile() salta directamente a las tramas del miembro.
+    """
+    
+    TYPES = {'file': tarfile.REGTYPE, 'dir': tarfile.DIRTYPE,
+             'link': tarfile.LNKTYPE, 'symlink': tarfile.SYMTYPE}
+    
+    def __init__(self, file_path, on_read=None):
+        self.f = open(file_path, 'rb')
+        self.on_read = on_read
+        try:
+            self.entries = {entry['name']: entry for entry in BcaArchive.read_index(self.f)}
+        except BaseException:
+            self.f.close()
+            raise
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def close(self):
+        self.f.close()
+    
+    def __iter__(self):
+        for entry in self.entries.values():
+            info = tarfile.TarInfo(entry['name'])
+            info.type = self.TYPES[entry['type']]
+            info.size = entry.get('size', 0)
+            info.mode = entry.get('mode', 0o644)
+            info.mtime = entry.get('mtime', 0)
+            info.linkname = entry.get('link', "")
+            yield info
+    
+    def stored_bytes(self, names) -> int:
+        """Bytes que hay que leer para extraer esos miembros."""
+        return sum(self.entries[name].get('length', 0) for name in names if name in self.entries)
+    
+    def extractfile(self, member: tarfile.TarInfo):
+        return BcaMemberReader(self.f, self.entries[member.name], self.on_read)
+
+class ExportCompression:
+    """Compresores de exportación intercambiables.
+    
+    gzip y xz se comprimen por bloques en paralelo; zstd usa el multihilo
+    nativo del módulo zstandard si está instalado. Al importar el formato se
+    detecta por los bytes mágicos, no por la extensión.
+    """
+    
+    # formato -> (extensión, bytes mágicos, rango de niveles)
+    FORMATS = {
+        'gzip': (".tar.gz", b"\x1f\x8b", (1, 9)),
+        'zstd': (".tar.zst", b"\x28\xb5\x2f\xfd", (1, 19)),
+        'xz': (".tar.xz", b"\xfd7zXZ\x00", (0, 9)),
+        'bca': (".bca", BcaArchive.MAGIC, (1, 9)),
+        'none': (".tar", None, (0, 0)),
+    }
+    # Bloques más grandes para xz: su diccionario es mucho mayor que la ventana de gzip
+    BLOCK_SIZES = {'gzip': 4 << 20, 'xz': 24 << 20}
+    
+    @classmethod
+    def available(cls) -> list:
+        return [fmt for fmt in cls.FORMATS if fmt != 'zstd' or zstandard is not None]
+    
+    @classmethod
+    def extension(cls, fmt: str) -> str:
+        return cls.FORMATS.get(fmt, cls.FORMATS['gzip'])[0]
+    
+    @classmethod
+    def clamp_level(cls, fmt: str, level: int) -> int:
+        low, high = cls.FORMATS[fmt][2]
+        return max(low, min(high, int(level)))
+    
+    @staticmethod
+    def thread_count(threads: int = 0) -> int:
+        return threads if threads and threads > 0 else (os.cpu_count() or 2)
+    
+    @staticmethod
+    def _xz_varint(value: int) -> bytes:
+        out = bytearray()
+        while value >= 0x80:
+            out.append(value & 0x7f | 0x80)
+            value >>= 7
+        out.append(value)
+        return bytes(out)
+    
+    @classmethod
+    def xz_stored(cls, block: bytes) -> bytes:
+        """Flujo xz con el bloque guardado tal cual (tramas LZMA2 sin comprimir).
+        
+        lzma no tiene un filtro "sin compresión" (preset=0 sigue comprimiendo),
+        pero LZMA2 admite tramas sin comprimir: se escribe el flujo a mano con
+        comprobación CRC32.
+        """
+        def crc(data):
+            return struct.pack('<I', zlib.crc32(data))
+        flags = b"\x00\x01"  # comprobación CRC32
+        header = b"\xfd7zXZ\x00" + flags + crc(flags)
+        # Cabecera de bloque: 12 bytes, un filtro LZMA2 (0x21) con diccionario mínimo
+        block_header = bytes([12 // 4 - 1, 0x00, 0x21, 0x01, 0x00]) + b"\x00" * 3
+        block_header += crc(block_header)
+        chunks = bytearray()
+        for offset in range(0, len(block), 1 << 16):
+            piece = block[offset:offset + (1 << 16)]
+            chunks += bytes([0x01 if offset == 0 else 0x02]) + struct.pack('>H', len(piece) - 1) + piece
+        chunks.append(0x00)
+        unpadded = len(block_header) + len(chunks) + 4
+        data = block_header + bytes(chunks) + b"\x00" * (-len(chunks) % 4) + crc(block)
+        index = b"\x00" + cls._xz_varint(1) + cls._xz_varint(unpadded) + cls._xz_varint(len(block))
+        index += b"\x00" * (-len(index) % 4)
+        index += crc(index)
+        backward = struct.pack('<I', len(index) // 4 - 1) + flags
+        return header + data + index + crc(backward) + backward + b"YZ"
+    
+    @classmethod
+    def from_settings(cls) -> Tuple[str, int, int]:
+        """Formato, nivel e hilos elegidos en la configuración."""
+        settings = LauncherSettings()
+        fmt = settings.get("export_format")
+        if fmt not in cls.available():
+            fmt = 'gzip'
+        return fmt, cls.clamp_level(fmt, settings.get("export_level")), cls.thread_count(settings.get("export_threads"))
+    
+    @classmethod
+    def detect(cls, file_path) -> str:
+        """Formato de un archivo exportado según su cabecera."""
+        with open(file_path, 'rb') as f:
+            head = f.read(512)
+        for fmt, (_, magic, _) in cls.FORMATS.items():
+            if magic and head.startswith(magic):
+                return fmt
+        if head[257:262] == b"ustar":
+            return 'none'
+        if head.startswith(b"BZh"):
+            return 'bzip2'
+        raise ValueError("Formato de archivo no reconocido")
+    
+    @classmethod
+    @contextmanager
+    def writer(cls, file_path, fmt: str = 'gzip', level: int = 6, threads: int = 0):
+        """Archivo de salida comprimido donde escribir el flujo tar."""
+        if fmt == 'zstd' and zstandard is None:
+            raise RuntimeError("El módulo zstandard no está instalado")
+        if fmt == 'bca':
+            raise ValueError("Los .bca los escribe ExportWriter.write_bca")
+        level = cls.clamp_level(fmt, level)
+        threads = cls.thread_count(threads)
+        raw = open(file_path, 'wb')
+        stream = None
+        try:
+            if fmt == 'gzip':
+                stream = ParallelBlockWriter(
+                    raw, lambda block, store: gzip.compress(block, compresslevel=0 if store else level, mtime=0),
+                    cls.BLOCK_SIZES['gzip'], threads)
+            elif fmt == 'xz':
+                stream = ParallelBlockWriter(
+                    raw, lambda block, store: cls.xz_stored(block) if store else
+                    lzma.compress(block, format=lzma.FORMAT_XZ, preset=level),
+                    cls.BLOCK_SIZES['xz'], threads)
+            elif fmt == 'zstd':
+                stream = zstandard.ZstdCompressor(level=level, threads=threads).stream_writer(raw, closefd=False)
+            else:
+                stream = raw
+            yield stream
+            if stream is not raw:
+                stream.close()
+        except BaseException:
+            if isinstance(stream, ParallelBlockWriter):
+                stream.discard()
+            raise
+        finally:
+            raw.close()
+    
+    @classmethod
+    @contextmanager
+    def open_archive(cls, file_path, on_read=None):
+        """Abre un archivo exportado para leerlo, sea cual sea su formato.
+        
+        Los .bca se leen con BcaReader (acceso directo por índice). Para tar,
+        la descompresión la hacen GzipFile/LZMAFile y no el modo "r|" de
+        tarfile, que se detiene tras el primer miembro gzip o flujo xz.
+        `on_read` recibe los bytes leídos del archivo (para el progreso).
+        """
+        fmt = cls.detect(file_path)
+        if fmt == 'bca':
+            with BcaReader(file_path, on_read) as reader:
+                yield reader
+            return
+        if fmt == 'zstd' and zstandard is None:
+            raise RuntimeError("El archivo usa zstd y el módulo zstandard no está instalado")
+        with open(file_path, 'rb') as raw:
+            source = CountingReader(raw, on_read) if on_read else raw
+            if fmt == 'gzip':
+                stream = gzip.GzipFile(fileobj=source, mode='rb')
+            elif fmt == 'xz':
+                stream = lzma.LZMAFile(source)
+            elif fmt == 'bzip2':
+                stream = bz2.BZ2File(source)
+            elif fmt == 'zstd':
+                stream = zstandard.ZstdDecompressor().stream_reader(source, read_across_frames=True)
+            else:
+                stream = source
+            try:
+                with tarfile.open(fileobj=stream, mode="r|") as tar:
+                    yield tar
+            finally:
+                if stream is not source:
+                    stream.close()
+
+class VersionReference:
+    """Exportar una versión como referencia a su APK en lugar de sus archivos.
+    
+    La exportación guarda el digest del APK, el extractor que la creó y la
+    versión del juego; al importar la versión se reconstruye desde la caché
+    de APK (enlaces duros), desde el APK original si el launcher lo conoce
+    o desde el APK que elija el usuario, comprobando que el digest coincide.
+    """
+    
+    @staticmethod
+    def for_version(version_name: str) -> Optional[dict]:
+        """Referencia de una versión instalada; None si no se conoce su APK."""
+        entry = VersionIndex.shared().get(f"version:{version_name}") or {}
+        if not entry.get('apk_digest'):
+            return None
+        extractor = entry.get('extractor') or "external"
+        return {
+            'apk_digest': entry['apk_digest'],
+            'extractor': extractor,
+            'extractor_version': PythonApkExtractor.VERSION if extractor == PythonApkExtractor.NAME else None,
+            'app_version': APP_VERSION,
+            'game_version': entry.get('game_version'),
+            'version_code': entry.get('version_code'),
+            'slim': bool(entry.get('slim')),
+            'size': entry.get('size') or 0,
+        }
+    
+    @staticmethod
+    def known_apk(digest: str) -> Optional[list]:
+        """APK de este digest que el launcher ya calculó y sigue sin cambios."""
+        cache = ApkCache.shared()
+        with cache.lock:
+            stamps = [(key[len("stamp:"):], value) for key, value in cache.entries.items()
+                      if key.startswith("stamp:") and value.get('digest') == digest]
+        for path, value in stamps:
+            if cache.file_stamp(path) == value.get('stamp'):
+                return [path]
+        return None
+    
+    @classmethod
+    def available(cls, reference: dict) -> bool:
+        """¿Se puede reconstruir sin pedirle nada al usuario?"""
+        digest = reference['apk_digest']
+        return ApkCache.shared().lookup(digest) is not None or cls.known_apk(digest) is not None
+    
+    @classmethod
+    def rebuild(cls, reference: dict, dest: Path, apk_paths=None,
+                progress_callback=None, cancel_check=None) -> dict:
+        """Reconstruye la versión en `dest`; retorna {'source', 'extractor', 'slim'}."""
+        digest = reference['apk_digest']
+        cache = ApkCache.shared()
+        tree = cache.lookup(digest)
+        if tree is not None:
+            FastCopier(hardlink=True, progress_callback=progress_callback,
+                       cancel_check=cancel_check).copy_tree(tree, dest)
+            cache.touch(digest)
+            result = {'source': "cache", 'extractor': reference.get('extractor'), 'slim': None}
+        else:
+            apk_paths = apk_paths or cls.known_apk(digest)
+            if not apk_paths:
+                raise ValueError("La exportación solo guarda una referencia al APK y no está disponible; "
+                                 "elige el APK original o importa una exportación completa")
+            if cache.hash_apks(apk_paths, cancel_check=cancel_check) != digest:
+                raise ValueError("El APK elegido no es el de la exportación")
+            PythonApkExtractor(progress_callback=progress_callback, cancel_check=cancel_check).extract(
+                ApkBundle.expand(apk_paths), dest)
+            if LauncherSettings().get("apk_cache"):
+                cache.store(digest, dest, apk_paths)
+            result = {'source': "apk", 'extractor': PythonApkExtractor.NAME, 'slim': None}
+        if reference.get('slim'):
+            result['slim'] = dict(VersionSlimmer.slim(dest, cancel_check=cancel_check), at=time.time())
+        return result
+
+class ExportManifest(JsonIndex):
+    """Manifiesto de la última exportación de cada conjunto de raíces.
+    
+    Cada archivo se guarda como [tipo, tamaño, mtime_ns, sha256]. Con él una
+    exportación incremental (respecto a la última) o diferencial (respecto a
+    la última completa) incluye solo lo nuevo o modificado y una lista de
+    borrados. Tamaño y mtime iguales bastan para dar un archivo por intacto;
+    si solo cambió el mtime se compara el hash antes de volver a guardarlo.
+    """
+    
+    MEMBER = "./export-manifest.json"   # cabecera dentro de cada exportación
+    KINDS = ("full", "incremental", "differential")
+    HASH_CHUNK = 1 << 20
+    
+    _shared = None
+    
+    @classmethod
+    def shared(cls) -> "ExportManifest":
+        if cls._shared is None:
+            cls._shared = cls(EXPORT_MANIFEST_FILE)
+        return cls._shared
+    
+    @staticmethod
+    def key_for(roots: list, reference: Optional[dict] = None) -> str:
+        key = "|".join(f"{arcname}={root}" for root, arcname in roots)
+        return f"{key}|apk={reference['apk_digest']}" if reference else key
+    
+    @classmethod
+    def file_hash(cls, path) -> str:
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(cls.HASH_CHUNK)
+                if not chunk:
+                    break
+                sha.update(chunk)
+        return sha.hexdigest()
+    
+    def base_for(self, roots: list, kind: str, reference: Optional[dict] = None) -> Optional[dict]:
+        """Exportación de la que parte una incremental o diferencial (None si no hay)."""
+        entry = self.get(self.key_for(roots, reference))
+        if not entry or kind == "full":
+            return None
+        if kind == "incremental":
+            return entry.get('last') or entry.get('full')
+        return entry.get('full')
+    
+    def plan(self, roots: list, kind: str = "full", cancel_check=None, reference: Optional[dict] = None) -> dict:
+        """Decide qué entra en la exportación.
+        
+        Retorna la cabecera (id, tipo, base, borrados y referencia al APK),
+        la tabla nueva, los miembros intactos que se omiten y los bytes a
+        leer. Sin exportación base, una incremental o diferencial se hace
+        completa.
+        """
+        base = self.base_for(roots, kind, reference)
+        base_files = base['files'] if base else {}
+        files = {}
+        skip = set()
+        total = 0
+        for root, arcname in roots:
+            for path, name in ExportWriter.walk(root, arcname):
+                if cancel_check and cancel_check():
+                    raise InterruptedError("Exportación cancelada")
+                try:
+                    st = os.lstat(path)
+                except OSError:
+                    continue
+                if stat.S_ISDIR(st.st_mode):
+                    files[name] = ["d", 0, 0, None]
+                    continue
+                if stat.S_ISLNK(st.st_mode):
+                    files[name] = ["l", 0, 0, os.readlink(path)]
+                    continue
+                if not stat.S_ISREG(st.st_mode):
+                    continue
+                previous = base_files.get(name)
+                digest = None
+                if previous and previous[0] == "f" and previous[1] == st.st_size:
+                    if previous[2] == st.st_mtime_ns:
+                        digest = previous[3]
+                    elif previous[3]:
+                        # Solo cambió el mtime: se guarda otra vez si cambió el contenido
+                        try:
+                            digest = self.file_hash(path)
+                        except OSError:
+                            digest = None
+                        if digest != previous[3]:
+                            digest = None
+                files[name] = ["f", st.st_size, st.st_mtime_ns, digest]
+                if digest is not None:
+                    skip.add(name)
+                else:
+                    total += st.st_size
+        
+        header = {
+            'schema': 1,
+            'id': os.urandom(8).hex(),
+            'kind': kind if base else "full",
+            'base': base['id'] if base else None,
+            'created': time.time(),
+            'deleted': sorted(name for name in base_files if name not in files),
+        }
+        if reference:
+            header['reference'] = reference
+        return {'header': header, 'files': files, 'skip': skip, 'bytes': total}
+    
+    def record(self, roots: list, plan: dict, digests: dict):
+        """Guarda el manifiesto de una exportación terminada."""
+        files = plan['files']
+        for name, digest in digests.items():
+            if name in files:
+                files[name][3] = digest
+        header = plan['header']
+        manifest = {'id': header['id'], 'kind': header['kind'], 'created': header['created'], 'files': files}
+        key = self.key_for(roots, header.get('reference'))
+        with self.transaction():
+            if header['kind'] == "full":
+                self.set(key, {'full': manifest, 'last': None})
+            else:
+                entry = dict(self.get(key) or {})
+                entry['last'] = manifest
+                self.set(key, entry)
+
+class ExportWriter:
+    """Escribe una exportación leyendo cada archivo desde su ubicación real.
+    
+    Antes se copiaba la versión y GAMES_DIR a un directorio temporal y se
+    empaquetaba la copia. Aquí cada archivo se añade con tarfile.addfile y un
+    arcname explícito, así que se lee y se escribe una sola vez y no hace
+    falta espacio temporal. Los enlaces duros (versiones deduplicadas) se
+    guardan una vez y el resto como enlaces, igual que con tar.add.
+    
+    write() además guarda el manifiesto de la exportación (ExportManifest)
+    y puede hacerla incremental o diferencial.
+    """
+    
+    def __init__(self, progress_callback=None, cancel_check=None):
+        self.progress_callback = progress_callback
+        self.cancel_check = cancel_check
+        self.bytes_done = 0
+        self.bytes_total = 0
+        self.files = 0
+        self.policy = CompressionPolicy()
+        # clase -> {'files', 'bytes', 'stored', 'archived'}; 'archived' None si no se sabe
+        self.class_stats = {}
+        self.plan = None      # ExportManifest.plan() de la exportación en curso
+        self.digests = {}     # miembro -> sha256 de lo escrito
+    
+    @staticmethod
+    def export_roots(version_path: Optional[Path], games_dir: Optional[Path]) -> list:
+        """Raíces de una exportación y su nombre dentro del archivo.
+        
+        Mantiene la estructura de siempre: ./version_content y ./games.
+        """
+        roots = []
+        if version_path is not None and version_path.is_dir():
+            roots.append((version_path, "./version_content"))
+        if games_dir is not None and games_dir.is_dir():
+            roots.append((games_dir, "./games"))
+        return roots
+    
+    @classmethod
+    def walk(cls, root: Path, arcname: str):
+        """Recorre un árbol en orden estable; produce (ruta, nombre en el archivo)."""
+        yield root, arcname
+        try:
+            with os.scandir(root) as entries:
+                children = sorted(entries, key=lambda entry: entry.name)
+        except OSError as e:
+            print(f"No se pudo leer {root}: {e}")
+            return
+        for entry in children:
+            name = f"{arcname}/{entry.name}"
+            if entry.is_dir(follow_symlinks=False):
+                yield from cls.walk(Path(entry.path), name)
+            else:
+                yield Path(entry.path), name
+    
+    def _advance(self, size: int):
+        self.bytes_done += size
+        if self.progress_callback:
+            self.progress_callback(self.bytes_done, self.bytes_total)
+    
+    def check_cancelled(self):
+        if self.cancel_check and self.cancel_check():
+            raise InterruptedError("Exportación cancelada")
+    
+    def write(self, file_path, roots: list, fmt: str = 'gzip', level: int = 6, threads: int = 0,
+              kind: str = "full", reference: Optional[dict] = None) -> Tuple[int, int]:
+        """Escribe la exportación en el formato elegido (.bca o tar comprimido).
+        
+        `kind` es full, incremental o differential; el manifiesto solo se
+        actualiza si el archivo se terminó de escribir. Con `reference`
+        (VersionReference.for_version) la versión no va en `roots`: solo se
+        guarda su referencia al APK en la cabecera.
+        """
+        manifest = ExportManifest.shared()
+        self.plan = manifest.plan(roots, kind, self.cancel_check, reference)
+        if fmt == 'bca':
+            result = self.write_bca(file_path, roots, level, threads)
+        else:
+            result = self.write_tar(file_path, roots, fmt, level, threads)
+        manifest.record(roots, self.plan, self.digests)
+        return result
+    
+    def total_bytes(self, roots: list) -> int:
+        if self.plan is not None:
+            return self.plan['bytes']
+        return sum(DiskUsage.shared().measure(root) for root, _ in roots)
+    
+    def skipped(self, name: str) -> bool:
+        """Archivo intacto desde la exportación base: no se vuelve a guardar."""
+        return self.plan is not None and name in self.plan['skip']
+    
+    def manifest_data(self) -> bytes:
+        return json.dumps(self.plan['header'], ensure_ascii=False).encode('utf-8')
+    
+    def write_bca(self, file_path, roots: list, level: int = 6, threads: int = 0) -> Tuple[int, int]:
+        """Escribe un .bca: tramas comprimidas en paralelo, índice y trailer."""
+        self.bytes_total = self.total_bytes(roots)
+        threads = ExportCompression.thread_count(threads)
+        level = ExportCompression.clamp_level('bca', level)
+        index = []
+        inodes = {}
+        pending = collections.deque()
+        
+        def compress(data, store):
+            if store:
+                return data
+            compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+            return compressor.compress(data) + compressor.flush()
+        
+        try:
+            with open(file_path, 'wb') as out, \
+                    concurrent.futures.ThreadPoolExecutor(max_workers=threads) as pool:
+                
+                def drain(limit):
+                    while len(pending) > limit:
+                        future, entry, original, stats = pending.popleft()
+                        data = future.result()
+                        if entry['length'] == 0:
+                            entry['offset'] = out.tell()
+                        out.write(BcaArchive.FRAME.pack(len(data), original))
+                        out.write(data)
+                        entry['length'] += BcaArchive.FRAME.size + len(data)
+                        stats['archived'] += BcaArchive.FRAME.size + len(data)
+                
+                out.write(BcaArchive.HEADER)
+                if self.plan is not None:
+                    data = self.manifest_data()
+                    packed = compress(data, False)
+                    index.append({'name': ExportManifest.MEMBER, 'type': 'file', 'mode': 0o644,
+                                  'mtime': int(time.time()), 'size': len(data), 'method': "deflate",
+                                  'offset': out.tell(), 'length': BcaArchive.FRAME.size + len(packed),
+                                  'crc': zlib.crc32(data)})
+                    out.write(BcaArchive.FRAME.pack(len(packed), len(data)))
+                    out.write(packed)
+                for root, arcname in roots:
+                    for path, name in self.walk(root, arcname):
+                        self.check_cancelled()
+                        if self.skipped(name):
+                            continue
+                        try:
+                            st = os.lstat(path)
+                        except OSError as e:
+                            print(f"Omitido {path}: {e}")
+                            continue
+                        entry = {'name': name, 'mode': stat.S_IMODE(st.st_mode), 'mtime': int(st.st_mtime)}
+                        if stat.S_ISDIR(st.st_mode):
+                            entry['type'] = 'dir'
+                        elif stat.S_ISLNK(st.st_mode):
+                            entry.update(type='symlink', link=os.readlink(path))
+                        elif not stat.S_ISREG(st.st_mode):
+                            continue
+                        elif st.st_nlink > 1 and (st.st_dev, st.st_ino) in inodes:
+                            # Enlace duro: los datos ya están en otro miembro
+                            entry.update(type='link', link=inodes[(st.st_dev, st.st_ino)])
+                            self.digests[name] = self.digests.get(entry['link'])
+                        else:
+                            if st.st_nlink > 1:
+                                inodes[(st.st_dev, st.st_ino)] = name
+                            label, store = self.policy.classify(path, st.st_size)
+                            stats = self.class_stats.setdefault(
+                                label, {'files': 0, 'bytes': 0, 'stored': 0, 'archived': 0})
+                            entry.update(type='file', size=0, method="store" if store else "deflate",
+                                         offset=0, length=0, crc=0)
+                            sha = hashlib.sha256()
+                            with open(path, 'rb') as f:
+                                while True:
+                                    chunk = f.read(BcaArchive.CHUNK_SIZE)
+                                    if not chunk:
+                                        break
+                                    entry['size'] += len(chunk)
+                                    entry['crc'] = zlib.crc32(chunk, entry['crc'])
+                                    sha.update(chunk)
+                                    pending.append((pool.submit(compress, chunk, store), entry, len(chunk), stats))
+                                    drain(threads * 2)
+                                    self._advance(len(chunk))
+                            self.digests[name] = sha.hexdigest()
+                            stats['files'] += 1
+                            stats['bytes'] += entry['size']
+                            if store:
+                                stats['stored'] += entry['size']
+                            self.files += 1
+                        index.append(entry)
+                drain(0)
+                
+                data = zlib.compress(json.dumps(index, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+                index_offset = out.tell()
+                out.write(data)
+                out.write(BcaArchive.TRAILER.pack(index_offset, len(data), zlib.crc32(data), BcaArchive.MAGIC))
+        except BaseException:
+            Path(file_path).unlink(missing_ok=True)
+            raise
+        DiskUsage.shared().save()
+        return self.files, self.bytes_done
+    
+    def write_tar(self, file_path, roots: list, compression: str = 'gzip',
+                  level: int = 6, threads: int = 0) -> Tuple[int, int]:
+        """Empaqueta las raíces en un tar comprimido; retorna (archivos, bytes).
+        
+        Si algo falla o se cancela, el archivo a medio escribir se borra.
+        """
+        self.bytes_total = self.total_bytes(roots)
+        try:
+            with ExportCompression.writer(file_path, compression, level, threads) as stream, \
+                    self.open_tar(stream) as tar:
+                top = tarfile.TarInfo(".")
+                top.type = tarfile.DIRTYPE
+                top.mode = 0o755
+                top.mtime = int(time.time())
+                tar.addfile(top)
+                if self.plan is not None:
+                    # La cabecera va primero: el importador la lee sin recorrer el resto
+                    data = self.manifest_data()
+                    info = tarfile.TarInfo(ExportManifest.MEMBER)
+                    info.size = len(data)
+                    info.mtime = top.mtime
+                    if isinstance(stream, ParallelBlockWriter):
+                        stream.set_mode(None)
+                    tar.addfile(info, io.BytesIO(data))
+                
+                # Carpetas y enlaces simbólicos primero; los archivos después, agrupados
+                # por clase para que cada cambio entre comprimir y guardar (que cierra un
+                # bloque) ocurra una vez por clase y no entre cada par de archivos
+                files, links = [], []
+                for root, arcname in roots:
+                    for path, name in self.walk(root, arcname):
+                        self.check_cancelled()
+                        if self.skipped(name):
+                            continue
+                        try:
+                            info = tar.gettarinfo(str(path), arcname=name)
+                        except OSError as e:
+                            print(f"Omitido {path}: {e}")
+                            continue
+                        if info is None:
+                            continue  # sockets y otros tipos que tar no guarda
+                        if info.isreg():
+                            files.append((path, name, info, self.classify_member(stream, path, info.size)))
+                        elif info.islnk():
+                            links.append((name, info))  # detrás del archivo al que apuntan
+                        else:
+                            if isinstance(stream, ParallelBlockWriter):
+                                stream.set_mode(None)
+                            tar.addfile(info)
+                
+                files.sort(key=lambda item: (item[3][1], item[3][0]))
+                for path, name, info, (label, store) in files:
+                    self.check_cancelled()
+                    self.tag_member(stream, label, store, info.size)
+                    with open(path, 'rb') as f:
+                        reader = CountingReader(f, self._advance, hashlib.sha256())
+                        tar.addfile(info, reader)
+                    self.digests[name] = reader.digest.hexdigest()
+                    self.files += 1
+                for name, info in links:
+                    self.digests[name] = self.digests.get(info.linkname)
+                    if isinstance(stream, ParallelBlockWriter):
+                        stream.set_mode(None)
+                    tar.addfile(info)
+        except BaseException:
+            Path(file_path).unlink(missing_ok=True)
+            raise
+        
+        # Tamaño final por clase, repartido por bloques con gzip/xz; con zstd
+        # no se conoce (su multihilo no separa miembros)
+        if isinstance(stream, ParallelBlockWriter):
+            for label, stats in self.class_stats.items():
+                stats['archived'] = int(stream.archived.get(label, 0))
+        DiskUsage.shared().save()
+        return self.files, self.bytes_done
+    
+    @staticmethod
+    def open_tar(stream) -> tarfile.TarFile:
+        """tarfile sobre el compresor; en modo "w" escribe sin búfer intermedio,
+        así cada miembro cae en el bloque que le corresponde."""
+        if isinstance(stream, (ParallelBlockWriter, io.BufferedWriter)):
+            return tarfile.open(fileobj=stream, mode="w")
+        return tarfile.open(fileobj=stream, mode="w|")
+    
+    def classify_member(self, stream, path: Path, size: int) -> Tuple[str, bool]:
+        """Clase de un archivo y si se guarda sin comprimir (solo si el compresor lo admite)."""
+        if isinstance(stream, ParallelBlockWriter):
+            return self.policy.classify(path, size)
+        return self.policy.by_extension.get(path.suffix.lower(), ("otros", None))[0], False
+    
+    def tag_member(self, stream, label: str, store: bool, size: int):
+        """Elige comprimir o guardar para los bytes siguientes y lo anota por clase."""
+        if isinstance(stream, ParallelBlockWriter):
+            stream.set_mode(label, store)
+        stats = self.class_stats.setdefault(label, {'files': 0, 'bytes': 0, 'stored': 0, 'archived': None})
+        stats['files'] += 1
+        stats['bytes'] += size
+        if store:
+            stats['stored'] += size
+    
+    def change_summary(self) -> str:
+        """Tipo de exportación y cuánto cambió respecto a su base."""
+        header = self.plan['header']
+        if header.get('reference'):
+            reference = header['reference']
+            prefix = (f"Versión como referencia al APK {reference['apk_digest'][:12]}"
+                      f" ({reference.get('game_version') or 'versión desconocida'})\n")
+        else:
+            prefix = ""
+        if header['kind'] == "full":
+            return f"{prefix}Exportación completa: {self.files} archivos"
+        kind = "incremental" if header['kind'] == "incremental" else "diferencial"
+        return (f"{prefix}Exportación {kind}: {self.files} archivos nuevos o modificados, "
+                f"{len(self.plan['skip'])} sin cambios, {len(header['deleted'])} borrados")
+    
+    def savings_report(self) -> str:
+        """Resumen por clase de archivo: tamaño original, final y ahorro."""
+        lines = []
+        for label, stats in sorted(self.class_stats.items(), key=lambda item: -item[1]['bytes']):
+            line = f"{label}: {stats['files']} archivos, {format_size(stats['bytes'])}"
+            if stats['archived'] is not None:
+                line += f" → {format_size(stats['archived'])}"
+                saved = stats['bytes'] - stats['archived']
+                if saved > 0:
+                    line += f" (−{saved * 100 // stats['bytes']}%)"
+            if stats['stored'] and stats['stored'] == stats['bytes']:
+                line += ", sin comprimir"
+            elif stats['stored']:
+                line += f", {format_size(stats['stored'])} sin comprimir"
+            lines.append(line)
+        return "\n".join(lines)
+
+class ArchiveImporter:
+    """Restaura una exportación en una sola pasada, sin directorio temporal.
+    
+    Cada miembro se escribe en un directorio de preparación junto a su
+    destino (VERSIONS_DIR, GAMES_DIR o una carpeta concreta de un mundo o
+    pack); al terminar se intercambia con un rename y la copia anterior pasa
+    a la papelera. El pico de disco es una sola copia de los datos y un
+    fallo o una cancelación no tocan lo que ya estaba instalado.
+    
+    Una cadena (completa + incrementales o diferencial) se aplica en orden
+    sobre la misma preparación, con los borrados de cada eslabón.
+    """
+    
+    PARTS = ("version_content", "games")
+    SUFFIXES = (".tar.gz", ".tgz", ".tar.zst", ".tar.xz", ".tar.bz2", ".tar", ".bca")
+    CHUNK_SIZE = 1 << 20
+    
+    def __init__(self, progress_callback=None, cancel_check=None):
+        self.progress_callback = progress_callback
+        self.cancel_check = cancel_check
+        self.bytes_done = 0   # bytes leídos del archivo (comprimidos)
+        self.bytes_total = 0
+        self.files = 0
+        self.bytes_written = 0
+        self.staging = {}     # destino -> carpeta de preparación
+        self.dir_times = []   # (carpeta, mtime) a aplicar al final
+        self.rebuilt = None   # VersionReference.rebuild() si la versión venía como referencia
+    
+    @classmethod
+    def version_name_for(cls, file_path) -> str:
+        """Nombre de versión a partir del archivo (sin .tar.gz, .tar.zst...)."""
+        name = Path(file_path).name
+        for suffix in cls.SUFFIXES:
+            if name.lower().endswith(suffix) and len(name) > len(suffix):
+                return name[:-len(suffix)]
+        return Path(file_path).stem
+    
+    @classmethod
+    def split_member(cls, name: str) -> Tuple[Optional[str], Optional[list]]:
+        """Parte (version_content o games) y ruta relativa de un miembro.
+        
+        Admite una carpeta contenedora y el formato antiguo games/com.mojang/...
+        Lanza ValueError si la ruta intenta salir de su destino.
+        """
+        parts = [p for p in name.replace("\\", "/").split("/") if p not in ("", ".")]
+        if ".." in parts:
+            raise ValueError(f"Ruta no válida en el archivo: {name}")
+        for i, part in enumerate(parts[:2]):
+            if part in cls.PARTS:
+                rel = parts[i + 1:]
+                if part == "games" and rel[:1] == ["com.mojang"]:
+                    rel = rel[1:]
+                return part, rel
+        return None, None
+    
+    @classmethod
+    def match_target(cls, targets: list, name: str) -> Tuple[Optional[Path], Optional[list]]:
+        """Destino y ruta dentro de él para un miembro; (None, None) si no se pidió."""
+        part, rel = cls.split_member(name)
+        for target_part, prefix, dest in targets:
+            if part == target_part and rel[:len(prefix)] == prefix:
+                return dest, rel[len(prefix):]
+        return None, None
+    
+    @classmethod
+    def list_entries(cls, file_path) -> list:
+        """Mundos y packs de un .bca (leyendo solo el índice): [(parte, prefijo, etiqueta)]."""
+        entries = {}
+        for member in BcaArchive.list_members(file_path):
+            part, rel = cls.split_member(member['name'])
+            if part != "games" or len(rel) < 2 or rel[0] not in ("minecraftWorlds", "behavior_packs", "resource_packs"):
+                continue
+            key = (rel[0], rel[1])
+            size = entries.get(key, 0) + member.get('size', 0)
+            entries[key] = size if member['type'] == 'file' else entries.get(key, 0)
+        kinds = {"minecraftWorlds": "Mundo", "behavior_packs": "Behavior pack", "resource_packs": "Resource pack"}
+        return [("games", [kind, name], f"{kinds[kind]}: {name} ({format_size(size)})")
+                for (kind, name), size in sorted(entries.items())]
+    
+    @staticmethod
+    def is_manifest(name: str) -> bool:
+        return os.path.normpath(name) == os.path.normpath(ExportManifest.MEMBER)
+    
+    @classmethod
+    def read_manifest(cls, file_path) -> Optional[dict]:
+        """Cabecera de una exportación; None si es anterior a los manifiestos."""
+        with ExportCompression.open_archive(file_path) as archive:
+            if isinstance(archive, BcaReader):
+                if ExportManifest.MEMBER not in archive.entries:
+                    return None
+                with archive.extractfile(tarfile.TarInfo(ExportManifest.MEMBER)) as f:
+                    return json.loads(f.read())
+            for member in archive:
+                if cls.is_manifest(member.name):
+                    return json.loads(archive.extractfile(member).read())
+                if not member.isdir() or os.path.normpath(member.name) != ".":
+                    return None  # siempre va justo después de "."
+        return None
+    
+    @classmethod
+    def chain_for(cls, file_paths: list) -> list:
+        """Ordena una cadena de exportaciones desde la completa hasta la más reciente.
+        
+        Se parte de la más nueva y se siguen sus bases; las que no forman
+        parte de la cadena se ignoran. Lanza ValueError si falta un eslabón.
+        """
+        headers = {str(path): cls.read_manifest(path) for path in file_paths}
+        if len(headers) == 1:
+            path, header = next(iter(headers.items()))
+            if header is None or header['kind'] == "full":
+                return [path]
+        by_id = {header['id']: path for path, header in headers.items() if header}
+        if not by_id:
+            raise ValueError("Solo se puede restaurar una exportación antigua cada vez")
+        path = max(by_id.values(), key=lambda p: headers[p]['created'])
+        chain = [path]
+        while headers[path]['kind'] != "full":
+            base = headers[path]['base']
+            if base not in by_id:
+                raise ValueError(f"Falta la exportación base de {Path(path).name}")
+            path = by_id[base]
+            chain.append(path)
+        return chain[::-1]
+    
+    def _advance(self, size: int):
+        self.bytes_done += size
+        if self.progress_callback:
+            self.progress_callback(self.bytes_done, self.bytes_total)
+    
+    def check_cancelled(self):
+        if self.cancel_check and self.cancel_check():
+            raise InterruptedError("Importación cancelada")
+    
+    def staging_for(self, dest: Path) -> Path:
+        """Carpeta de preparación de un destino, en su mismo sistema de archivos."""
+        if dest not in self.staging:
+            staging = dest.parent / f".{dest.name}.import-{os.getpid()}"
+            if staging.exists():
+                TrashManager.shared().delete(staging, undo=False)
+            staging.mkdir(parents=True)
+            self.staging[dest] = staging
+        return self.staging[dest]
+    
+    @staticmethod
+    def check_inside(root: Path, rel: list, name: str):
+        """Lanza ValueError si `rel` pasa por un enlace simbólico o acaba fuera de `root`.
+        
+        Normalizar el texto no basta: una cadena de enlaces (d/l -> .., l2 -> d/l/..)
+        parece interna pero apunta fuera. Por eso se mira cada carpeta en disco.
+        """
+        current = root
+        for part in rel:
+            current = current / part
+            if current.is_symlink():
+                raise ValueError(f"Ruta no válida en el archivo (pasa por un enlace): {name}")
+        real_root = os.path.realpath(root)
+        real_path = os.path.realpath(root.joinpath(*rel) if rel else root)
+        if os.path.commonpath([real_root, real_path]) != real_root:
+            raise ValueError(f"Ruta no válida en el archivo: {name}")
+    
+    def extract_member(self, archive, member: tarfile.TarInfo, root: Path, rel: list, targets: list):
+        """Escribe un miembro validando que ni él ni sus enlaces salgan de `root`."""
+        target = root.joinpath(*rel) if rel else root
+        # Las carpetas se comprueban enteras; para el resto basta con el padre
+        self.check_inside(root, rel if member.isdir() else rel[:-1], member.name)
+        if member.isdir():
+            target.mkdir(parents=True, exist_ok=True)
+            self.dir_times.append((target, member.mtime))
+            return
+        if not rel:
+            return
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if target.exists() or target.is_symlink():
+            target.unlink()
+        
+        if member.isreg():
+            with archive.extractfile(member) as src, open(target, 'wb') as dst:
+                shutil.copyfileobj(src, dst, self.CHUNK_SIZE)
+            self.files += 1
+            self.bytes_written += member.size
+        elif member.islnk():
+            # Enlace duro: el destino es otro miembro ya extraído del mismo destino
+            link_dest, link_rel = self.match_target(targets, member.linkname)
+            if link_dest is None or not link_rel or self.staging.get(link_dest) != root:
+                raise ValueError(f"Enlace no válido en el archivo: {member.name}")
+            self.check_inside(root, link_rel, member.name)
+            os.link(root.joinpath(*link_rel), target)
+            return
+        elif member.issym():
+            resolved = os.path.normpath(os.path.join(*(rel[:-1] or ["."]), member.linkname))
+            if os.path.isabs(member.linkname) or resolved == ".." or resolved.startswith(".." + os.sep):
+                raise ValueError(f"Enlace no válido en el archivo: {member.name}")
+            os.symlink(member.linkname, target)
+            return
+        else:
+            return  # dispositivos y FIFOs no tienen sentido aquí
+        
+        # Sin bits especiales ni escritura para otros; el dueño siempre puede leer y escribir
+        os.chmod(target, (member.mode & 0o755) | 0o600)
+        os.utime(target, (member.mtime, member.mtime))
+    
+    def discard_staging(self):
+        for staging in self.staging.values():
+            if staging.exists():
+                TrashManager.shared().delete(staging, undo=False)
+        self.staging.clear()
+    
+    def extract(self, file_path, targets: list) -> list:
+        """Extrae un archivo sobre la preparación; retorna su lista de borrados."""
+        deleted = []
+        with ExportCompression.open_archive(file_path, on_read=self._advance) as archive:
+            members = archive
+            if isinstance(archive, BcaReader):
+                # Con índice solo se recorre (y se lee) lo que se pidió
+                members = [m for m in archive if self.is_manifest(m.name)
+                           or self.match_target(targets, m.name)[0] is not None]
+                self.bytes_total += archive.stored_bytes(m.name for m in members) - os.path.getsize(file_path)
+            for member in members:
+                self.check_cancelled()
+                if self.is_manifest(member.name):
+                    with archive.extractfile(member) as f:
+                        deleted = json.loads(f.read()).get('deleted', [])
+                    continue
+                dest, rel = self.match_target(targets, member.name)
+                if dest is None:
+                    continue
+                self.extract_member(archive, member, self.staging_for(dest), rel, targets)
+        return deleted
+    
+    def apply_deletions(self, deleted: list, targets: list):
+        """Quita de la preparación lo que ya no existía al hacer la exportación."""
+        for name in deleted:
+            dest, rel = self.match_target(targets, name)
+            if dest is None or not rel or dest not in self.staging:
+                continue
+            path = self.staging[dest].joinpath(*rel)
+            if path.is_dir() and not path.is_symlink():
+                shutil.rmtree(path)
+            elif path.exists() or path.is_symlink():
+                path.unlink()
+    
+    def restore(self, file_paths, targets: list) -> list:
+        """Restaura los destinos pedidos: [(parte, prefijo, carpeta destino)].
+        
+        `file_paths` es un archivo o una cadena ya ordenada (ver chain_for).
+        Retorna las carpetas que se reemplazaron.
+        """
+        if isinstance(file_paths, (str, Path)):
+            file_paths = [file_paths]
+        self.bytes_total = self.bytes_done + sum(os.path.getsize(path) for path in file_paths)
+        try:
+            for file_path in file_paths:
+                self.apply_deletions(self.extract(file_path, targets), targets)
+            
+            for path, mtime in reversed(self.dir_times):
+                try:
+                    os.utime(path, (mtime, mtime))
+                except OSError:
+                    pass
+            
+            # Intercambio: lo anterior a la papelera y lo preparado a su sitio
+            restored = []
+            for dest, staging in list(self.staging.items()):
+                if dest.exists():
+                    TrashManager.shared().delete(dest, undo=False)
+                    DiskUsage.shared().forget(dest)
+                os.rename(staging, dest)
+                del self.staging[dest]
+                restored.append(dest)
+        except BaseException:
+            self.discard_staging()
+            raise
+        return restored
+    
+    def rebuild_reference(self, reference: dict, dest: Path, apk_paths=None):
+        """Reconstruye en la preparación una versión exportada como referencia."""
+        base = self.bytes_done
+        
+        def on_progress(done, total):
+            self.bytes_done = base + done
+            self.bytes_total = max(self.bytes_total, base + total)
+            self._advance(0)
+        
+        staging = self.staging_for(dest)
+        try:
+            self.rebuilt = VersionReference.rebuild(reference, staging, apk_paths, on_progress, self.cancel_check)
+        except BaseException:
+            self.discard_staging()
+            raise
+    
+    def import_archive(self, file_path, version_name: str, parts=PARTS, apk_paths=None) -> dict:
+        """Importa las partes pedidas; retorna qué se restauró y cuánto.
+        
+        `file_path` puede ser una lista con una cadena de exportaciones. Si
+        la versión se exportó como referencia se reconstruye desde su APK
+        (`apk_paths` si el launcher no lo encuentra por sí mismo).
+        """
+        chain = self.chain_for(file_path if isinstance(file_path, (list, tuple)) else [file_path])
+        destinations = {"version_content": VERSIONS_DIR / version_name, "games": GAMES_DIR}
+        reference = (self.read_manifest(chain[0]) or {}).get('reference')
+        if reference and "version_content" in parts:
+            self.rebuild_reference(reference, destinations["version_content"], apk_paths)
+        restored = self.restore(chain, [(part, [], destinations[part]) for part in parts])
+        restored_parts = [part for part in parts if destinations[part] in restored]
+        if "version_content" in restored_parts:
+            fields = {}
+            if self.rebuilt:
+                fields = {field: reference.get(field) for field in ('apk_digest', 'game_version', 'version_code')}
+                fields.update(extractor=self.rebuilt['extractor'], slim=self.rebuilt['slim'])
+            VersionIndex.shared().record(version_name, installed_at=time.time(),
+                                         size=parallel_tree_size(destinations["version_content"]), **fields)
+        return {'parts': restored_parts, 'files': self.files, 'bytes': self.bytes_written,
+                'rebuilt': self.rebuilt['source'] if self.rebuilt else None}
+    
+    def restore_entry(self, file_path, part: str, prefix: list) -> dict:
+        """Restaura una sola carpeta (un mundo o un pack) sin tocar el resto."""
+        base = GAMES_DIR if part == "games" else None
+        if base is None or not prefix:
+            raise ValueError("Solo se pueden restaurar por separado mundos y packs")
+        restored = self.restore(self.chain_for([file_path]), [(part, list(prefix), base.joinpath(*prefix))])
+        return {'parts': [str(p) for p in restored], 'files': self.files, 'bytes': self.bytes_written}
+
+class TransferRate:
+    """Velocidad (media móvil exponencial) y tiempo restante de una transferencia."""
+    
+    def __init__(self, interval: float = 0.25, smoothing: float = 0.3):
+        self.interval = interval
+        self.smoothing = smoothing
+        self.started = time.monotonic()
+        self.last_time = self.started
+        self.last_done = 0
+        self.rate = 0.0
+    
+    def sample(self, done: int, total: int) -> Optional[Tuple[float, float]]:
+        """(bytes/s, segundos restantes o -1); None si aún no toca informar."""
+        now = time.monotonic()
+        elapsed = now - self.last_time
+        if elapsed < self.interval and done < total:
+            return None
+        if elapsed > 0:
+            current = (done - self.last_done) / elapsed
+            self.rate = current if self.last_done == 0 else \
+                self.smoothing * current + (1 - self.smoothing) * self.rate
+        self.last_time, self.last_done = now, done
+        eta = (total - done) / self.rate if self.rate > 0 and total > done else (0.0 if done >= total else -1.0)
+        return self.rate, eta
+
+class TransferThread(BackgroundThread):
+    """Hilo con progreso en bytes, velocidad y tiempo restante."""
+    
+    transfer_progress = Signal(object, object, float, float)  # bytes, total, bytes/s, segundos (-1 si no se sabe)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rate = TransferRate()
+    
+    def report(self, done: int, total: int):
+        sample = self.rate.sample(done, total)
+        if sample is not None:
+            self.transfer_progress.emit(done, total, *sample)
+
+class ExportThread(TransferThread):
+    """Escribe una exportación en segundo plano; al cancelar se borra el archivo a medias."""
+    
+    export_done = Signal(bool, str)
+    
+    def __init__(self, file_path: str, roots: list, fmt: str, level: int, threads: int,
+                 kind: str = "full", reference: Optional[dict] = None, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.roots = roots
+        self.fmt = fmt
+        self.level = level
+        self.threads = threads
+        self.kind = kind
+        self.reference = reference
+    
+    def run(self):
+        writer = ExportWriter(progress_callback=self.report, cancel_check=lambda: self.cancelled)
+        try:
+            writer.write(self.file_path, self.roots, self.fmt, self.level, self.threads,
+                         self.kind, self.reference)
+            self.export_done.emit(True, f"{writer.change_summary()}\n\n{writer.savings_report()}")
+        except InterruptedError as e:
+            self.export_done.emit(False, str(e))
+        except Exception as e:
+            self.export_done.emit(False, f"Error en exportación: {str(e)}")
+
+class ImportThread(TransferThread):
+    """Restaura una exportación (o una cadena) en segundo plano.
+    
+    Con `entry` (parte, prefijo) restaura solo ese mundo o pack.
+    """
+    
+    import_done = Signal(bool, str, dict)
+    
+    def __init__(self, chain: list, version_name: str, parts=ArchiveImporter.PARTS, entry=None,
+                 apk_paths=None, parent=None):
+        super().__init__(parent)
+        self.chain = chain
+        self.version_name = version_name
+        self.parts = parts
+        self.entry = entry
+        self.apk_paths = apk_paths
+    
+    def run(self):
+        importer = ArchiveImporter(progress_callback=self.report, cancel_check=lambda: self.cancelled)
+        try:
+            if self.entry is not None:
+                result = importer.restore_entry(self.chain[-1], *self.entry)
+            else:
+                result = importer.import_archive(self.chain, self.version_name, self.parts, self.apk_paths)
+            self.import_done.emit(True, "", result)
+        except InterruptedError as e:
+            self.import_done.emit(False, str(e), {})
+        except Exception as e:
+            self.import_done.emit(False, f"Error en importación: {str(e)}", {})
+
+# ============================================================================
+# INSTANTÁNEAS DE MUNDOS
+# ============================================================================
+
+class ChunkStore:
+    """Repositorio de fragmentos direccionados por contenido (SHA-256).
+    
+    Los archivos se cortan donde lo dice su contenido (content-defined
+    chunking): añadir o insertar bytes solo cambia los fragmentos de
+    alrededor y el resto se reaprovecha. La huella rodante proyecta cada
+    byte a un bit con una tabla fija y corta donde aparecen WINDOW unos
+    seguidos; con bytes.translate y bytes.find el recorrido se hace en C
+    en lugar de byte a byte en Python.
+    """
+    
+    MIN_SIZE = 8 * 1024
+    MAX_SIZE = 256 * 1024
+    WINDOW = 15                 # corte cada ~32 KiB de media tras MIN_SIZE
+    READ_SIZE = 8 * 1024 * 1024
+    # Tabla fija: cambiarla movería todos los cortes y se perdería la deduplicación
+    BIT_TABLE = bytes(hashlib.sha256(bytes([b])).digest()[0] & 1 for b in range(256))
+    NEEDLE = b"\x01" * WINDOW
+    RAW, ZLIB = 0, 1            # primer byte de cada fragmento guardado
+    
+    def __init__(self, root: Path):
+        self.chunks_dir = root / "chunks"
+    
+    def chunk_path(self, digest: str) -> Path:
+        return self.chunks_dir / digest[:2] / digest[2:]
+    
+    @classmethod
+    def cut_points(cls, buf: bytes, final: bool) -> list:
+        """Finales de los fragmentos completos de `buf` (con `final`, también el último)."""
+        bits = buf.translate(cls.BIT_TABLE)
+        cuts = []
+        start, size = 0, len(buf)
+        while size - start > cls.MIN_SIZE:
+            limit = min(start + cls.MAX_SIZE, size)
+            found = bits.find(cls.NEEDLE, start + cls.MIN_SIZE - cls.WINDOW, limit)
+            if found >= 0:
+                start = found + cls.WINDOW
+            elif limit == start + cls.MAX_SIZE:
+                start = limit
+            else:
+                break  # faltan datos para decidir
+            cuts.append(start)
+        if final and start < size:
+            cuts.append(size)
+        return cuts
+    
+    @classmethod
+    def split_file(cls, path):
+        """Produce los fragmentos de un archivo leyéndolo por bloques."""
+        buf = b""
+        with open(path, 'rb') as f:
+            while True:
+                data = f.read(cls.READ_SIZE)
+                buf += data
+                previous = 0
+                for end in cls.cut_points(buf, final=not data):
+                    yield buf[previous:end]
+                    previous = end
+                buf = buf[previous:]
+                if not data:
+                    return
+    
+    def put(self, data: bytes) -> Tuple[str, int]:
+        """Guarda un fragmento si no estaba; retorna (digest, bytes añadidos al repositorio)."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.chunk_path(digest)
+        if path.exists():
+            return digest, 0
+        packed = zlib.compress(data, 1)
+        payload = bytes([self.ZLIB]) + packed if len(packed) < len(data) * 0.9 else bytes([self.RAW]) + data
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp, path)
+        return digest, len(payload)
+    
+    def get(self, digest: str) -> bytes:
+        with open(self.chunk_path(digest), 'rb') as f:
+            payload = f.read()
+        data = zlib.decompress(payload[1:]) if payload[:1] == bytes([self.ZLIB]) else payload[1:]
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"Fragmento dañado en el repositorio de instantáneas: {digest[:12]}")
+        return data
+    
+    def gc(self, live: set) -> Tuple[int, int]:
+        """Borra los fragmentos que ya no usa ninguna instantánea."""
+        removed, freed = 0, 0
+        if not self.chunks_dir.exists():
+            return removed, freed
+        for bucket in self.chunks_dir.iterdir():
+            if not bucket.is_dir():
+                continue
+            for chunk in bucket.iterdir():
+                if bucket.name + chunk.name in live:
+                    continue
+                try:
+                    freed += chunk.stat().st_size
+                    chunk.unlink()
+                    removed += 1
+                except OSError:
+                    continue
+            try:
+                bucket.rmdir()  # solo si quedó vacío
+            except OSError:
+                pass
+        return removed, freed
+
+class WorldSnapshots(JsonIndex):
+    """Instantáneas deduplicadas de mundos con retención y restauración rápida.
+    
+    Cada instantánea es un manifiesto JSON con [tamaño, mtime_ns, modo,
+    fragmentos] por archivo. Los archivos con el mismo tamaño y mtime que en
+    la instantánea anterior no se vuelven a leer: en LevelDB una partida
+    solo escribe unos pocos .ldb/.log nuevos, así que cada instantánea
+    cuesta lo que cambió. El índice guarda el resumen de cada una.
+    """
+    
+    REASONS = {"exit": "al cerrar el juego", "manual": "manual", "restore": "antes de restaurar"}
+    
+    _shared = None
+    
+    def __init__(self, snapshots_dir: Path):
+        super().__init__(snapshots_dir / "index.json")
+        self.snapshots_dir = snapshots_dir
+        self.store = ChunkStore(snapshots_dir)
+        # Una operación a la vez: la limpieza no debe ver fragmentos aún sin manifiesto
+        self.repo_lock = threading.Lock()
+    
+    @classmethod
+    def shared(cls) -> "WorldSnapshots":
+        if cls._shared is None:
+            cls._shared = cls(SNAPSHOTS_DIR)
+        return cls._shared
+    
+    @staticmethod
+    def world_dirs(worlds_dir: Path = None) -> list:
+        """Mundos (carpetas con level.dat) de un directorio de mundos."""
+        worlds_dir = worlds_dir or GAMES_DIR / "minecraftWorlds"
+        try:
+            return sorted(path for path in worlds_dir.iterdir() if (path / "level.dat").is_file())
+        except OSError:
+            return []
+    
+    def manifest_path(self, world_key: str, snapshot_id: str) -> Path:
+        folder = hashlib.sha256(world_key.encode('utf-8')).hexdigest()[:16]
+        return self.snapshots_dir / "worlds" / folder / f"{snapshot_id}.json"
+    
+    def history(self, world_path) -> list:
+        """Resúmenes de las instantáneas de un mundo, la más reciente primero."""
+        return sorted(self.get(str(Path(world_path))) or [], key=lambda s: s['created'], reverse=True)
+    
+    def load_manifest(self, world_path, snapshot_id: str) -> dict:
+        with open(self.manifest_path(str(Path(world_path)), snapshot_id), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    @staticmethod
+    def scan(world: Path) -> Tuple[list, list]:
+        """Carpetas y archivos regulares de un mundo: ([rel], [(rel, stat)])."""
+        dirs, files = [], []
+        for dirpath, dirnames, filenames in os.walk(world):
+            rel_dir = os.path.relpath(dirpath, world)
+            for name in dirnames:
+                dirs.append(os.path.normpath(os.path.join(rel_dir, name)))
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.lstat(path)
+                except OSError:
+                    continue
+                if stat.S_ISREG(st.st_mode):
+                    files.append((os.path.normpath(os.path.join(rel_dir, name)), st))
+        return sorted(dirs), files
+    
+    def snapshot(self, world_path, reason: str = "manual", progress_callback=None,
+                 cancel_check=None, max_workers: int = 0) -> Optional[dict]:
+        """Crea una instantánea; retorna su resumen o None si nada cambió."""
+        world = Path(world_path)
+        key = str(world)
+        with self.repo_lock:
+            history = self.history(world)
+            previous = {}
+            if history:
+                try:
+                    previous = self.load_manifest(world, history[0]['id'])
+                except (OSError, ValueError):
+                    previous = {}
+            previous_files = previous.get('files', {})
+            
+            dirs, files = self.scan(world)
+            entries = {}
+            changed = []
+            for rel, st in files:
+                old = previous_files.get(rel)
+                if old and old[0] == st.st_size and old[1] == st.st_mtime_ns:
+                    entries[rel] = [st.st_size, st.st_mtime_ns, stat.S_IMODE(st.st_mode), old[3]]
+                else:
+                    changed.append((rel, st))
+            if previous and not changed and set(entries) == set(previous_files) \
+                    and dirs == previous.get('dirs'):
+                return None
+            
+            total = sum(st.st_size for _, st in changed)
+            lock = threading.Lock()
+            counters = {'done': 0, 'added': 0}
+            
+            def store_file(rel, st):
+                digests = []
+                for chunk in self.store.split_file(world / rel):
+                    if cancel_check and cancel_check():
+                        raise InterruptedError("Instantánea cancelada")
+                    digest, added = self.store.put(chunk)
+                    digests.append(digest)
+                    with lock:
+                        counters['done'] += len(chunk)
+                        counters['added'] += added
+                        done = counters['done']
+                    if progress_callback:
+                        progress_callback(done, total)
+                return rel, [st.st_size, st.st_mtime_ns, stat.S_IMODE(st.st_mode), digests]
+            
+            # sha256 y zlib liberan el GIL: varios archivos a la vez
+            workers = max_workers or min(8, (os.cpu_count() or 2))
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(store_file, rel, st) for rel, st in changed]
+                try:
+                    for future in concurrent.futures.as_completed(futures):
+                        rel, entry = future.result()
+                        entries[rel] = entry
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+            
+            created = time.time()
+            snapshot_id = time.strftime("%Y%m%d-%H%M%S", time.localtime(created)) + f"-{os.urandom(2).hex()}"
+            manifest = {'schema': 1, 'id': snapshot_id, 'world': key, 'created': created,
+                        'reason': reason, 'dirs': dirs, 'files': entries}
+            path = self.manifest_path(key, snapshot_id)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{path.name}.tmp")
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, separators=(',', ':'))
+            os.replace(tmp, path)
+            
+            summary = {'id': snapshot_id, 'created': created, 'reason': reason, 'files': len(entries),
+                       'bytes': sum(entry[0] for entry in entries.values()),
+                       'changed': len(changed), 'added': counters['added']}
+            with self.transaction():
+                self.set(key, (self.get(key) or []) + [summary])
+            return summary
+    
+    def restore(self, world_path, snapshot_id: str, progress_callback=None,
+                cancel_check=None, max_workers: int = 0) -> dict:
+        """Devuelve el mundo al estado de una instantánea.
+        
+        Antes se guarda el estado actual (instantánea "restore"). Lo que no
+        cambió se enlaza desde el mundo actual en lugar de reconstruirse; el
+        resto se arma con sus fragmentos en una carpeta de preparación que
+        al final sustituye al mundo con un rename.
+        """
+        world = Path(world_path)
+        target = self.load_manifest(world, snapshot_id)
+        current = {}
+        if world.exists():
+            self.snapshot(world, "restore", cancel_check=cancel_check, max_workers=max_workers)
+            history = self.history(world)
+            if history:
+                current = self.load_manifest(world, history[0]['id']).get('files', {})
         
-        button_layout.addWidget(self.minimize_button)
-        button_layout.addWidget(self.close_button)
+        with self.repo_lock:
+            staging = world.parent / f".{world.name}.restore-{os.getpid()}"
+            if staging.exists():
+                shutil.rmtree(staging)
+            total = sum(entry[0] for entry in target['files'].values())
+            lock = threading.Lock()
+            counters = {'done': 0, 'linked': 0}
+            
+            def restore_file(rel, entry):
+                if cancel_check and cancel_check():
+                    raise InterruptedError("Restauración cancelada")
+                size, mtime_ns, mode, digests = entry
+                dest = staging / rel
+                linked = False
+                if current.get(rel, [None] * 4)[3] == digests:
+                    try:
+                        os.link(world / rel, dest)  # mismo contenido: enlace, sin copiar
+                        linked = True
+                    except OSError:
+                        pass
+                if not linked:
+                    with open(dest, 'wb') as f:
+                        for digest in digests:
+                            f.write(self.store.get(digest))
+                    os.chmod(dest, mode | 0o600)
+                    os.utime(dest, ns=(mtime_ns, mtime_ns))
+                with lock:
+                    counters['done'] += size
+                    counters['linked'] += 1 if linked else 0
+                    done = counters['done']
+                if progress_callback:
+                    progress_callback(done, total)
+            
+            try:
+                staging.mkdir(parents=True)
+                for rel in target['dirs']:
+                    (staging / rel).mkdir(parents=True, exist_ok=True)
+                for rel in target['files']:
+                    (staging / rel).parent.mkdir(parents=True, exist_ok=True)
+                workers = max_workers or min(8, (os.cpu_count() or 2))
+                with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+                    futures = [pool.submit(restore_file, rel, entry) for rel, entry in target['files'].items()]
+                    try:
+                        for future in concurrent.futures.as_completed(futures):
+                            future.result()
+                    except BaseException:
+                        for future in futures:
+                            future.cancel()
+                        raise
+                if world.exists():
+                    TrashManager.shared().delete(world, undo=False)
+                    DiskUsage.shared().forget(world)
+                os.rename(staging, world)
+            except BaseException:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise
+        return {'files': len(target['files']), 'bytes': total, 'linked': counters['linked']}
+    
+    def prune(self, world_path) -> int:
+        """Aplica la retención: las últimas N y una por hora, día y semana."""
+        settings = LauncherSettings()
+        history = self.history(world_path)
+        keep = {s['id'] for s in history[:max(1, int(settings.get("snapshot_keep_last")))]}
+        for bucket_format, setting in (("%Y%m%d%H", "snapshot_keep_hourly"),
+                                       ("%Y%m%d", "snapshot_keep_daily"),
+                                       ("%G%V", "snapshot_keep_weekly")):
+            limit = int(settings.get(setting))
+            buckets = set()
+            for summary in history:
+                if len(buckets) >= limit:
+                    break
+                bucket = time.strftime(bucket_format, time.localtime(summary['created']))
+                if bucket not in buckets:
+                    buckets.add(bucket)
+                    keep.add(summary['id'])
         
-        layout.addWidget(button_container)
+        expired = [s for s in history if s['id'] not in keep]
+        if not expired:
+            return 0
+        key = str(Path(world_path))
+        with self.repo_lock:
+            for summary in expired:
+                self.manifest_path(key, summary['id']).unlink(missing_ok=True)
+            with self.transaction():
+                self.set(key, [s for s in (self.get(key) or []) if s['id'] in keep])
+        return len(expired)
     
-    def minimize_window(self):
-        self.window().showMinimized()
+    def gc(self) -> Tuple[int, int]:
+        """Borra los fragmentos que no aparecen en ningún manifiesto."""
+        with self.repo_lock:
+            live = set()
+            with self.lock:
+                snapshots = [(key, s['id']) for key, history in self.entries.items() for s in history]
+            for key, snapshot_id in snapshots:
+                try:
+                    with open(self.manifest_path(key, snapshot_id), 'r', encoding='utf-8') as f:
+                        manifest = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                for entry in manifest['files'].values():
+                    live.update(entry[3])
+            removed, freed = self.store.gc(live)
+        if removed:
+            print(f"Instantáneas: {removed} fragmentos sin uso eliminados ({format_size(freed)})")
+        return removed, freed
+
+class SnapshotThread(TransferThread):
+    """Crea instantáneas de varios mundos, aplica la retención y limpia el repositorio."""
     
-    def close_window(self):
-        self.window().close()
+    snapshot_done = Signal(bool, str, list)  # éxito, mensaje, resúmenes creados
     
-    # Funciones para arrastre de ventana
-    def mousePressEvent(self, event):
-        if event.button() == Qt.LeftButton:
-            self.drag_position = event.globalPosition().toPoint() - self.window().frameGeometry().topLeft()
-            event.accept()
+    def __init__(self, worlds: list, reason: str = "manual", parent=None):
+        super().__init__(parent)
+        self.worlds = [Path(world) for world in worlds]
+        self.reason = reason
     
-    def mouseMoveEvent(self, event):
-        if event.buttons() == Qt.LeftButton:
-            self.window().move(event.globalPosition().toPoint() - self.drag_position)
-            event.accept()
+    def run(self):
+        snapshots = WorldSnapshots.shared()
+        created = []
+        try:
+            for world in self.worlds:
+                summary = snapshots.snapshot(world, self.reason, self.report, lambda: self.cancelled)
+                if summary:
+                    created.append(dict(summary, world=str(world)))
+                snapshots.prune(world)
+            snapshots.gc()
+            added = sum(summary['added'] for summary in created)
+            self.snapshot_done.emit(True, f"{len(created)} instantáneas nuevas de {len(self.worlds)} mundos "
+                                          f"(+{format_size(added)} en el repositorio)", created)
+        except InterruptedError as e:
+            self.snapshot_done.emit(False, str(e), created)
+        except Exception as e:
+            self.snapshot_done.emit(False, f"Error en la instantánea: {str(e)}", created)
+
+class SnapshotRestoreThread(TransferThread):
+    """Restaura un mundo a una instantánea en segundo plano."""
+    
+    restore_done = Signal(bool, str)
+    
+    def __init__(self, world, snapshot_id: str, parent=None):
+        super().__init__(parent)
+        self.world = Path(world)
+        self.snapshot_id = snapshot_id
+    
+    def run(self):
+        try:
+            result = WorldSnapshots.shared().restore(self.world, self.snapshot_id, self.report,
+                                                     lambda: self.cancelled)
+            self.restore_done.emit(True, f"Mundo restaurado: {result['files']} archivos "
+                                         f"({format_size(result['bytes'])}, {result['linked']} sin cambios)")
+        except InterruptedError as e:
+            self.restore_done.emit(False, str(e))
+        except Exception as e:
+            self.restore_done.emit(False, f"Error al restaurar: {str(e)}")
 
 # ============================================================================
-# CLASES DE CONFIGURACIÓN
+# SINCRONIZACIÓN CON UN ESPEJO
 # ============================================================================
 
-class VersionConfig:
-    """Maneja la configuración de una versión específica."""
+class DeltaSync:
+    """Sincroniza mundos y packs con un directorio espejo escribiendo solo lo que cambió.
     
-    def __init__(self, version_name: str):
-        self.version_name = version_name
-        self.launch_args = ""
-        self.load()
+    Primero se compara tamaño y mtime. Si difieren, el archivo se corta con
+    la misma huella rodante que las instantáneas (ChunkStore.cut_points) y
+    solo se envían los fragmentos que el espejo no tiene; el resto se copia
+    desde la versión anterior del propio espejo (copy_file_range: en NFS 4.2
+    la copia la hace el servidor). Las firmas de cada archivo del espejo se
+    guardan en META_DIR, así que no hace falta volver a leerlo por la red.
     
-    def get_launch_args(self) -> str:
-        return self.launch_args
+    Cada archivo se reconstruye en un temporal y se reemplaza con un rename;
+    un diario junto al temporal permite continuar donde se quedó.
+    """
     
-    def set_launch_args(self, args: str):
-        self.launch_args = args
+    META_DIR = ".boxcraft-sync"
+    PARTIAL_SUFFIX = ".boxcraft-part"
+    JOURNAL_SUFFIX = ".boxcraft-part.json"
     
-    def config_path(self) -> Path:
-        return VERSIONS_DIR / self.version_name / "boxcraft-config.txt"
+    def __init__(self, target, delete: bool = False, max_workers: int = 0,
+                 progress_callback=None, cancel_check=None):
+        self.target = Path(target)
+        self.delete = delete
+        self.max_workers = max_workers or min(8, (os.cpu_count() or 2) * 2)
+        self.progress_callback = progress_callback
+        self.cancel_check = cancel_check
+        self.lock = threading.Lock()
+        self.bytes_done = 0
+        self.bytes_total = 0
+        self.no_copy_range = False
+        self.stats = {'files': 0, 'unchanged': 0, 'updated': 0, 'resumed': 0,
+                      'sent': 0, 'reused': 0, 'deleted': 0}
+        self.signatures = JsonIndex(self.target / self.META_DIR / "signatures.json")
     
-    def save(self) -> bool:
+    def check_cancelled(self):
+        if self.cancel_check and self.cancel_check():
+            raise InterruptedError("Sincronización cancelada")
+    
+    def _count(self, key: str, size: int):
+        with self.lock:
+            self.stats[key] += size
+            self.bytes_done += size
+            done, total = self.bytes_done, self.bytes_total
+        if self.progress_callback:
+            self.progress_callback(done, total)
+    
+    @staticmethod
+    def unchanged(st, dest: Path) -> bool:
         try:
-            self.config_path().parent.mkdir(parents=True, exist_ok=True)
-            self.config_path().write_text(self.launch_args)
-            return True
-        except Exception:
+            current = os.lstat(dest)
+        except OSError:
             return False
+        return (stat.S_ISREG(current.st_mode) and current.st_size == st.st_size
+                and current.st_mtime_ns == st.st_mtime_ns)
     
-    def load(self) -> bool:
+    @staticmethod
+    def _clear(dest: Path, is_dir: bool):
+        """Quita del espejo lo que ocupa `dest` si es de otro tipo."""
+        if dest.is_symlink():
+            dest.unlink()
+        elif dest.is_dir() and not is_dir:
+            shutil.rmtree(dest)
+        elif is_dir and dest.exists() and not dest.is_dir():
+            dest.unlink()
+    
+    def mirror_chunks(self, rel: str, dest: Path) -> Optional[list]:
+        """Fragmentos [sha256, tamaño] del archivo que ya tiene el espejo; None si no existe."""
         try:
-            if self.config_path().exists():
-                self.launch_args = self.config_path().read_text().strip()
-            return True
-        except Exception:
-            return False
+            current = os.lstat(dest)
+        except FileNotFoundError:
+            return None
+        if not stat.S_ISREG(current.st_mode):
+            return None
+        entry = self.signatures.get(rel)
+        if entry and entry.get('mirror') == [current.st_size, current.st_mtime_ns]:
+            return entry['chunks']
+        # Sin firma válida (espejo copiado a mano o tocado por otro): leerlo una vez
+        chunks = []
+        for chunk in ChunkStore.split_file(dest):
+            self.check_cancelled()
+            chunks.append([hashlib.sha256(chunk).hexdigest(), len(chunk)])
+        return chunks
+    
+    @staticmethod
+    def load_journal(journal: Path, partial: Path, st) -> Optional[dict]:
+        """Estado de un temporal a medias, si sigue valiendo para el origen actual."""
+        try:
+            with open(journal, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if (state.get('source') == [st.st_size, st.st_mtime_ns]
+                    and partial.stat().st_size >= state['done']):
+                return state
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            pass
+        return None
+    
+    @staticmethod
+    def save_journal(journal: Path, st, done: int, chunks: list):
+        tmp = journal.with_name(journal.name + ".tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'source': [st.st_size, st.st_mtime_ns], 'done': done, 'chunks': chunks}, f)
+        os.replace(tmp, journal)
+    
+    def copy_from(self, basis, out, offset: int, length: int):
+        """Copia un rango del archivo anterior del espejo al temporal."""
+        if not self.no_copy_range and hasattr(os, "copy_file_range"):
+            copied = 0
+            try:
+                while copied < length:
+                    n = os.copy_file_range(basis.fileno(), out.fileno(), length - copied,
+                                           offset_src=offset + copied)
+                    if n == 0:
+                        break
+                    copied += n
+                if copied == length:
+                    return
+                raise OSError(errno.EIO, f"El espejo cambió durante la sincronización: {basis.name}")
+            except OSError as e:
+                if copied or e.errno not in FastCopier.UNSUPPORTED_ERRNOS:
+                    raise
+                self.no_copy_range = True
+        data = os.pread(basis.fileno(), length, offset)
+        if len(data) != length:
+            raise OSError(errno.EIO, f"El espejo cambió durante la sincronización: {basis.name}")
+        out.write(data)
+    
+    def sync_file(self, src: str, rel: str, st):
+        """Actualiza un archivo del espejo enviando solo los fragmentos nuevos."""
+        self.check_cancelled()
+        dest = self.target / rel
+        partial = dest.with_name(f".{dest.name}{self.PARTIAL_SUFFIX}")
+        journal = dest.with_name(f".{dest.name}{self.JOURNAL_SUFFIX}")
+        self._clear(dest, is_dir=False)
+        old = self.mirror_chunks(rel, dest)
+        offsets, position = {}, 0
+        for digest, length in old or []:
+            offsets.setdefault(digest, (position, length))
+            position += length
+        
+        state = self.load_journal(journal, partial, st)
+        chunks = state['chunks'] if state else []
+        position = state['done'] if state else 0
+        out = None
+        if state:
+            out = open(partial, 'r+b', buffering=0)
+            out.truncate(position)
+            out.seek(position)
+            with self.lock:
+                self.stats['resumed'] += 1
+                self.bytes_done += position
+        
+        basis = open(dest, 'rb') if offsets else None
+        try:
+            with open(src, 'rb') as fin:
+                fin.seek(position)
+                buf = b""
+                while True:
+                    self.check_cancelled()
+                    data = fin.read(ChunkStore.READ_SIZE)
+                    buf += data
+                    previous = 0
+                    for end in ChunkStore.cut_points(buf, final=not data):
+                        chunk = buf[previous:end]
+                        previous = end
+                        digest = hashlib.sha256(chunk).hexdigest()
+                        index = len(chunks)
+                        chunks.append([digest, len(chunk)])
+                        if out is None:
+                            # Mientras coincida con el espejo en el mismo sitio no se escribe nada
+                            if old is not None and index < len(old) and old[index][0] == digest:
+                                position += len(chunk)
+                                self._count('reused', len(chunk))
+                                continue
+                            out = open(partial, 'wb', buffering=0)
+                            if position:
+                                self.copy_from(basis, out, 0, position)
+                        if digest in offsets:
+                            self.copy_from(basis, out, *offsets[digest])
+                            self._count('reused', len(chunk))
+                        else:
+                            out.write(chunk)
+                            self._count('sent', len(chunk))
+                        position += len(chunk)
+                    buf = buf[previous:]
+                    if out is not None:
+                        self.save_journal(journal, st, position, chunks)
+                    if not data:
+                        break
+            
+            if out is None and not (old is not None and len(old) == len(chunks)):
+                # El espejo tiene de más al final (o no existía y el origen está vacío)
+                out = open(partial, 'wb', buffering=0)
+                if position:
+                    self.copy_from(basis, out, 0, position)
+            if out is not None:
+                out.close()
+                out = None
+                os.chmod(partial, stat.S_IMODE(st.st_mode))
+                os.utime(partial, ns=(st.st_atime_ns, st.st_mtime_ns))
+                os.replace(partial, dest)
+                journal.unlink(missing_ok=True)
+            else:
+                # Mismo contenido: basta con las fechas y los permisos
+                os.chmod(dest, stat.S_IMODE(st.st_mode))
+                os.utime(dest, ns=(st.st_atime_ns, st.st_mtime_ns))
+        finally:
+            if out is not None:
+                out.close()
+            if basis is not None:
+                basis.close()
+        
+        current = os.lstat(dest)
+        self.signatures.set(rel, {'mirror': [current.st_size, current.st_mtime_ns], 'chunks': chunks})
+        with self.lock:
+            self.stats['updated'] += 1
+    
+    def remove_extraneous(self, tops: list, seen: set):
+        """Borra del espejo lo que ya no existe en el origen (y temporales viejos)."""
+        for top in tops:
+            base = self.target / top
+            if not base.is_dir() or base.is_symlink():
+                continue
+            for current, dirs, files in os.walk(base, topdown=False):
+                for name in files + dirs:
+                    path = os.path.join(current, name)
+                    rel = os.path.relpath(path, self.target)
+                    if rel in seen:
+                        continue
+                    self.check_cancelled()
+                    if os.path.isdir(path) and not os.path.islink(path):
+                        shutil.rmtree(path)
+                    else:
+                        os.unlink(path)
+                    if not name.endswith((self.PARTIAL_SUFFIX, self.JOURNAL_SUFFIX)):
+                        self.stats['deleted'] += 1
+            self.signatures.prune(f"{top}/", seen)
+    
+    @staticmethod
+    def check_target(target, roots: list):
+        """Lanza ValueError si el espejo y alguna raíz se solapan.
+        
+        Un espejo dentro del origen se copiaría a sí mismo, y un origen dentro
+        del espejo (p. ej. el espejo en la carpeta del launcher, cuyo games/ es
+        el propio GAMES_DIR) lo borraría remove_extraneous. Se comparan las
+        rutas reales para que un enlace simbólico no lo esconda.
+        """
+        real_target = os.path.realpath(target)
+        for root, _ in roots:
+            real_root = os.path.realpath(root)
+            common = os.path.commonpath([real_target, real_root])
+            if common in (real_target, real_root):
+                raise ValueError(f"El espejo '{target}' no puede estar dentro de '{root}' ni contenerlo")
+    
+    def sync(self, roots: list) -> dict:
+        """Sincroniza las raíces de ExportWriter.export_roots con el espejo."""
+        self.check_target(self.target, roots)
+        self.target.mkdir(parents=True, exist_ok=True)
+        pending, seen, tops = [], set(), []
+        for root, arcname in roots:
+            tops.append(arcname[2:])
+            for path, name in ExportWriter.walk(root, arcname):
+                self.check_cancelled()
+                rel = name[2:]
+                dest = self.target / rel
+                try:
+                    st = os.lstat(path)
+                except OSError:
+                    continue
+                seen.add(rel)
+                if stat.S_ISDIR(st.st_mode):
+                    self._clear(dest, is_dir=True)
+                    dest.mkdir(parents=True, exist_ok=True)
+                elif stat.S_ISLNK(st.st_mode):
+                    link = os.readlink(path)
+                    if not (dest.is_symlink() and os.readlink(dest) == link):
+                        self._clear(dest, is_dir=False)
+                        if os.path.lexists(dest):
+                            dest.unlink()
+                        os.symlink(link, dest)
+                elif stat.S_ISREG(st.st_mode):
+                    self.stats['files'] += 1
+                    if self.unchanged(st, dest):
+                        self.stats['unchanged'] += 1
+                    else:
+                        pending.append((str(path), rel, st))
+        
+        self.bytes_total = sum(st.st_size for _, _, st in pending)
+        # Archivos grandes primero para equilibrar el trabajo entre hilos
+        pending.sort(key=lambda item: item[2].st_size, reverse=True)
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = [pool.submit(self.sync_file, *item) for item in pending]
+                for future in concurrent.futures.as_completed(futures):
+                    try:
+                        future.result()
+                    except Exception:
+                        for f in futures:
+                            f.cancel()
+                        raise
+            if self.delete:
+                self.remove_extraneous(tops, seen)
+        finally:
+            # Las firmas de lo ya terminado sirven aunque se cancele
+            self.signatures.save()
+        return self.stats
+    
+    def summary(self) -> str:
+        s = self.stats
+        text = (f"{s['updated']} de {s['files']} archivos actualizados: "
+                f"{format_size(s['sent'])} enviados, {format_size(s['reused'])} reaprovechados del espejo")
+        if s['resumed']:
+            text += f", {s['resumed']} continuados"
+        if s['deleted']:
+            text += f", {s['deleted']} borrados"
+        return text
+
+class SyncThread(TransferThread):
+    """Sincroniza con un espejo en segundo plano; al cancelar se puede continuar después."""
+    
+    sync_done = Signal(bool, str)
+    
+    def __init__(self, target: str, roots: list, delete: bool = False, parent=None):
+        super().__init__(parent)
+        self.target = target
+        self.roots = roots
+        self.delete = delete
+    
+    def run(self):
+        sync = DeltaSync(self.target, self.delete, progress_callback=self.report,
+                         cancel_check=lambda: self.cancelled)
+        try:
+            sync.sync(self.roots)
+            self.sync_done.emit(True, sync.summary())
+        except InterruptedError as e:
+            self.sync_done.emit(False, f"{e}; se continuará donde se quedó")
+        except Exception as e:
+            self.sync_done.emit(False, f"Error en sincronización: {str(e)}")
 
 # ============================================================================
 # CLASES DE GESTIÓN
@@ -879,21 +6019,17 @@ class VersionManager(QObject):
     
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.current_process = None
+        self.current_job = None
         self.cancelled = False
+        self.last_trash_entry = None  # para deshacer la última eliminación
     
-    def get_installed_versions(self) -> list:
-        """Retorna lista de versiones instaladas."""
-        if VERSIONS_DIR.exists():
-            versions = []
-            for d in VERSIONS_DIR.iterdir():
-                if d.is_dir():
-                    # Verificar si es una versión válida
-                    lib_path = d / "lib" / "x86_64" / "libminecraftpe.so"
-                    if lib_path.exists():
-                        versions.append(d.name)
-            return sorted(versions)  # Ordenar alfabéticamente
-        return []
+    def get_installed_versions(self, order: str = "name") -> list:
+        """Retorna lista de versiones instaladas (desde el índice de versiones)."""
+        return [entry['name'] for entry in VersionIndex.shared().versions(order=order)]
+    
+    def get_version_info(self, version_name: str) -> Optional[dict]:
+        """Metadatos indexados de una versión."""
+        return VersionIndex.shared().entry(version_name)
     
     def get_version_path(self, version_name: str) -> Path:
         """Retorna la ruta de una versión."""
@@ -904,76 +6040,46 @@ class VersionManager(QObject):
         lib_path = self.get_version_path(version_name) / "lib" / "x86_64" / "libminecraftpe.so"
         return lib_path.exists()
     
+    def start_extraction(self, apk_path, version_name: str) -> "ExtractionJob":
+        """Prepara una extracción asíncrona; el llamador conecta señales y llama a start()."""
+        job = ExtractionJob(apk_path, self.get_version_path(version_name), version_name)
+        self.current_job = job
+        return job
+    
     def extract_apk(self, apk_path: str, version_name: str, progress_dialog=None) -> Tuple[bool, str]:
-        """Extrae un APK a una nueva versión."""
-        dest_dir = self.get_version_path(version_name)
+        """Extrae un APK a una nueva versión y espera el resultado sin sondear."""
+        job = self.start_extraction(apk_path, version_name)
+        result = []
+        loop = QEventLoop()
         
-        try:
-            # Limpiar directorio si existe
-            if dest_dir.exists():
-                shutil.rmtree(dest_dir)
-            
-            dest_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Verificar que el extractor existe
-            if not MCPELAUNCHER_EXTRACT.exists():
-                return False, "mcpelauncher-extract no encontrado en resources/"
-            
-            self.cancelled = False
-            
-            # Ejecutar extractor
-            self.current_process = subprocess.Popen(
-                [str(MCPELAUNCHER_EXTRACT), apk_path, str(dest_dir)],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                preexec_fn=os.setsid
-            )
-            
-            # Monitorear progreso
-            while self.current_process.poll() is None:
-                QCoreApplication.processEvents()
-                QThread.msleep(100)
-                
-                # Verificar si se canceló
-                if self.cancelled:
-                    self.kill_extraction_process()
-                    return False, "Cancelado por el usuario"
-            
-            if self.current_process.returncode == 0:
-                return True, f"Versión {version_name} extraída exitosamente"
-            else:
-                error = self.current_process.stderr.read() or "Error desconocido"
-                return False, f"Error en extracción: {error}"
-                
-        except Exception as e:
-            return False, f"Error: {str(e)}"
-        finally:
-            self.current_process = None
-    
-    def kill_extraction_process(self):
-        """Mata el proceso de extracción actual."""
-        if self.current_process and self.current_process.poll() is None:
-            try:
-                os.killpg(os.getpgid(self.current_process.pid), signal.SIGTERM)
-                self.current_process.wait(timeout=2)
-            except:
-                try:
-                    os.killpg(os.getpgid(self.current_process.pid), signal.SIGKILL)
-                except:
-                    pass
+        def on_finished(success, message):
+            result.append((success, message))
+            loop.quit()
+        
+        job.extraction_finished.connect(on_finished)
+        job.start()
+        if not result:
+            loop.exec()
+        self.current_job = None
+        return result[0]
     
     def cancel_extraction(self):
         """Cancela la extracción actual."""
         self.cancelled = True
-        self.kill_extraction_process()
+        if self.current_job:
+            self.current_job.cancel()
     
     def delete_version(self, version_name: str) -> Tuple[bool, str]:
-        """Elimina una versión."""
+        """Elimina una versión (se mueve a la papelera y se purga en segundo plano)."""
         version_path = self.get_version_path(version_name)
         try:
             if version_path.exists():
-                shutil.rmtree(version_path)
+                self.last_trash_entry = TrashManager.shared().delete(version_path)
+                VersionIndex.shared().forget(version_name)
+                DiskUsage.shared().forget(version_path)
+                # Los objetos compartidos solo se liberan cuando se purga la papelera
+                if OBJECTS_DIR.exists():
+                    TrashManager.shared().when_idle(ObjectStore.shared().gc)
                 return True, f"Versión {version_name} eliminada"
             else:
                 return False, f"La versión {version_name} no existe"
@@ -1010,18 +6116,12 @@ class PackInstaller:
             
             # Eliminar existente
             try:
-                if final_dest.is_dir():
-                    shutil.rmtree(final_dest)
-                else:
-                    final_dest.unlink()
+                TrashManager.shared().delete(final_dest, undo=False)
             except Exception as e:
                 return False, f"No se pudo eliminar existente: {str(e)}"
         
         try:
-            if source.is_dir():
-                shutil.copytree(source, final_dest)
-            else:
-                shutil.copy2(source, final_dest)
+            FastCopier().copy(source, final_dest)
             return True, f"Instalado en {target_subdir}"
         except Exception as e:
             return False, f"Error al copiar: {str(e)}"
@@ -1071,6 +6171,8 @@ class GameLauncher:
                     preexec_fn=os.setsid
                 )
             
+            VersionIndex.shared().update(version_name, last_played=time.time())
+            
             # Iniciar monitoreo del proceso
             self.start_monitoring(version_name)
             
@@ -1093,6 +6195,7 @@ class GameLauncher:
             # El juego terminó
             self.monitor_timer.stop()
             self.current_process = None
+            self.snapshot_worlds()
             
             # Mostrar la ventana principal
             app = QApplication.instance()
@@ -1108,6 +6211,17 @@ class GameLauncher:
                         )
                         break
     
+    def snapshot_worlds(self):
+        """Instantánea de los mundos en segundo plano (solo cuesta lo que cambió en la partida)."""
+        if not LauncherSettings().get("world_snapshots"):
+            return
+        worlds = WorldSnapshots.world_dirs()
+        if not worlds:
+            return
+        thread = SnapshotThread(worlds, "exit")
+        thread.snapshot_done.connect(lambda success, message, _: print(f"Instantáneas: {message}"))
+        thread.start()
+    
     def send_desktop_notification(self, title, message):
         """Envía una notificación al escritorio."""
         try:
@@ -1122,7 +6236,12 @@ class GameLauncher:
             pass
 
 class Exporter(QObject):
-    """Exporta e importa versiones."""
+    """Exporta e importa versiones y sincroniza mundos y packs con un espejo.
+    
+    Las preguntas se hacen en el hilo de la interfaz; la copia corre en un
+    ExportThread/ImportThread y el resultado llega por export_finished o
+    import_finished.
+    """
     
     export_finished = Signal(bool, str)
     import_finished = Signal(bool, str)
@@ -1130,6 +6249,48 @@ class Exporter(QObject):
     def __init__(self, parent=None):
         super().__init__(parent)
     
+    @staticmethod
+    def show_progress(parent_widget, title: str, text: str, job: TransferThread) -> QDialog:
+        """Diálogo no modal con bytes, velocidad, tiempo restante y botón de cancelar."""
+        progress_dialog = QDialog(parent_widget)
+        progress_dialog.setWindowTitle(title)
+        progress_dialog.setFixedSize(400, 150)
+        
+        layout = QVBoxLayout(progress_dialog)
+        label = QLabel(text)
+        progress_bar = QProgressBar()
+        progress_bar.setRange(0, 0)  # Indefinido hasta conocer el total
+        stats_label = QLabel("")
+        stats_label.setStyleSheet("color: #AAAAAA; font-size: 11px;")
+        cancel_btn = QPushButton("Cancelar")
+        cancel_btn.setCursor(Qt.PointingHandCursor)
+        
+        layout.addWidget(label)
+        layout.addWidget(progress_bar)
+        layout.addWidget(stats_label)
+        layout.addWidget(cancel_btn)
+        
+        def on_progress(done, total, rate, eta):
+            if total:
+                progress_bar.setRange(0, 1000)
+                progress_bar.setValue(min(1000, done * 1000 // total))
+            stats = f"{format_size(done)} / {format_size(total)} · {format_size(int(rate))}/s"
+            if eta >= 0:
+                stats += f" · quedan {format_duration(eta)}"
+            stats_label.setText(stats)
+        
+        def on_cancel():
+            job.cancel()
+            cancel_btn.setEnabled(False)
+            label.setText("Cancelando...")
+        
+        job.transfer_progress.connect(on_progress)
+        cancel_btn.clicked.connect(on_cancel)
+        progress_dialog.rejected.connect(job.cancel)  # cerrar la ventana también cancela
+        job.finished.connect(progress_dialog.deleteLater)
+        progress_dialog.show()
+        return progress_dialog
+    
     def export_version(self, version_name: str, parent_widget):
         """Exporta una versión a archivo TAR."""
         vm = VersionManager()
@@ -1139,175 +6300,229 @@ class Exporter(QObject):
             QMessageBox.critical(parent_widget, "Error", "La versión no existe")
             return
         
-        # Preguntar si incluir datos del APK
-        reply = QMessageBox.question(
-            parent_widget,
-            "Exportar versión",
-            f"¿Exportar '{version_name}' con datos del APK?\n\n"
-            "Sí: Incluye la versión completa (datos del juego).\n"
-            "No: Solo exporta mods, mapas, etc.",
-            QMessageBox.Yes | QMessageBox.No,
-            QMessageBox.Yes
-        )
-        export_with_apk = reply == QMessageBox.Yes
+        # Preguntar si incluir datos del APK (o solo una referencia a él, si se conoce)
+        reference = VersionReference.for_version(version_name)
+        content_box = QMessageBox(parent_widget)
+        content_box.setWindowTitle("Exportar versión")
+        text = (f"¿Exportar '{version_name}' con datos del APK?\n\n"
+                "Versión completa: incluye los datos del juego.\n")
+        if reference:
+            text += ("Referencia al APK: solo guarda qué APK es; al importar se reconstruye "
+                     "desde la caché o el APK original (MB en lugar de GB).\n")
+        content_box.setText(text + "Solo datos: mods, mapas, etc.")
+        full_btn = content_box.addButton("Versión completa", QMessageBox.AcceptRole)
+        reference_btn = content_box.addButton("Referencia al APK", QMessageBox.AcceptRole) if reference else None
+        data_btn = content_box.addButton("Solo datos", QMessageBox.AcceptRole)
+        content_box.addButton("Cancelar", QMessageBox.RejectRole)
+        content_box.exec()
+        clicked = content_box.clickedButton()
+        if clicked not in (full_btn, data_btn) and (reference_btn is None or clicked != reference_btn):
+            return
+        export_with_apk = clicked == full_btn
+        if reference_btn is None or clicked != reference_btn:
+            reference = None
+        # Se lee directamente de la versión y de GAMES_DIR, sin copia temporal
+        roots = ExportWriter.export_roots(version_path if export_with_apk else None, GAMES_DIR)
+        
+        # Con una exportación anterior se puede guardar solo lo que cambió
+        kind = "full"
+        if ExportManifest.shared().get(ExportManifest.key_for(roots, reference)):
+            kind_box = QMessageBox(parent_widget)
+            kind_box.setWindowTitle("Exportar versión")
+            kind_box.setText("¿Qué tipo de copia quieres hacer?\n\n"
+                             "Incremental: solo lo que cambió desde la última exportación.\n"
+                             "Diferencial: lo que cambió desde la última completa.")
+            kinds = {kind_box.addButton("Completa", QMessageBox.AcceptRole): "full",
+                     kind_box.addButton("Incremental", QMessageBox.AcceptRole): "incremental",
+                     kind_box.addButton("Diferencial", QMessageBox.AcceptRole): "differential"}
+            kind_box.addButton("Cancelar", QMessageBox.RejectRole)
+            kind_box.exec()
+            kind = kinds.get(kind_box.clickedButton())
+            if kind is None:
+                return
         
-        # Seleccionar archivo de destino
+        # Seleccionar archivo de destino (la extensión sigue al formato configurado)
+        compression, level, threads = ExportCompression.from_settings()
+        extension = ExportCompression.extension(compression)
+        suffix = {"full": "", "incremental": "-incremental", "differential": "-diferencial"}[kind]
+        if suffix:
+            suffix += time.strftime("-%Y%m%d-%H%M")
         file_path, _ = QFileDialog.getSaveFileName(
             parent_widget,
             "Guardar como archivo",
-            f"{version_name}.tar.gz",
-            "Archivos TAR (*.tar.gz);;Todos los archivos (*)"
+            f"{version_name}{suffix}{extension}",
+            f"Archivos TAR (*{extension});;Todos los archivos (*)"
         )
         
         if not file_path:
             return
         
-        # Diálogo de progreso
-        progress_dialog = QDialog(parent_widget)
-        progress_dialog.setWindowTitle("Exportando...")
-        progress_dialog.setFixedSize(300, 100)
-        
-        layout = QVBoxLayout(progress_dialog)
-        label = QLabel("Exportando versión...")
-        progress_bar = QProgressBar()
-        progress_bar.setRange(0, 0)  # Indefinido
-        
-        layout.addWidget(label)
-        layout.addWidget(progress_bar)
-        progress_dialog.show()
-        QApplication.processEvents()
-        
-        # Crear directorio temporal
-        temp_dir = Path(tempfile.gettempdir()) / f"boxcraft_export_{version_name}"
-        if temp_dir.exists():
-            shutil.rmtree(temp_dir)
-        temp_dir.mkdir(parents=True)
-        
-        export_dir = temp_dir / f"boxcraft_export_{version_name}"
-        export_dir.mkdir(parents=True)
+        # Se escribe en segundo plano; cancelar borra el archivo a medias
+        job = ExportThread(file_path, roots, compression, level, threads, kind, reference)
+        progress_dialog = self.show_progress(parent_widget, "Exportando...", f"Exportando {version_name}...", job)
         
-        try:
-            # Copiar version_content si se incluye
-            if export_with_apk:
-                version_content_dest = export_dir / "version_content"
-                shutil.copytree(version_path, version_content_dest)
-            
-            # Copiar games/com.mojang
-            games_dest = export_dir / "games"
-            if GAMES_DIR.exists():
-                shutil.copytree(GAMES_DIR, games_dest)
-            
-            # Comprimir con tar
-            with tarfile.open(file_path, "w:gz") as tar:
-                tar.add(export_dir, arcname=".")
-            
-            # Limpiar
-            shutil.rmtree(temp_dir)
-            progress_dialog.close()
-            self.export_finished.emit(True, f"Versión {version_name} exportada como {file_path}")
-            
-        except Exception as e:
-            shutil.rmtree(temp_dir, ignore_errors=True)
+        def on_done(success, message):
             progress_dialog.close()
-            self.export_finished.emit(False, f"Error en exportación: {str(e)}")
+            if success:
+                message = f"Versión {version_name} exportada como {file_path}\n{message}"
+            self.export_finished.emit(success, message)
+        
+        job.export_done.connect(on_done)
+        job.start()
     
     def import_version(self, parent_widget):
-        """Importa una versión desde archivo TAR."""
-        file_path, _ = QFileDialog.getOpenFileName(
+        """Importa una versión desde archivo TAR (todo, solo la versión o solo los datos)."""
+        file_paths, _ = QFileDialog.getOpenFileNames(
             parent_widget,
-            "Seleccionar archivo TAR",
+            "Seleccionar exportación (o una completa y sus incrementales)",
             "",
-            "Archivos TAR (*.tar.gz *.tar);;Todos los archivos (*)"
+            "Exportaciones (*.tar.gz *.tgz *.tar.zst *.tar.xz *.tar *.bca);;Todos los archivos (*)"
         )
         
-        if not file_path:
+        if not file_paths:
             return
         
-        file_name = Path(file_path).stem
+        try:
+            chain = ArchiveImporter.chain_for(file_paths)
+        except (OSError, ValueError, tarfile.TarError) as e:
+            self.import_finished.emit(False, f"Error en importación: {str(e)}")
+            return
+        # La versión toma el nombre de la exportación completa
+        file_path = chain[-1]
+        file_name = ArchiveImporter.version_name_for(chain[0])
         
-        # Verificar si ya existen
-        dest_version_dir = VERSIONS_DIR / file_name
-        dest_games_dir = GAMES_DIR
+        # Qué restaurar
+        choice_box = QMessageBox(parent_widget)
+        choice_box.setWindowTitle("Importar")
+        if len(chain) > 1:
+            choice_box.setText(f"¿Qué quieres restaurar de '{Path(chain[0]).name}' y "
+                               f"{len(chain) - 1} exportaciones posteriores?\n\n"
+                               "Lo que se reemplace irá a la papelera.")
+        else:
+            choice_box.setText(f"¿Qué quieres restaurar de '{Path(file_path).name}'?\n\n"
+                               "Lo que se reemplace irá a la papelera.")
+        all_btn = choice_box.addButton("Todo", QMessageBox.AcceptRole)
+        version_btn = choice_box.addButton("Solo la versión", QMessageBox.AcceptRole)
+        games_btn = choice_box.addButton("Solo mundos y packs", QMessageBox.AcceptRole)
+        entry_btn = None
+        try:
+            if len(chain) == 1 and ExportCompression.detect(file_path) == 'bca':
+                entry_btn = choice_box.addButton("Un mundo o pack...", QMessageBox.AcceptRole)
+        except (OSError, ValueError):
+            pass
+        choice_box.addButton("Cancelar", QMessageBox.RejectRole)
+        choice_box.exec()
         
-        version_exists = dest_version_dir.exists()
-        games_exists = GAMES_DIR.exists() and any(GAMES_DIR.iterdir())
+        clicked = choice_box.clickedButton()
+        if clicked == all_btn:
+            parts = ArchiveImporter.PARTS
+        elif clicked == version_btn:
+            parts = ("version_content",)
+        elif clicked == games_btn:
+            parts = ("games",)
+        elif entry_btn is not None and clicked == entry_btn:
+            # El índice del .bca permite elegir sin leer el resto del archivo
+            try:
+                entries = ArchiveImporter.list_entries(file_path)
+            except (OSError, ValueError) as e:
+                self.import_finished.emit(False, f"Error en importación: {str(e)}")
+                return
+            if not entries:
+                self.import_finished.emit(False, "El archivo no contiene mundos ni packs")
+                return
+            label, ok = QInputDialog.getItem(parent_widget, "Restaurar", "Mundo o pack a restaurar:",
+                                             [entry[2] for entry in entries], 0, False)
+            if not ok:
+                return
+            parts = None
+            entry = entries[[e[2] for e in entries].index(label)]
+        else:
+            return
         
-        if version_exists or games_exists:
-            reply = QMessageBox.warning(
+        # Versión exportada como referencia: si no está en la caché ni se conoce el APK, pedirlo
+        apk_paths = None
+        reference = None
+        if parts is not None and "version_content" in parts:
+            try:
+                reference = (ArchiveImporter.read_manifest(chain[0]) or {}).get('reference')
+            except (OSError, ValueError, tarfile.TarError):
+                reference = None
+        if reference and not VersionReference.available(reference):
+            apk_paths, _ = QFileDialog.getOpenFileNames(
                 parent_widget,
-                "Advertencia",
-                f"¡Este proceso puede tardar!\n¿Quiere continuar?",
-                QMessageBox.Yes | QMessageBox.No,
-                QMessageBox.No
+                f"APK original de {reference.get('game_version') or file_name}",
+                "",
+                "APK o paquetes divididos (*.apk *.apks *.xapk);;Todos los archivos (*)"
             )
-            if reply == QMessageBox.No:
+            if not apk_paths:
+                self.import_finished.emit(False, "La exportación solo guarda una referencia al APK "
+                                                 "y no está disponible en este equipo")
                 return
         
-        # Diálogo de progreso
-        progress_dialog = QDialog(parent_widget)
-        progress_dialog.setWindowTitle("Importando...")
-        progress_dialog.setFixedSize(300, 100)
-        
-        layout = QVBoxLayout(progress_dialog)
-        label = QLabel("Importando versión...")
-        progress_bar = QProgressBar()
-        progress_bar.setRange(0, 0)
+        # Una sola pasada en segundo plano: del archivo a su destino, sin extraer a /tmp
+        job = ImportThread(chain, file_name, parts or ArchiveImporter.PARTS,
+                           entry=(entry[0], entry[1]) if parts is None else None, apk_paths=apk_paths)
+        progress_dialog = self.show_progress(parent_widget, "Importando...", f"Importando {file_name}...", job)
         
-        layout.addWidget(label)
-        layout.addWidget(progress_bar)
-        progress_dialog.show()
-        QApplication.processEvents()
+        def on_done(success, message, result):
+            progress_dialog.close()
+            if not success:
+                self.import_finished.emit(False, message)
+            elif not result['parts']:
+                self.import_finished.emit(False, "El archivo no contiene nada que restaurar")
+            elif parts is None:
+                self.import_finished.emit(True, f"{entry[1][-1]} restaurado correctamente")
+            elif result.get('rebuilt'):
+                source = "la caché de APK" if result['rebuilt'] == "cache" else "el APK original"
+                self.import_finished.emit(True, f"Versión {file_name} importada correctamente "
+                                                f"(reconstruida desde {source})")
+            elif "version_content" in result['parts']:
+                self.import_finished.emit(True, f"Versión {file_name} importada correctamente")
+            else:
+                self.import_finished.emit(True, "Mundos y packs importados correctamente")
         
-        # Directorio temporal
-        temp_dir = Path(tempfile.gettempdir()) / f"boxcraft_import_{file_name}"
-        if temp_dir.exists():
-            shutil.rmtree(temp_dir)
-        temp_dir.mkdir(parents=True)
+        job.import_done.connect(on_done)
+        job.start()
+    
+    def sync_content(self, parent_widget):
+        """Sincroniza mundos y packs con un directorio espejo (p. ej. una carpeta en NFS)."""
+        settings = LauncherSettings()
+        target = QFileDialog.getExistingDirectory(
+            parent_widget,
+            "Carpeta espejo para mundos y packs",
+            settings.get("sync_target") or str(Path.home())
+        )
         
+        if not target:
+            return
+        roots = ExportWriter.export_roots(None, GAMES_DIR)
         try:
-            # Extraer tar
-            with tarfile.open(file_path, "r:*") as tar:
-                tar.extractall(temp_dir)
-            
-            # Buscar directorios
-            version_content_path = None
-            games_path = None
-            
-            for root, dirs, _ in os.walk(temp_dir):
-                if "version_content" in dirs:
-                    version_content_path = Path(root) / "version_content"
-                if "games" in dirs:
-                    games_path = Path(root) / "games"
-            
-            # Mover contenido
-            if version_content_path and version_content_path.exists():
-                if version_exists:
-                    shutil.rmtree(dest_version_dir, ignore_errors=True)
-                dest_version_dir.mkdir(parents=True, exist_ok=True)
-                
-                for item in version_content_path.iterdir():
-                    dest_item = dest_version_dir / item.name
-                    if item.is_dir():
-                        shutil.copytree(item, dest_item)
-                    else:
-                        shutil.copy2(item, dest_item)
-            
-            if games_path and games_path.exists():
-                games_com_mojang = games_path / "com.mojang"
-                if games_com_mojang.exists():
-                    if games_exists:
-                        shutil.rmtree(GAMES_DIR, ignore_errors=True)
-                    shutil.copytree(games_com_mojang, GAMES_DIR)
-            
-            # Limpiar
-            shutil.rmtree(temp_dir)
-            progress_dialog.close()
-            self.import_finished.emit(True, f"Versión {file_name} importada correctamente")
-            
-        except Exception as e:
-            shutil.rmtree(temp_dir, ignore_errors=True)
+            DeltaSync.check_target(target, roots)
+        except ValueError as e:
+            self.export_finished.emit(False, str(e))
+            return
+        settings.set("sync_target", target)
+        
+        reply = QMessageBox.question(
+            parent_widget, "Sincronizar",
+            f"Se copiará a '{target}' solo lo que cambió desde la última vez.\n\n"
+            "¿Borrar también del espejo lo que ya no existe en este equipo?",
+            QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel, QMessageBox.No)
+        if reply == QMessageBox.Cancel:
+            return
+        
+        job = SyncThread(target, roots, reply == QMessageBox.Yes)
+        progress_dialog = self.show_progress(parent_widget, "Sincronizando...",
+                                             f"Sincronizando con {target}...", job)
+        
+        def on_done(success, message):
             progress_dialog.close()
-            self.import_finished.emit(False, f"Error en importación: {str(e)}")
+            if success:
+                message = f"Mundos y packs sincronizados con {target}\n{message}"
+            self.export_finished.emit(success, message)
+        
+        job.sync_done.connect(on_done)
+        job.start()
 
 # ============================================================================
 # DIÁLOGOS
@@ -1319,6 +6534,7 @@ class ExtractDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.apk_path = ""
+        self.apk_paths = []  # varios APK divididos seleccionados a la vez
         self.version_name = ""
         self.setup_ui()
     
@@ -1437,13 +6653,19 @@ class ExtractDialog(QDialog):
         layout.addLayout(button_layout)
     
     def select_apk(self):
-        file_path, _ = QFileDialog.getOpenFileName(
+        # Un APK, un paquete .apks/.xapk o varios APK divididos
+        file_paths, _ = QFileDialog.getOpenFileNames(
             self, "Seleccionar APK de Minecraft", 
-            str(Path.home()), "Archivos APK (*.apk)"
+            str(Path.home()), "APK o paquetes divididos (*.apk *.apks *.xapk)"
         )
-        if file_path:
+        if file_paths:
+            file_path = file_paths[0]
             self.apk_path = file_path
-            self.apk_label.setText(f"📁 {Path(file_path).name}")
+            self.apk_paths = file_paths
+            if len(file_paths) > 1:
+                self.apk_label.setText(f"📁 {Path(file_path).name} y {len(file_paths) - 1} más")
+            else:
+                self.apk_label.setText(f"📁 {Path(file_path).name}")
             self.apk_label.setStyleSheet("color: #4CAF50;")
             
             # Sugerir nombre basado en el archivo
@@ -1474,11 +6696,30 @@ class ExtractDialog(QDialog):
             if reply == QMessageBox.No:
                 return
         
+        # Comprobación previa: detecta APKs incompatibles antes de extraer
+        report = ApkInspector.inspect(self.get_apk_paths(), VERSIONS_DIR / self.version_name)
+        if report['errors']:
+            QMessageBox.critical(self, "APK no compatible", "\n\n".join(report['errors']))
+            return
+        if report['warnings']:
+            reply = QMessageBox.warning(
+                self,
+                "Advertencia",
+                "\n\n".join(report['warnings']) + "\n\n¿Deseas continuar?",
+                QMessageBox.Yes | QMessageBox.No,
+                QMessageBox.No
+            )
+            if reply == QMessageBox.No:
+                return
+        
         self.accept()
     
     def get_apk_path(self):
         return self.apk_path
     
+    def get_apk_paths(self):
+        return self.apk_paths or [self.apk_path]
+    
     def get_version_name(self):
         return self.version_name
 
@@ -1571,6 +6812,32 @@ class PageLoader:
                 'ExtractDialog': ExtractDialog,
                 'PackInstaller': PackInstaller,
                 'VersionConfig': VersionConfig,
+                'BackgroundThread': BackgroundThread,
+                'PackIndex': PackIndex,
+                'PackIndexThread': PackIndexThread,
+                'BedrockLevelDat': BedrockLevelDat,
+                'WorldIndex': WorldIndex,
+                'WorldInfoThread': WorldInfoThread,
+                'ContentWatcher': ContentWatcher,
+                'FastCopier': FastCopier,
+                'CopyThread': CopyThread,
+                'TrashManager': TrashManager,
+                'ExtractionJob': ExtractionJob,
+                'LauncherSettings': LauncherSettings,
+                'PythonApkExtractor': PythonApkExtractor,
+                'ObjectStore': ObjectStore,
+                'VersionIndex': VersionIndex,
+                'ApkManifest': ApkManifest,
+                'VersionSlimmer': VersionSlimmer,
+                'SlimThread': SlimThread,
+                'DedupeThread': DedupeThread,
+                'WorldSnapshots': WorldSnapshots,
+                'SnapshotThread': SnapshotThread,
+                'SnapshotRestoreThread': SnapshotRestoreThread,
+                'DiskUsage': DiskUsage,
+                'DiskUsageThread': DiskUsageThread,
+                'ExportCompression': ExportCompression,
+                'format_size': format_size,
                 
                 # Referencia a la ventana principal
                 'main_window': main_window
@@ -1971,6 +7238,21 @@ def handle_command_line():
     parser = argparse.ArgumentParser(description='BoxCraft Launcher')
     parser.add_argument('--launch', help='Launch a specific version')
     parser.add_argument('--version', action='store_true', help='Show version')
+    parser.add_argument('--bench-extract', metavar='APK',
+                        help='Benchmark the extraction backends on an APK')
+    parser.add_argument('--dedupe', action='store_true',
+                        help='Deduplicate installed versions into the shared object store')
+    parser.add_argument('--bench-runs', type=int, default=1, help='Runs per backend for --bench-extract')
+    parser.add_argument('--export', metavar='VERSION', help='Export a version and the game data (for scheduled backups)')
+    parser.add_argument('--export-mode', choices=ExportManifest.KINDS, default='full',
+                        help='Export everything or only what changed since the last (full) export')
+    parser.add_argument('--output', metavar='PATH', help='Destination file for --export')
+    parser.add_argument('--export-reference', action='store_true',
+                        help='Store only the APK digest of the version instead of its files')
+    parser.add_argument('--sync-to', metavar='DIR',
+                        help='Mirror worlds and packs to DIR, writing only the blocks that changed')
+    parser.add_argument('--sync-delete', action='store_true',
+                        help='With --sync-to, also remove from DIR what no longer exists locally')
     
     args = parser.parse_args()
     
@@ -1978,6 +7260,53 @@ def handle_command_line():
         print(f"BoxCraft Launcher v{APP_VERSION}")
         sys.exit(0)
     
+    if args.dedupe:
+        result = ObjectStore.shared().dedupe([VERSIONS_DIR])
+        report = ObjectStore.shared().report()
+        print(f"{result['files']} archivos revisados, {format_size(result['saved'])} liberados en esta pasada")
+        print(f"Almacén: {report['objects']} objetos ({format_size(report['store_bytes'])}), "
+              f"ahorro total {format_size(report['saved_bytes'])}")
+        sys.exit(0)
+    
+    if args.export:
+        version_path = VERSIONS_DIR / args.export
+        if not version_path.is_dir():
+            print(f"Error: la versión {args.export} no existe")
+            sys.exit(1)
+        reference = VersionReference.for_version(args.export) if args.export_reference else None
+        if args.export_reference and reference is None:
+            print(f"Error: no se conoce el APK de {args.export}; exporta la versión completa")
+            sys.exit(1)
+        compression, level, threads = ExportCompression.from_settings()
+        output = args.output or (f"{args.export}-{args.export_mode}{time.strftime('-%Y%m%d-%H%M')}"
+                                 f"{ExportCompression.extension(compression)}")
+        writer = ExportWriter()
+        try:
+            writer.write(output, ExportWriter.export_roots(None if reference else version_path, GAMES_DIR),
+                         compression, level, threads, args.export_mode, reference)
+        except (OSError, ValueError, tarfile.TarError) as e:
+            print(f"Error en exportación: {e}")
+            sys.exit(1)
+        print(f"{output}\n{writer.change_summary()}\n{writer.savings_report()}")
+        sys.exit(0)
+    
+    if args.sync_to:
+        sync = DeltaSync(args.sync_to, args.sync_delete)
+        try:
+            sync.sync(ExportWriter.export_roots(None, GAMES_DIR))
+        except (OSError, ValueError) as e:
+            print(f"Error en sincronización: {e}")
+            sys.exit(1)
+        print(sync.summary())
+        sys.exit(0)
+    
+    if args.bench_extract:
+        VERSIONS_DIR.mkdir(parents=True, exist_ok=True)
+        for backend, seconds, size in benchmark_extractors(args.bench_extract, max(args.bench_runs, 1)):
+            speed = size / seconds / (1024 * 1024) if seconds else 0
+            print(f"{backend:>8}: {seconds:7.2f} s  {format_size(size):>10}  {speed:8.1f} MB/s")
+        sys.exit(0)
+    
     if args.launch:
         launcher = GameLauncher()
         success, message = launcher.launch_game(args.launch)
@@ -2003,6 +7332,9 @@ def main():
     # Establecer estilo de aplicación
     app.setStyle("Fusion")
     
+    # No destruir hilos de trabajo que sigan corriendo al salir
+    app.aboutToQuit.connect(BackgroundThread.stop_all)
+    
     # Añadir mensaje de inicio
     print(f"Iniciando {APP_NAME} v{APP_VERSION}")
     
@@ -2011,6 +7343,11 @@ def main():
         directory.mkdir(parents=True, exist_ok=True)
         print(f"Directorio verificado/creado: {directory}")
     
+    # Terminar purgas de la papelera que quedaron pendientes
+    TrashManager.shared().resume()
+    if OBJECTS_DIR.exists():
+        TrashManager.shared().when_idle(ObjectStore.shared().gc)
+    
     # Verificar ejecutables mcpelauncher
     if not MCPELAUNCHER_CLIENT.exists():
         print(f"ADVERTENCIA: mcpelauncher-client no encontrado en {RESOURCES_DIR}/")
@@ -3,7 +3,7 @@ import json
 from PySide6.QtWidgets import (
     QVBoxLayout, QLabel, QGroupBox, QLineEdit, QPushButton, 
     QListWidget, QListWidgetItem, QMessageBox, QWidget, 
-    QHBoxLayout, QDialog, QSizePolicy, QFrame, QScrollArea
+    QHBoxLayout, QDialog, QSizePolicy, QFrame, QScrollArea, QComboBox, QSpinBox
 )
 from PySide6.QtCore import Qt, QSize, Signal
 from pathlib import Path
@@ -310,6 +310,123 @@ layout.addWidget(default_info_widget)
 # Espaciador
 layout.addSpacing(10)
 
+# Backend de extracción de APK (preferencia global del launcher)
+extract_group = QGroupBox("Extracción de APK")
+extract_layout = QHBoxLayout(extract_group)
+
+extract_label = QLabel("Método de extracción:")
+extract_label.setStyleSheet("color: #cccccc;")
+
+extract_combo = QComboBox()
+extract_combo.addItem("Automático", "auto")
+extract_combo.addItem("mcpelauncher-extract (externo)", "external")
+extract_combo.addItem("Integrado (Python, en paralelo)", "python")
+extract_combo.setToolTip("Compara ambos con: main.py --bench-extract archivo.apk")
+extract_combo.setStyleSheet("""
+    QComboBox {
+        background-color: #2d2d2d;
+        color: white;
+        border: 1px solid #3d3d3d;
+        border-radius: 6px;
+        padding: 6px 12px;
+        min-width: 240px;
+    }
+""")
+
+launcher_settings = LauncherSettings()
+extract_combo.setCurrentIndex(max(extract_combo.findData(launcher_settings.get("extract_backend")), 0))
+
+def on_extract_backend_changed(index):
+    """Guarda el backend elegido."""
+    if not launcher_settings.set("extract_backend", extract_combo.itemData(index)):
+        QMessageBox.critical(page_widget, "Error", "No se pudo guardar la configuración")
+
+extract_combo.currentIndexChanged.connect(on_extract_backend_changed)
+
+extract_layout.addWidget(extract_label)
+extract_layout.addWidget(extract_combo)
+extract_layout.addStretch()
+
+layout.addWidget(extract_group)
+layout.addSpacing(10)
+
+# Compresión de las exportaciones
+export_group = QGroupBox("Exportación")
+export_layout = QHBoxLayout(export_group)
+
+export_format_label = QLabel("Formato:")
+export_format_label.setStyleSheet("color: #cccccc;")
+export_format_combo = QComboBox()
+export_format_names = {
+    "gzip": "gzip por bloques (compatible)",
+    "zstd": "zstd multihilo",
+    "xz": "xz por bloques (más pequeño)",
+    "bca": "Indexado .bca (restaurar por partes)",
+    "none": "Sin comprimir",
+}
+for fmt in ExportCompression.available():
+    export_format_combo.addItem(export_format_names[fmt], fmt)
+export_format_combo.setStyleSheet(extract_combo.styleSheet().replace("min-width: 240px;", "min-width: 200px;"))
+export_format_combo.setCurrentIndex(max(export_format_combo.findData(launcher_settings.get("export_format")), 0))
+
+spin_style = """
+    QSpinBox {
+        background-color: #2d2d2d;
+        color: white;
+        border: 1px solid #3d3d3d;
+        border-radius: 6px;
+        padding: 4px 8px;
+    }
+"""
+
+export_level_label = QLabel("Nivel:")
+export_level_label.setStyleSheet("color: #cccccc;")
+export_level_spin = QSpinBox()
+export_level_spin.setStyleSheet(spin_style)
+
+export_threads_label = QLabel("Hilos:")
+export_threads_label.setStyleSheet("color: #cccccc;")
+export_threads_spin = QSpinBox()
+export_threads_spin.setRange(0, 256)
+export_threads_spin.setSpecialValueText("Auto")
+export_threads_spin.setToolTip("0 = un hilo por núcleo")
+export_threads_spin.setStyleSheet(spin_style)
+export_threads_spin.setValue(int(launcher_settings.get("export_threads") or 0))
+
+def update_export_level_range():
+    """Ajusta el rango del nivel al formato elegido."""
+    fmt = export_format_combo.currentData()
+    low, high = ExportCompression.FORMATS[fmt][2]
+    export_level_spin.blockSignals(True)
+    export_level_spin.setRange(low, high)
+    export_level_spin.setValue(ExportCompression.clamp_level(fmt, launcher_settings.get("export_level")))
+    export_level_spin.blockSignals(False)
+    export_level_spin.setEnabled(high > low)
+
+def on_export_setting_changed(key, value):
+    if not launcher_settings.set(key, value):
+        QMessageBox.critical(page_widget, "Error", "No se pudo guardar la configuración")
+
+def on_export_format_changed(index):
+    on_export_setting_changed("export_format", export_format_combo.itemData(index))
+    update_export_level_range()
+
+update_export_level_range()
+export_format_combo.currentIndexChanged.connect(on_export_format_changed)
+export_level_spin.valueChanged.connect(lambda value: on_export_setting_changed("export_level", value))
+export_threads_spin.valueChanged.connect(lambda value: on_export_setting_changed("export_threads", value))
+
+export_layout.addWidget(export_format_label)
+export_layout.addWidget(export_format_combo)
+export_layout.addWidget(export_level_label)
+export_layout.addWidget(export_level_spin)
+export_layout.addWidget(export_threads_label)
+export_layout.addWidget(export_threads_spin)
+export_layout.addStretch()
+
+layout.addWidget(export_group)
+layout.addSpacing(10)
+
 # Grupo de lista de versiones
 versions_group = QGroupBox("Versiones instaladas")
 versions_layout = QVBoxLayout(versions_group)
@@ -319,6 +436,26 @@ desc_label = QLabel("Para cada versión puedes configurar argumentos o establece
 desc_label.setStyleSheet("color: #cccccc; margin-bottom: 10px;")
 versions_layout.addWidget(desc_label)
 
+# Orden de la lista y espacio ocupado (medido en segundo plano)
+sort_layout = QHBoxLayout()
+sort_label = QLabel("Ordenar por:")
+sort_label.setStyleSheet("color: #cccccc;")
+sort_combo = QComboBox()
+sort_combo.addItem("Nombre", "name")
+sort_combo.addItem("Tamaño", "size")
+sort_combo.setStyleSheet(extract_combo.styleSheet().replace("min-width: 240px;", "min-width: 120px;"))
+sort_combo.currentIndexChanged.connect(lambda index: load_versions_list(measure=False))
+
+games_usage_label = QLabel()
+games_usage_label.setStyleSheet("color: #888888;")
+games_usage_label.setToolTip(str(GAMES_DIR))
+
+sort_layout.addWidget(sort_label)
+sort_layout.addWidget(sort_combo)
+sort_layout.addStretch()
+sort_layout.addWidget(games_usage_label)
+versions_layout.addLayout(sort_layout)
+
 # Contenedor para la lista (con scroll si es necesario)
 list_scroll_area = QScrollArea()
 list_scroll_area.setWidgetResizable(True)
@@ -368,6 +505,66 @@ current_selected_widget = None
 
 current_default_version = ""
 
+# Tamaños conocidos por versión y etiquetas que los muestran
+version_sizes = {}
+version_size_labels = {}
+usage_threads = []
+
+def show_games_usage(size):
+    games_usage_label.setText(f"Datos del juego: {format_size(size)}" if size is not None
+                              else "Datos del juego: calculando…")
+
+def show_version_size(version_name):
+    label = version_size_labels.get(version_name)
+    if label is not None:
+        size = version_sizes.get(version_name)
+        label.setText(format_size(size) if size is not None else "…")
+
+def measure_usage(versions):
+    """Mide versiones y datos del juego en segundo plano (solo lo que cambió)."""
+    for previous in usage_threads:
+        previous.cancel()
+        previous.usage_measured.disconnect()
+    usage_threads.clear()
+    
+    paths = {str(VERSIONS_DIR / v): v for v in versions}
+    
+    def on_usage_measured(path, size):
+        if path in paths:
+            version_sizes[paths[path]] = size
+            show_version_size(paths[path])
+        elif path == str(GAMES_DIR):
+            show_games_usage(size)
+    
+    def on_usage_finished(count):
+        if thread in usage_threads:
+            usage_threads.remove(thread)
+        # Con orden por tamaño se reordena cuando ya se conocen todos
+        shown = [version_list.item(i).data(Qt.UserRole) for i in range(version_list.count())]
+        if sort_combo.currentData() == "size" and shown != sorted_versions(list(paths.values())):
+            load_versions_list(measure=False)
+    
+    thread = DiskUsageThread(list(paths) + [GAMES_DIR])
+    thread.usage_measured.connect(on_usage_measured)
+    thread.usage_finished.connect(on_usage_finished)
+    usage_threads.append(thread)
+    thread.start()
+
+def stop_usage_threads():
+    for thread in usage_threads:
+        thread.cancel()
+        thread.usage_measured.disconnect()
+        thread.usage_finished.disconnect()
+    usage_threads.clear()
+
+page_widget.destroyed.connect(lambda *args: stop_usage_threads())
+
+def sorted_versions(versions):
+    """Aplica el orden elegido; las versiones aún sin medir van al final."""
+    if sort_combo.currentData() == "size":
+        return sorted(versions, key=lambda v: (version_sizes.get(v) is None, -(version_sizes.get(v) or 0), v))
+    return sorted(versions)
+
 def load_default_version():
     """Carga la versión predeterminada desde el archivo de configuración."""
     global current_default_version
@@ -409,9 +606,10 @@ def load_default_version():
             }
         """)
 
-def load_versions_list():
+def load_versions_list(measure=True):
     """Carga las versiones en la lista."""
     version_list.clear()
+    version_size_labels.clear()
     global current_selected_widget
     current_selected_widget = None
     
@@ -419,6 +617,15 @@ def load_versions_list():
         vm = VersionManager()
         versions = vm.get_installed_versions()
         
+        # Lo ya medido se muestra al instante; el resto llega del hilo
+        usage = DiskUsage.shared()
+        for version in versions:
+            if version not in version_sizes:
+                version_sizes[version] = usage.cached(VERSIONS_DIR / version)
+        if measure:
+            show_games_usage(usage.cached(GAMES_DIR))
+        versions = sorted_versions(versions)
+        
         if not versions:
             # Mostrar mensaje de que no hay versiones
             item = QListWidgetItem()
@@ -452,6 +659,9 @@ def load_versions_list():
             # Mostrar versiones disponibles
             for version in versions:
                 add_version_item(version)
+        
+        if measure:
+            measure_usage(versions)
                 
     except Exception as e:
         print(f"Error cargando versiones: {e}")
@@ -527,6 +737,21 @@ def add_version_item(version_name):
     
     main_layout.addStretch()
     
+    # Espacio en disco de la versión
+    size_label = QLabel()
+    size_label.setObjectName("sizeLabel")
+    size_label.setStyleSheet("""
+        QLabel#sizeLabel {
+            font-size: 12px;
+            color: #888888;
+            background-color: transparent;
+            border: none;
+        }
+    """)
+    version_size_labels[version_name] = size_label
+    show_version_size(version_name)
+    main_layout.addWidget(size_label)
+    
     # Botón de configuración (siempre visible)
     config_btn = QPushButton("⚙️")
     config_btn.setObjectName("configButton")
@@ -736,7 +961,7 @@ def set_as_default(version_name):
         
         # Actualizar la interfaz
         load_default_version()
-        load_versions_list()
+        load_versions_list(measure=False)
         
         QMessageBox.information(main_window, "Versión predeterminada establecida", 
                                f"{version_name} es ahora la versión predeterminada")
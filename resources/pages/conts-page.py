@@ -3,9 +3,10 @@ from PySide6.QtCore import Qt, QTimer
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                               QPushButton, QListWidget, QListWidgetItem, 
                               QFrame, QMessageBox, QDialog, QProgressBar, 
-                              QFileDialog, QApplication, QGroupBox, QTabWidget)
+                              QFileDialog, QApplication, QGroupBox, QTabWidget,
+                              QComboBox, QInputDialog)
 from pathlib import Path
-import shutil
+from datetime import datetime
 import os
 
 # RUTA UNIFICADA: Todos los archivos van aquí
@@ -20,6 +21,32 @@ for subdir in ["behavior_packs", "resource_packs", "minecraftWorlds"]:
 layout = QVBoxLayout(page_widget)
 layout.setContentsMargins(20, 20, 20, 20)
 
+# Criterio de orden de cada lista: "name" o "size"
+sort_modes = {"behavior_packs": "name", "resource_packs": "name", "minecraftWorlds": "name"}
+
+def make_sort_combo(key):
+    """Selector de orden (nombre o tamaño) para una lista de contenido."""
+    combo = QComboBox()
+    combo.addItem("Por nombre", "name")
+    combo.addItem("Por tamaño", "size")
+    combo.setToolTip("Ordenar la lista")
+    combo.setStyleSheet("""
+        QComboBox {
+            background-color: #2d2d2d;
+            color: white;
+            border: 1px solid #3d3d3d;
+            border-radius: 6px;
+            padding: 4px 10px;
+        }
+    """)
+    
+    def on_changed(index):
+        sort_modes[key] = combo.itemData(index)
+        sort_list(key)
+    
+    combo.currentIndexChanged.connect(on_changed)
+    return combo
+
 # Tabs para diferentes tipos de contenido
 content_tabs = QTabWidget()
 
@@ -174,6 +201,7 @@ delete_btn.setStyleSheet("""
 btn_layout.addWidget(delete_btn)
 
 btn_layout.addStretch()
+btn_layout.addWidget(make_sort_combo("behavior_packs"))
 manage_layout.addLayout(btn_layout)
 
 mods_columns.addWidget(manage_group)
@@ -305,6 +333,7 @@ textures_delete_btn.setStyleSheet("""
 """)
 
 textures_btn_layout.addStretch()
+textures_btn_layout.addWidget(make_sort_combo("resource_packs"))
 textures_manage_layout.addLayout(textures_btn_layout)
 
 textures_columns.addWidget(textures_manage_group)
@@ -431,7 +460,22 @@ worlds_delete_btn.setStyleSheet("""
 """)
 worlds_btn_layout.addWidget(worlds_delete_btn)
 
+worlds_snapshots_btn = QPushButton("🕘")
+worlds_snapshots_btn.setObjectName("IconButton")
+worlds_snapshots_btn.setToolTip("Instantáneas del mundo seleccionado")
+worlds_snapshots_btn.clicked.connect(lambda: world_snapshots_func())
+worlds_snapshots_btn.setStyleSheet(worlds_refresh_btn.styleSheet())
+worlds_btn_layout.addWidget(worlds_snapshots_btn)
+
+worlds_sync_btn = QPushButton("🔁")
+worlds_sync_btn.setObjectName("IconButton")
+worlds_sync_btn.setToolTip("Sincronizar mundos y packs con una carpeta espejo")
+worlds_sync_btn.clicked.connect(lambda: main_window.exporter.sync_content(main_window))
+worlds_sync_btn.setStyleSheet(worlds_refresh_btn.styleSheet())
+worlds_btn_layout.addWidget(worlds_sync_btn)
+
 worlds_btn_layout.addStretch()
+worlds_btn_layout.addWidget(make_sort_combo("minecraftWorlds"))
 worlds_manage_layout.addLayout(worlds_btn_layout)
 
 worlds_main.addWidget(worlds_manage_group)
@@ -573,25 +617,47 @@ def install_pack(pack_type, is_folder=False):
     progress_dialog.show()
     QApplication.processEvents()
     
+    def finish(success, message):
+        progress_dialog.close()
+        
+        if success:
+            QMessageBox.information(main_window, "Instalación completada", message)
+            # La lista se actualiza sola vía ContentWatcher
+            refresh_after_change(pack_type)
+        else:
+            QMessageBox.critical(main_window, "Error en instalación", message)
+    
     def install():
         try:
-            # Eliminar si ya existe
+            # Eliminar si ya existe (purga en segundo plano)
             if target_path.exists():
-                if target_path.is_dir():
-                    shutil.rmtree(target_path)
-                else:
-                    target_path.unlink()
+                TrashManager.shared().delete(target_path, undo=False)
             
             # Copiar o extraer
             if is_folder or source_path.is_dir():
-                shutil.copytree(source_path, target_path)
-                success = True
+                # Copia en segundo plano (reflink/copy_file_range) con progreso real
+                copy_thread = CopyThread(source_path, target_path)
+                progress_bar.setRange(0, 1000)
+                progress_bar.setValue(0)
+                
+                def on_copy_progress(done, total):
+                    if total:
+                        progress_bar.setValue(int(done * 1000 / total))
+                        label.setText(f"Instalando {pack_name}... {format_size(done)} / {format_size(total)}")
+                
+                def on_copy_finished(ok, detail):
+                    if not ok:
+                        finish(False, f"Error al instalar: {detail}")
+                    elif pack_type == "minecraftWorlds":
+                        # Mensaje específico según tipo
+                        finish(True, f"¡Mundo '{pack_name}' instalado correctamente!")
+                    else:
+                        finish(True, f"¡{pack_name} instalado correctamente!")
                 
-                # Mensaje específico según tipo
-                if pack_type == "minecraftWorlds":
-                    message = f"¡Mundo '{pack_name}' instalado correctamente!"
-                else:
-                    message = f"¡{pack_name} instalado correctamente!"
+                copy_thread.copy_progress.connect(on_copy_progress)
+                copy_thread.copy_finished.connect(on_copy_finished)
+                copy_thread.start()
+                return
                     
             elif source_path.suffix in ['.zip', '.mcpack', '.mcaddon']:
                 # Extraer archivo comprimido
@@ -602,7 +668,7 @@ def install_pack(pack_type, is_folder=False):
                 message = f"¡{pack_name} extraído e instalado correctamente!"
             else:
                 # Copiar archivo simple
-                shutil.copy2(source_path, target_path)
+                FastCopier().copy_file(source_path, target_path)
                 success = True
                 message = f"¡{pack_name} copiado correctamente!"
                 
@@ -610,73 +676,276 @@ def install_pack(pack_type, is_folder=False):
             success = False
             message = f"Error al instalar: {str(e)}"
         
-        progress_dialog.close()
-        
-        if success:
-            QMessageBox.information(main_window, "Instalación completada", message)
-            # Actualizar la lista correspondiente
-            if pack_type == "behavior_packs":
-                load_packs("behavior_packs", mods_list)
-            elif pack_type == "resource_packs":
-                load_packs("resource_packs", textures_list)
-            elif pack_type == "minecraftWorlds":
-                load_worlds_func()
-        else:
-            QMessageBox.critical(main_window, "Error en instalación", message)
+        finish(success, message)
     
     QTimer.singleShot(100, install)
     
+# Hilos de indexado activos por tipo de contenido
+pack_index_threads = {"behavior_packs": [], "resource_packs": []}
+pack_usage_threads = {"behavior_packs": [], "resource_packs": []}
+world_info_threads = []
+
+# Items mostrados por tipo de contenido: ruta -> QListWidgetItem
+pack_lists = {"behavior_packs": mods_list, "resource_packs": textures_list}
+pack_items = {"behavior_packs": {}, "resource_packs": {}}
+# Estado de cada pack: ruta -> [es_carpeta, metadatos, tamaño]
+pack_state = {}
+
+def stop_background_indexing():
+    """Desconecta los hilos de indexado cuando la página se destruye."""
+    for threads in pack_index_threads.values():
+        for thread in threads:
+            thread.cancel()
+            thread.pack_indexed.disconnect()
+        threads.clear()
+    for threads in pack_usage_threads.values():
+        stop_usage_threads(threads)
+    for thread in world_info_threads:
+        thread.cancel()
+        thread.world_info.disconnect()
+        thread.world_size.disconnect()
+    world_info_threads.clear()
+
+page_widget.destroyed.connect(lambda *args: stop_background_indexing())
+
+def stop_usage_threads(threads):
+    for thread in threads:
+        thread.cancel()
+        thread.usage_measured.disconnect()
+        thread.usage_finished.disconnect()
+    threads.clear()
+
+def sort_key_for(key, path):
+    """Clave de orden de un elemento según el criterio elegido para su lista.
+    
+    Por tamaño van primero los más grandes y al final los que aún no se midieron.
+    """
+    if key == "minecraftWorlds":
+        info, size = world_state.get(path, [None, None])
+        name = ((info or {}).get("name") or Path(path).name).lower()
+    else:
+        size = pack_state.get(path, [None, None, None])[2]
+        name = Path(path).name.lower()
+    if sort_modes[key] == "size":
+        return (size is None, -(size or 0), name)
+    return (False, 0, name)
+
+def sort_list(key):
+    """Reordena una lista ya cargada sin volver a leer el disco."""
+    list_widget = worlds_list_widget if key == "minecraftWorlds" else pack_lists[key]
+    items = [list_widget.item(row) for row in range(list_widget.count())]
+    if not items or not all(item.data(Qt.UserRole) for item in items):
+        return  # lista vacía (solo el mensaje)
+    ordered = sorted(items, key=lambda item: sort_key_for(key, item.data(Qt.UserRole)))
+    if [item.data(Qt.UserRole) for item in ordered] == [item.data(Qt.UserRole) for item in items]:
+        return
+    current = list_widget.currentItem()
+    while list_widget.count():
+        list_widget.takeItem(0)
+    for item in ordered:
+        list_widget.addItem(item)
+    if current is not None:
+        list_widget.setCurrentItem(current)
+
+def insert_sorted(key, list_widget, list_item):
+    """Inserta un item respetando el orden elegido para la lista."""
+    # Quitar el mensaje de lista vacía si estaba
+    if list_widget.count() == 1 and not list_widget.item(0).data(Qt.UserRole):
+        list_widget.takeItem(0)
+    own_key = sort_key_for(key, list_item.data(Qt.UserRole))
+    row = 0
+    while row < list_widget.count():
+        other = list_widget.item(row).data(Qt.UserRole)
+        if other and sort_key_for(key, other) > own_key:
+            break
+        row += 1
+    list_widget.insertItem(row, list_item)
+
+def show_empty_message(pack_type, list_widget):
+    """Muestra el mensaje de lista vacía si no quedan elementos."""
+    if list_widget.count() > 0:
+        return
+    if pack_type == "behavior_packs":
+        list_item = QListWidgetItem("📭 No hay behavior packs instalados")
+    elif pack_type == "resource_packs":
+        list_item = QListWidgetItem("📭 No hay resource packs instalados")
+    elif pack_type == "minecraftWorlds":
+        list_item = QListWidgetItem("🌍 No hay mundos guardados")
+    else:
+        list_item = QListWidgetItem("📭 No hay contenido instalado")
+    
+    list_item.setFlags(Qt.NoItemFlags)  # No seleccionable
+    list_widget.addItem(list_item)
+
+def format_pack_item(list_item, pack_path, info, size=None):
+    """Actualiza el texto y tooltip de un item con los metadatos del pack."""
+    name = info.get("name") or pack_path.name
+    version = info.get("version")
+    text = f"📦 {name}"
+    if version:
+        text += f"  v{version}"
+    if size is not None:
+        text += f"  ·  {format_size(size)}"
+    list_item.setText(text)
+    
+    tooltip = [name]
+    if version:
+        tooltip.append(f"Versión: {version}")
+    if info.get("uuid"):
+        tooltip.append(f"UUID: {info['uuid']}")
+    if info.get("min_engine_version"):
+        tooltip.append(f"Motor mínimo: {info['min_engine_version']}")
+    if info.get("description"):
+        tooltip.append(info["description"])
+    if size is not None:
+        tooltip.append(f"Tamaño: {format_size(size)}")
+    tooltip.append(f"Carpeta: {pack_path.name}")
+    list_item.setToolTip("\n".join(tooltip))
+
+def show_pack_item(pack_type, path):
+    """Refresca un item con lo que se sepa del pack (metadatos y tamaño)."""
+    list_item = pack_items[pack_type].get(path)
+    if list_item is None:
+        return
+    is_dir, info, size = pack_state[path]
+    if info is not None:
+        format_pack_item(list_item, Path(path), info, size)
+        return
+    text = f"{'📁' if is_dir else '📄'} {Path(path).name}"
+    if size is not None:
+        text += f"  ·  {format_size(size)}"
+    list_item.setText(text)
+    list_item.setToolTip(f"Tamaño: {format_size(size)}" if size is not None else "")
+
+def make_pack_item(pack_type, item, is_dir):
+    """Crea el item de un pack; retorna (item, necesita_indexado)."""
+    list_item = QListWidgetItem()
+    list_item.setData(Qt.UserRole, str(item))  # Guardar ruta completa
+    info = None
+    if is_dir:
+        info = PackIndex.shared().lookup(item, PackIndex.stamp_for(item))
+    
+    pack_items[pack_type][str(item)] = list_item
+    pack_state[str(item)] = [is_dir, info, DiskUsage.shared().cached(item) if is_dir else None]
+    show_pack_item(pack_type, str(item))
+    return list_item, is_dir and info is None
+
+def index_packs(pack_type, paths):
+    """Analiza en segundo plano los manifests de los packs indicados."""
+    items = pack_items[pack_type]
+    
+    def on_pack_indexed(path, info):
+        if path in items:
+            pack_state[path][1] = info
+            show_pack_item(pack_type, path)
+    
+    def on_index_finished(count):
+        if thread in pack_index_threads[pack_type]:
+            pack_index_threads[pack_type].remove(thread)
+    
+    thread = PackIndexThread(paths)
+    thread.pack_indexed.connect(on_pack_indexed)
+    thread.index_finished.connect(on_index_finished)
+    pack_index_threads[pack_type].append(thread)
+    thread.start()
+
+def measure_packs(pack_type, paths):
+    """Calcula en segundo plano el espacio de los packs (solo lo que cambió)."""
+    def on_usage_measured(path, size):
+        if path in pack_items[pack_type]:
+            pack_state[path][2] = size
+            show_pack_item(pack_type, path)
+    
+    def on_usage_finished(count):
+        if thread in pack_usage_threads[pack_type]:
+            pack_usage_threads[pack_type].remove(thread)
+        if sort_modes[pack_type] == "size":
+            sort_list(pack_type)
+    
+    thread = DiskUsageThread(paths)
+    thread.usage_measured.connect(on_usage_measured)
+    thread.usage_finished.connect(on_usage_finished)
+    pack_usage_threads[pack_type].append(thread)
+    thread.start()
+
 def load_packs(pack_type, list_widget):
     """Cargar packs desde el directorio correcto"""
     list_widget.clear()
+    for path in pack_items[pack_type]:
+        pack_state.pop(path, None)
+    pack_items[pack_type].clear()
     pack_dir = GAMES_DIR / pack_type
     
+    # Detener indexados anteriores de esta lista
+    for previous in pack_index_threads[pack_type]:
+        previous.cancel()
+        previous.pack_indexed.disconnect()
+    pack_index_threads[pack_type].clear()
+    stop_usage_threads(pack_usage_threads[pack_type])
+    
     if not pack_dir.exists():
         return
     
-    # Obtener todos los elementos en el directorio
+    # Obtener todos los elementos en el directorio (sin leer manifests)
     items = []
-    for item in pack_dir.iterdir():
-        if item.name not in [".", ".."]:
-            items.append(item)
+    try:
+        with os.scandir(pack_dir) as entries:
+            for entry in entries:
+                items.append((Path(entry.path), entry.is_dir()))
+    except OSError:
+        pass
     
-    # Ordenar por nombre
-    items.sort(key=lambda x: x.name.lower())
-    
-    # Añadir a la lista
-    for item in items:
-        if item.is_dir():
-            icon = "📁"
-            text = f"{icon} {item.name}"
-        else:
-            icon = "📄"
-            text = f"{icon} {item.name}"
-        
-        list_item = QListWidgetItem(text)
-        list_item.setData(Qt.UserRole, str(item))  # Guardar ruta completa
+    # Añadir a la lista: metadatos y tamaños en caché al instante, el resto en segundo plano
+    pending = []
+    created = []
+    for item, is_dir in items:
+        list_item, needs_index = make_pack_item(pack_type, item, is_dir)
+        created.append(list_item)
+        if needs_index:
+            pending.append(item)
+    created.sort(key=lambda list_item: sort_key_for(pack_type, list_item.data(Qt.UserRole)))
+    for list_item in created:
         list_widget.addItem(list_item)
     
+    index = PackIndex.shared()
+    index.prune(str(pack_dir) + os.sep, set(pack_items[pack_type]))
+    
     # Si no hay elementos, mostrar mensaje
-    if list_widget.count() == 0:
-        if pack_type == "behavior_packs":
-            list_item = QListWidgetItem("📭 No hay behavior packs instalados")
-        elif pack_type == "resource_packs":
-            list_item = QListWidgetItem("📭 No hay resource packs instalados")
+    show_empty_message(pack_type, list_widget)
+    
+    if pending:
+        index_packs(pack_type, pending)
+    else:
+        index.save()
+    if items:
+        measure_packs(pack_type, [item for item, is_dir in items])
+
+def show_deleted_message(message, entry_id, pack_type):
+    """Confirma la eliminación ofreciendo deshacerla mientras siga en la papelera."""
+    msg_box = QMessageBox(main_window)
+    msg_box.setWindowTitle("Eliminación completada")
+    msg_box.setText(message)
+    msg_box.addButton("Aceptar", QMessageBox.AcceptRole)
+    undo_btn = None
+    if entry_id:
+        undo_btn = msg_box.addButton("↩ Deshacer", QMessageBox.ActionRole)
+    msg_box.exec()
+    
+    if undo_btn is not None and msg_box.clickedButton() == undo_btn:
+        restored, detail = TrashManager.shared().restore(entry_id)
+        if restored:
+            refresh_after_change(pack_type)
         else:
-            list_item = QListWidgetItem("📭 No hay contenido instalado")
-        
-        list_item.setFlags(Qt.NoItemFlags)  # No seleccionable
-        list_widget.addItem(list_item)
+            QMessageBox.warning(main_window, "No se pudo deshacer", detail)
 
 def delete_pack(pack_type, list_widget):
     selected = list_widget.currentItem()
-    if not selected or selected.flags() & Qt.NoItemFlags:
+    if not selected or not selected.data(Qt.UserRole):
         QMessageBox.warning(main_window, "Advertencia", "Por favor, selecciona un elemento primero.")
         return
     
-    item_text = selected.text()
-    # Extraer nombre del pack (eliminar icono y espacio)
-    pack_name = item_text.split(" ", 1)[1] if " " in item_text else item_text
+    # Nombre de la carpeta del pack (el texto muestra el nombre del manifest)
+    pack_name = Path(selected.data(Qt.UserRole)).name
     
     # Determinar el tipo de contenido para el mensaje
     if pack_type == "behavior_packs":
@@ -688,7 +957,7 @@ def delete_pack(pack_type, list_widget):
     
     msg_box = QMessageBox(main_window)
     msg_box.setWindowTitle("Confirmar Eliminación")
-    msg_box.setText(f"¿Estás seguro de que quieres eliminar el {content_type} '{pack_name}'?\nEsta acción no se puede deshacer.")
+    msg_box.setText(f"¿Estás seguro de que quieres eliminar el {content_type} '{pack_name}'?\nPodrás deshacerlo durante unos segundos.")
     
     # Crear botones personalizados
     aceptar_btn = msg_box.addButton("Eliminar", QMessageBox.AcceptRole)
@@ -763,61 +1032,148 @@ def delete_pack(pack_type, list_widget):
         pack_path = GAMES_DIR / pack_type / pack_name
         try:
             if pack_path.exists():
-                if pack_path.is_dir():
-                    shutil.rmtree(pack_path)
-                else:
-                    pack_path.unlink()
-                
-                QMessageBox.information(main_window, "Eliminación completada", f"¡{content_type} '{pack_name}' eliminado correctamente!")
-                load_packs(pack_type, list_widget)
+                entry_id = TrashManager.shared().delete(pack_path)
+                refresh_after_change(pack_type)
+                show_deleted_message(f"¡{content_type} '{pack_name}' eliminado correctamente!", entry_id, pack_type)
             else:
                 QMessageBox.warning(main_window, "Advertencia", f"No se encontró el {content_type} '{pack_name}'")
         except Exception as e:
             QMessageBox.critical(main_window, "Error", f"No se pudo eliminar: {str(e)}")
 
+# Items de mundos: ruta -> QListWidgetItem y ruta -> [metadatos, tamaño]
+world_items = {}
+world_state = {}
+
+def format_world_item(world_item, world_path, info, size=None):
+    """Actualiza el texto y tooltip de un item de mundo."""
+    name = (info or {}).get("name") or world_path.name
+    details = []
+    if info and info.get("game_mode"):
+        details.append(info["game_mode"])
+    if info and info.get("version"):
+        details.append(info["version"])
+    if size is not None:
+        details.append(format_size(size))
+    text = f"🌍 {name}"
+    if details:
+        text += "  ·  " + " · ".join(details)
+    world_item.setText(text)
+    
+    tooltip = [name]
+    if info and info.get("last_played"):
+        last_played = datetime.fromtimestamp(info["last_played"]).strftime("%d/%m/%Y %H:%M")
+        tooltip.append(f"Última partida: {last_played}")
+    if size is not None:
+        tooltip.append(f"Tamaño: {format_size(size)}")
+    tooltip.append(f"Carpeta: {world_path.name}")
+    world_item.setToolTip("\n".join(tooltip))
+
+def make_world_item(world_folder):
+    """Crea el item de un mundo con lo que haya en caché.
+    
+    Retorna (item, necesita_metadatos, necesita_tamaño) o None si no es un mundo.
+    """
+    index = WorldIndex.shared()
+    info_stamp = WorldIndex.info_stamp(world_folder)
+    if info_stamp is None:
+        return None  # Sin level.dat no es un mundo válido
+    info = index.cached_info(world_folder, info_stamp)
+    size = index.cached_size(world_folder, WorldIndex.size_stamp(world_folder))
+    
+    world_item = QListWidgetItem()
+    world_item.setData(Qt.UserRole, str(world_folder))  # Guardar ruta completa
+    format_world_item(world_item, world_folder, info, size)
+    world_items[str(world_folder)] = world_item
+    world_state[str(world_folder)] = [info, size]
+    return world_item, info is None, size is None
+
+def read_worlds(info_paths, size_paths):
+    """Lee level.dat y calcula tamaños en segundo plano."""
+    def on_world_info(path, info):
+        if path in world_items:
+            world_state[path][0] = info
+            format_world_item(world_items[path], Path(path), *world_state[path])
+    
+    def on_world_size(path, size):
+        if path in world_items:
+            world_state[path][1] = size
+            format_world_item(world_items[path], Path(path), *world_state[path])
+    
+    def on_finished():
+        if thread in world_info_threads:
+            world_info_threads.remove(thread)
+        if sort_modes["minecraftWorlds"] == "size":
+            sort_list("minecraftWorlds")
+    
+    thread = WorldInfoThread(info_paths, size_paths)
+    thread.world_info.connect(on_world_info)
+    thread.world_size.connect(on_world_size)
+    thread.finished.connect(on_finished)
+    world_info_threads.append(thread)
+    thread.start()
+
 def load_worlds_func():
     """Cargar mundos desde el directorio correcto"""
     worlds_list_widget.clear()
+    world_items.clear()
+    world_state.clear()
     worlds_dir = GAMES_DIR / "minecraftWorlds"
     
+    for thread in world_info_threads:
+        thread.cancel()
+        thread.world_info.disconnect()
+        thread.world_size.disconnect()
+    world_info_threads.clear()
+    
     if not worlds_dir.exists():
         return
     
     # Buscar carpetas que contengan level.dat (mundo de Minecraft)
     worlds = []
+    pending_info = []
+    pending_size = []
     for world_folder in worlds_dir.iterdir():
         if world_folder.is_dir() and world_folder.name not in [".", ".."]:
-            # Verificar si tiene level.dat (es un mundo válido)
-            level_dat = world_folder / "level.dat"
-            if level_dat.exists():
-                worlds.append(world_folder)
+            created = make_world_item(world_folder)
+            if created is None:
+                continue
+            world_item, needs_info, needs_size = created
+            if needs_info:
+                pending_info.append(world_folder)
+            if needs_size:
+                pending_size.append(world_folder)
+            worlds.append((world_folder, world_item))
     
-    # Ordenar por nombre
-    worlds.sort(key=lambda x: x.name.lower())
+    # Ordenar por nombre (del level.dat si ya se conoce) o por tamaño
+    worlds.sort(key=lambda w: sort_key_for("minecraftWorlds", str(w[0])))
     
     # Añadir a la lista
-    for world in worlds:
-        world_item = QListWidgetItem(f"🌍 {world.name}")
-        world_item.setData(Qt.UserRole, str(world))  # Guardar ruta completa
+    for world, world_item in worlds:
         worlds_list_widget.addItem(world_item)
     
+    index = WorldIndex.shared()
+    index.prune(str(worlds_dir) + os.sep, set(world_items))
+    
     # Si no hay mundos, mostrar mensaje
-    if worlds_list_widget.count() == 0:
-        world_item = QListWidgetItem("🌍 No hay mundos guardados")
-        world_item.setFlags(Qt.NoItemFlags)  # No seleccionable
-        worlds_list_widget.addItem(world_item)
+    show_empty_message("minecraftWorlds", worlds_list_widget)
+    
+    if pending_info or pending_size:
+        read_worlds(pending_info, pending_size)
+    else:
+        index.save()
 
 def delete_world_func():
     selected = worlds_list_widget.currentItem()
-    if not selected or selected.flags() & Qt.NoItemFlags:
+    if not selected or not selected.data(Qt.UserRole):
         QMessageBox.warning(main_window, "Advertencia", "Por favor, selecciona un mundo primero.")
         return
     
-    world_name = selected.text().split(" ", 1)[1]
+    # Carpeta del mundo (el texto muestra el LevelName)
+    world_name = Path(selected.data(Qt.UserRole)).name
     
     msg_box = QMessageBox(main_window)
     msg_box.setWindowTitle("Confirmar Eliminación")
-    msg_box.setText(f"¿Estás seguro de que quieres eliminar el mundo '{world_name}'?\nEsta acción no se puede deshacer.")
+    msg_box.setText(f"¿Estás seguro de que quieres eliminar el mundo '{world_name}'?\nPodrás deshacerlo durante unos segundos.")
     
     # Crear botones personalizados
     aceptar_btn = msg_box.addButton("Eliminar", QMessageBox.AcceptRole)
@@ -892,14 +1248,199 @@ def delete_world_func():
         world_path = GAMES_DIR / "minecraftWorlds" / world_name
         try:
             if world_path.exists() and world_path.is_dir():
-                shutil.rmtree(world_path)
-                QMessageBox.information(main_window, "Eliminación completada", f"¡Mundo '{world_name}' eliminado correctamente!")
-                load_worlds_func()
+                entry_id = TrashManager.shared().delete(world_path)
+                refresh_after_change("minecraftWorlds")
+                show_deleted_message(f"¡Mundo '{world_name}' eliminado correctamente!", entry_id, "minecraftWorlds")
             else:
                 QMessageBox.warning(main_window, "Advertencia", f"No se encontró el mundo '{world_name}'")
         except Exception as e:
             QMessageBox.critical(main_window, "Error", f"No se pudo eliminar el mundo: {str(e)}")
 
+def world_snapshots_func():
+    """Crea una instantánea del mundo seleccionado o lo devuelve a una anterior."""
+    selected = worlds_list_widget.currentItem()
+    if not selected or not selected.data(Qt.UserRole):
+        QMessageBox.warning(main_window, "Advertencia", "Por favor, selecciona un mundo primero.")
+        return
+    
+    world_path = Path(selected.data(Qt.UserRole))
+    snapshots = WorldSnapshots.shared()
+    history = snapshots.history(world_path)
+    options = ["➕ Crear instantánea ahora"]
+    for summary in history:
+        created = datetime.fromtimestamp(summary["created"]).strftime("%d/%m/%Y %H:%M")
+        reason = WorldSnapshots.REASONS.get(summary["reason"], summary["reason"])
+        options.append(f"{created} · {reason} · {summary['files']} archivos, "
+                       f"{format_size(summary['bytes'])} (+{format_size(summary['added'])})")
+    
+    choice, ok = QInputDialog.getItem(main_window, "Instantáneas",
+                                      f"Mundo: {selected.text()}\n\nElige una instantánea para restaurarla:",
+                                      options, 0, False)
+    if not ok:
+        return
+    
+    if options.index(choice) == 0:
+        thread = SnapshotThread([world_path], "manual")
+        progress_dialog = main_window.exporter.show_progress(
+            main_window, "Instantánea...", "Guardando los cambios del mundo...", thread)
+        
+        def on_snapshot_done(success, message, created):
+            progress_dialog.close()
+            if not success:
+                if "cancelada" not in message:
+                    QMessageBox.critical(main_window, "Error", message)
+            elif created:
+                QMessageBox.information(main_window, "Instantánea creada",
+                                        f"Instantánea guardada (+{format_size(created[0]['added'])} en el repositorio).")
+            else:
+                QMessageBox.information(main_window, "Instantánea", "El mundo no cambió desde la última instantánea.")
+        
+        thread.snapshot_done.connect(on_snapshot_done)
+        thread.start()
+        return
+    
+    summary = history[options.index(choice) - 1]
+    reply = QMessageBox.question(
+        main_window, "Restaurar instantánea",
+        f"¿Devolver el mundo al estado del {choice.split(' · ')[0]}?\n\n"
+        "El estado actual se guarda antes como otra instantánea.",
+        QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+    if reply != QMessageBox.Yes:
+        return
+    
+    thread = SnapshotRestoreThread(world_path, summary["id"])
+    progress_dialog = main_window.exporter.show_progress(
+        main_window, "Restaurando...", "Restaurando el mundo...", thread)
+    
+    def on_restore_done(success, message):
+        progress_dialog.close()
+        refresh_after_change("minecraftWorlds")
+        if success:
+            QMessageBox.information(main_window, "Mundo restaurado", message)
+        elif "cancelada" not in message:
+            QMessageBox.critical(main_window, "Error", message)
+    
+    thread.restore_done.connect(on_restore_done)
+    thread.start()
+
+# ============================================================================
+# VIGILANCIA DE CARPETAS (actualización incremental de las listas)
+# ============================================================================
+
+def on_entries_added(key, paths):
+    if key in pack_lists:
+        list_widget = pack_lists[key]
+        pending = []
+        added = []
+        for path in map(Path, paths):
+            if str(path) in pack_items[key]:
+                continue
+            list_item, needs_index = make_pack_item(key, path, path.is_dir())
+            insert_sorted(key, list_widget, list_item)
+            added.append(path)
+            if needs_index:
+                pending.append(path)
+        if pending:
+            index_packs(key, pending)
+        if added:
+            measure_packs(key, added)
+    elif key == "minecraftWorlds":
+        pending_info = []
+        pending_size = []
+        for path in map(Path, paths):
+            if str(path) in world_items:
+                continue
+            created = make_world_item(path)
+            if created is None:
+                # El juego crea la carpeta antes que level.dat: se vigila y
+                # aparecerá con entries_changed
+                continue
+            world_item, needs_info, needs_size = created
+            insert_sorted(key, worlds_list_widget, world_item)
+            if needs_info:
+                pending_info.append(path)
+            if needs_size:
+                pending_size.append(path)
+        if pending_info or pending_size:
+            read_worlds(pending_info, pending_size)
+
+def on_entries_removed(key, paths):
+    if key in pack_lists:
+        list_widget, items, index = pack_lists[key], pack_items[key], PackIndex.shared()
+        for path in paths:
+            pack_state.pop(path, None)
+            DiskUsage.shared().forget(path)
+    elif key == "minecraftWorlds":
+        list_widget, items, index = worlds_list_widget, world_items, WorldIndex.shared()
+        for path in paths:
+            world_state.pop(path, None)
+    else:
+        return
+    for path in paths:
+        list_item = items.pop(path, None)
+        if list_item is not None:
+            list_widget.takeItem(list_widget.row(list_item))
+        index.remove(path)
+    index.save()
+    show_empty_message(key, list_widget)
+
+def on_entries_renamed(key, pairs):
+    if key in pack_lists:
+        items, index = pack_items[key], PackIndex.shared()
+    elif key == "minecraftWorlds":
+        items, index = world_items, WorldIndex.shared()
+    else:
+        return
+    for old_path, new_path in pairs:
+        list_item = items.pop(old_path, None)
+        index.rename(old_path, new_path)
+        if list_item is None:
+            on_entries_added(key, [new_path])
+            continue
+        items[new_path] = list_item
+        list_item.setData(Qt.UserRole, new_path)
+        if key == "minecraftWorlds":
+            world_state[new_path] = world_state.pop(old_path, [None, None])
+            format_world_item(list_item, Path(new_path), *world_state[new_path])
+        else:
+            pack_state[new_path] = pack_state.pop(old_path, [Path(new_path).is_dir(), None, None])
+            DiskUsage.shared().forget(old_path)
+            show_pack_item(key, new_path)
+    index.save()
+
+def on_entries_changed(key, paths):
+    """Un mundo cambió (p. ej. el juego guardó level.dat): releer metadatos y tamaño."""
+    if key != "minecraftWorlds":
+        return
+    new_worlds = [p for p in paths if p not in world_items]
+    if new_worlds:
+        on_entries_added(key, new_worlds)
+    existing = [Path(p) for p in paths if p in world_items]
+    index = WorldIndex.shared()
+    stale_info = [p for p in existing if index.cached_info(p, WorldIndex.info_stamp(p)) is None]
+    stale_size = [p for p in existing if index.cached_size(p, WorldIndex.size_stamp(p)) is None]
+    if stale_info or stale_size:
+        read_worlds(stale_info, stale_size)
+
+content_watcher = ContentWatcher(
+    {subdir: GAMES_DIR / subdir for subdir in ["behavior_packs", "resource_packs", "minecraftWorlds"]},
+    watch_children=["minecraftWorlds"],
+    parent=page_widget
+)
+content_watcher.entries_added.connect(on_entries_added)
+content_watcher.entries_removed.connect(on_entries_removed)
+content_watcher.entries_renamed.connect(on_entries_renamed)
+content_watcher.entries_changed.connect(on_entries_changed)
+
+def refresh_after_change(pack_type):
+    """Recarga la lista solo si la carpeta no está vigilada."""
+    if content_watcher.is_watching(pack_type):
+        return
+    if pack_type == "minecraftWorlds":
+        load_worlds_func()
+    elif pack_type in pack_lists:
+        load_packs(pack_type, pack_lists[pack_type])
+
 # Cargar datos iniciales
 load_packs("behavior_packs", mods_list)
 load_packs("resource_packs", textures_list)
@@ -1,14 +1,13 @@
 # Página de inicio - Versiones instaladas
-from PySide6.QtCore import Qt, QTimer, QSize
+from PySide6.QtCore import Qt, QSize
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                               QPushButton, QListWidget, QListWidgetItem, 
                               QFrame, QMessageBox, QDialog, QProgressBar, 
-                              QFileDialog, QApplication, QSizePolicy, QSpacerItem)
+                              QFileDialog, QSizePolicy, QSpacerItem)
 from PySide6.QtGui import QFont
 from pathlib import Path
 import shutil
 import subprocess
-import os
 
 # Configurar layout de la página
 layout = QVBoxLayout(page_widget)
@@ -101,6 +100,16 @@ import_btn.setStyleSheet("""
 """)
 install_buttons_layout.addWidget(import_btn)
 
+# Botón de deduplicar versiones (solo icono, mismo estilo)
+dedupe_btn = QPushButton("🧩")
+dedupe_btn.setObjectName("IconButton")
+dedupe_btn.setToolTip("Optimizar espacio: compartir los archivos idénticos entre versiones")
+dedupe_btn.setFixedSize(36, 36)
+dedupe_btn.setCursor(Qt.PointingHandCursor)
+dedupe_btn.clicked.connect(lambda: dedupe_versions())
+dedupe_btn.setStyleSheet(import_btn.styleSheet())
+install_buttons_layout.addWidget(dedupe_btn)
+
 header_layout.addLayout(install_buttons_layout)
 layout.addLayout(header_layout)
 
@@ -204,14 +213,55 @@ main_window.version_list = version_list
 # Variable global para trackear el widget seleccionado
 current_selected_widget = None
 
+# Etiquetas de detalles por versión: nombre -> (etiqueta, detalles fijos)
+detail_labels = {}
+usage_threads = []
+
+def show_version_details(version_name, size):
+    """Muestra versión del juego, ahorro y tamaño bajo el nombre."""
+    if version_name not in detail_labels:
+        return
+    label, details = detail_labels[version_name]
+    text = " · ".join(details + ([format_size(size)] if size is not None else []))
+    label.setText(text)
+    label.setVisible(bool(text))
+
+def measure_versions(versions):
+    """Actualiza en segundo plano el tamaño de las versiones que cambiaron."""
+    stop_usage_threads()
+    paths = {str(VERSIONS_DIR / v): v for v in versions}
+    
+    def on_usage_measured(path, size):
+        if path in paths:
+            show_version_details(paths[path], size)
+    
+    def on_finished():
+        if thread in usage_threads:
+            usage_threads.remove(thread)
+    
+    thread = DiskUsageThread(list(paths))
+    thread.usage_measured.connect(on_usage_measured)
+    thread.finished.connect(on_finished)
+    usage_threads.append(thread)
+    thread.start()
+
+def stop_usage_threads():
+    for thread in usage_threads:
+        thread.cancel()
+        thread.usage_measured.disconnect()
+    usage_threads.clear()
+
+page_widget.destroyed.connect(lambda *args: stop_usage_threads())
+
 # Cargar versiones - FUNCIÓN SIMPLIFICADA
 def load_versions():
     """Carga las versiones instaladas en la lista."""
     # Limpiar lista actual
     version_list.clear()
+    detail_labels.clear()
     
     vm = VersionManager()
-    versions = vm.get_installed_versions()
+    versions = vm.get_installed_versions(order="game_version")
     
     if not versions:
         # Mostrar mensaje de que no hay versiones
@@ -301,10 +351,69 @@ def load_versions():
                 font-weight: bold;
             """)
             version_label.setMinimumWidth(200)
-            item_layout.addWidget(version_label)
+            
+            # Versión real del juego (del manifiesto del APK) y ahorro si está aligerada
+            info = vm.get_version_info(version) or {}
+            details = []
+            if info.get('game_version'):
+                details.append(f"Minecraft {info['game_version']}")
+            if info.get('slim'):
+                details.append(f"aligerada −{format_size(info['slim'].get('removed_bytes', 0))}")
+            # Espacio en disco: lo último medido; el hilo de uso lo actualiza
+            size = DiskUsage.shared().cached(VERSIONS_DIR / version)
+            if size is None:
+                size = info.get('size')
+            name_layout = QVBoxLayout()
+            name_layout.setSpacing(0)
+            name_layout.addWidget(version_label)
+            game_version_label = QLabel()
+            game_version_label.setStyleSheet("font-size: 11px; color: #AAAAAA;")
+            if info.get('game_version'):
+                game_version_label.setToolTip(
+                    f"versionCode {info.get('version_code')} · SDK mínimo {info.get('min_sdk')} · "
+                    f"ABIs: {', '.join(info.get('abis') or []) or 'desconocidas'}"
+                )
+            detail_labels[version] = (game_version_label, details)
+            show_version_details(version, size)
+            name_layout.addWidget(game_version_label)
+            item_layout.addLayout(name_layout)
             
             item_layout.addStretch()
             
+            # Botón aligerar / restaurar
+            is_slim = bool(info.get('slim'))
+            slim_btn = QPushButton("🪶")
+            slim_btn.setToolTip(f"Restaurar lo retirado de {version}" if is_slim
+                                else f"Aligerar {version}: retirar ABIs y recursos que no se usan")
+            slim_btn.setFixedSize(36, 36)
+            slim_btn.setCursor(Qt.PointingHandCursor)
+            slim_btn.setStyleSheet("""
+                QPushButton {
+                    background-color: #8D6E63;
+                    border: 3px solid;
+                    border-top-color: #A1887F;
+                    border-left-color: #A1887F;
+                    border-right-color: #6D4C41;
+                    border-bottom-color: #6D4C41;
+                    color: white;
+                    font-size: 16px;
+                    font-weight: bold;
+                    border-radius: 6px;
+                }
+                QPushButton:hover {
+                    background-color: #A1887F;
+                    border-top-color: #BCAAA4;
+                    border-left-color: #BCAAA4;
+                }
+                QPushButton:pressed {
+                    background-color: #795548;
+                    border-top-color: #8D6E63;
+                    border-left-color: #8D6E63;
+                }
+            """)
+            slim_btn.clicked.connect(lambda checked, v=version, r=is_slim: slim_version(v, r))
+            item_layout.addWidget(slim_btn)
+            
             # Botón exportar
             export_btn = QPushButton("📤")
             export_btn.setToolTip(f"Exportar versión {version}")
@@ -411,8 +520,63 @@ def load_versions():
         
         # Esconder el botón de jugar inicialmente
         play_button.setVisible(False)
+        
+        measure_versions(versions)
 
 # Función para exportar versión
+def slim_version(version_name, restore=False):
+    """Aligera una versión (o la restaura) en segundo plano y muestra el ahorro."""
+    if not restore:
+        reply = QMessageBox.question(
+            main_window,
+            "Aligerar versión",
+            f"Se retirarán de '{version_name}' las bibliotecas de otras arquitecturas y los "
+            "recursos que el launcher no usa.\n\nSe guardan comprimidos dentro de la versión "
+            "y se pueden restaurar en cualquier momento.\n\n¿Continuar?",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.Yes
+        )
+        if reply != QMessageBox.Yes:
+            return
+    
+    progress_dialog = QDialog(main_window)
+    progress_dialog.setWindowTitle("Restaurando..." if restore else "Aligerando...")
+    progress_dialog.setFixedSize(350, 90)
+    progress_layout = QVBoxLayout(progress_dialog)
+    if restore:
+        progress_layout.addWidget(QLabel(f"Restaurando {version_name}..."))
+    else:
+        progress_layout.addWidget(QLabel(f"Comprimiendo lo retirado de {version_name}..."))
+    progress_bar = QProgressBar()
+    progress_bar.setRange(0, 0)
+    progress_layout.addWidget(progress_bar)
+    
+    thread = SlimThread(version_name, restore=restore)
+    
+    def on_finished(success, message, result):
+        progress_dialog.close()
+        progress_dialog.deleteLater()
+        if not success:
+            QMessageBox.critical(main_window, "Error", message)
+        elif restore or not result.get('files'):
+            QMessageBox.information(main_window, "Listo", message)
+        else:
+            # Solo lo medido: lo compartido con la caché de APK cuenta como retirado
+            # pero no como liberado
+            QMessageBox.information(
+                main_window, "Versión aligerada",
+                f"{message}.\n\n"
+                f"Retirado: {format_size(result['removed_bytes'])} "
+                f"(respaldo comprimido: {format_size(result['archive_bytes'])})\n"
+                f"Disco liberado: {format_size(result['freed_bytes'])}"
+            )
+        if hasattr(main_window, "load_versions"):
+            main_window.load_versions()
+    
+    thread.slim_finished.connect(on_finished)
+    progress_dialog.show()
+    thread.start()
+
 def export_version(version_name):
     main_window.exporter.export_version(version_name, main_window)
 
@@ -451,7 +615,7 @@ def confirm_delete_version(version_name):
     reply = QMessageBox.question(
         main_window,
         "Confirmar eliminación",
-        f"¿Estás seguro de eliminar la versión '{version_name}'?\n\nEsta acción no se puede deshacer.",
+        f"¿Estás seguro de eliminar la versión '{version_name}'?\n\nPodrás deshacerlo durante unos segundos.",
         QMessageBox.Yes | QMessageBox.No,
         QMessageBox.No
     )
@@ -524,9 +688,33 @@ def delete_version(version_name):
             success_dialog.accept()
         
         ok_btn.clicked.connect(on_ok)
-        layout.addWidget(ok_btn)
+        
+        # Deshacer mientras la versión siga en la papelera
+        undo_requested = []
+        if vm.last_trash_entry:
+            undo_btn = QPushButton("↩ Deshacer")
+            undo_btn.setMinimumHeight(40)
+            undo_btn.setStyleSheet(ok_btn.styleSheet().replace("#4A86E8", "#5DBB63").replace("#5D9CFA", "#6BCF72").replace("#3A75D4", "#3D8B40").replace("#6EB0FF", "#7DE285"))
+            
+            def on_undo():
+                undo_requested.append(True)
+                success_dialog.accept()
+            
+            undo_btn.clicked.connect(on_undo)
+            buttons_layout = QHBoxLayout()
+            buttons_layout.addWidget(undo_btn)
+            buttons_layout.addWidget(ok_btn)
+            layout.addLayout(buttons_layout)
+        else:
+            layout.addWidget(ok_btn)
         
         success_dialog.exec()
+        
+        if undo_requested:
+            restored, detail = TrashManager.shared().restore(vm.last_trash_entry)
+            if not restored:
+                QMessageBox.warning(main_window, "No se pudo deshacer", detail)
+        load_versions()
     else:
         # Diálogo personalizado para error
         error_dialog = QDialog(main_window)
@@ -662,49 +850,28 @@ def launch_game():
         main_window.show()
         QMessageBox.critical(main_window, "Error", message)
 
-# Variable para el proceso de extracción
-current_extract_process = None
-
-# Función para cancelar extracción
-def cancel_extraction(progress_dialog):
-    """Cancela el proceso de extracción."""
-    global current_extract_process
-    if current_extract_process and current_extract_process.poll() is None:
-        try:
-            # Matar proceso
-            import signal
-            os.killpg(os.getpgid(current_extract_process.pid), signal.SIGTERM)
-            current_extract_process.wait(timeout=2)
-        except:
-            try:
-                os.killpg(os.getpgid(current_extract_process.pid), signal.SIGKILL)
-            except:
-                pass
-    
-    current_extract_process = None
-    progress_dialog.close()
-    QMessageBox.information(main_window, "Extracción cancelada", "La extracción ha sido cancelada.")
-
 # Función para mostrar diálogo de extracción
 def show_extract_dialog():
     dialog = ExtractDialog(main_window)
     if dialog.exec() == QDialog.Accepted:
-        apk_path = dialog.get_apk_path()
+        apk_paths = dialog.get_apk_paths()
         version_name = dialog.get_version_name()
         
-        # Crear diálogo de progreso
+        # Crear diálogo de progreso (no modal: se pueden lanzar varias extracciones)
         progress_dialog = QDialog(main_window)
-        progress_dialog.setWindowTitle("Extrayendo APK...")
-        progress_dialog.setFixedSize(400, 120)
-        progress_dialog.setModal(True)
+        progress_dialog.setWindowTitle(f"Extrayendo {version_name}...")
+        progress_dialog.setFixedSize(400, 150)
         
         progress_layout = QVBoxLayout(progress_dialog)
         label = QLabel(f"Extrayendo {version_name}...")
         progress_bar = QProgressBar()
-        progress_bar.setRange(0, 0)  # Indeterminado
+        progress_bar.setRange(0, 100)
+        bytes_label = QLabel("")
+        bytes_label.setStyleSheet("color: #AAAAAA; font-size: 11px;")
         
         progress_layout.addWidget(label)
         progress_layout.addWidget(progress_bar)
+        progress_layout.addWidget(bytes_label)
         
         cancel_btn = QPushButton("Cancelar")
         cancel_btn.setCursor(Qt.PointingHandCursor)
@@ -735,39 +902,97 @@ def show_extract_dialog():
         """)
         progress_layout.addWidget(cancel_btn)
         
-        progress_dialog.show()
-        QApplication.processEvents()
+        vm = VersionManager()
+        job = vm.start_extraction(apk_paths, version_name)
+        
+        def on_progress(percent, phase):
+            progress_bar.setValue(percent)
+            label.setText(f"{version_name}: {phase}")
         
-        # Función para extraer en segundo plano
-        def extract():
-            global current_extract_process
-            vm = VersionManager()
+        def on_bytes(written):
+            bytes_label.setText(f"{format_size(written)} escritos")
+        
+        def on_finished(success, message):
+            progress_dialog.close()
+            progress_dialog.deleteLater()
             
-            # Conectar señal de cancelación
-            cancel_btn.clicked.connect(lambda: cancel_extraction(progress_dialog))
+            if success:
+                QMessageBox.information(main_window, "Extracción completada", message)
+            elif "Cancelado" in message:
+                QMessageBox.information(main_window, "Extracción cancelada", "La extracción ha sido cancelada.")
+            else:
+                QMessageBox.critical(main_window, "Error en extracción", message)
             
-            try:
-                success, message = vm.extract_apk(apk_path, version_name, progress_dialog)
-                progress_dialog.close()
-                
-                if success:
-                    QMessageBox.information(main_window, "Extracción completada", message)
-                    # Recargar versiones
-                    load_versions()
-                else:
-                    if "Cancelado" not in message:
-                        QMessageBox.critical(main_window, "Error en extracción", message)
-            except Exception as e:
-                progress_dialog.close()
-                QMessageBox.critical(main_window, "Error", f"Error inesperado: {str(e)}")
-            finally:
-                current_extract_process = None
-        
-        # Iniciar extracción después de un pequeño delay
-        QTimer.singleShot(100, extract)
+            # La página pudo reconstruirse mientras tanto: recargar la que esté visible
+            if success and hasattr(main_window, "load_versions"):
+                main_window.load_versions()
+        
+        job.progress_changed.connect(on_progress)
+        job.bytes_written.connect(on_bytes)
+        job.extraction_finished.connect(on_finished)
+        cancel_btn.clicked.connect(job.cancel)
+        progress_dialog.rejected.connect(job.cancel)  # cerrar la ventana también cancela
+        
+        progress_dialog.show()
+        job.start()
+
+# Deduplicación de versiones en el almacén de objetos
+def dedupe_versions():
+    """Enlaza los archivos idénticos de todas las versiones y muestra el ahorro."""
+    progress_dialog = QDialog(main_window)
+    progress_dialog.setWindowTitle("Optimizando espacio...")
+    progress_dialog.setFixedSize(400, 120)
+    
+    progress_layout = QVBoxLayout(progress_dialog)
+    label = QLabel("Buscando archivos idénticos entre versiones...")
+    progress_bar = QProgressBar()
+    progress_bar.setRange(0, 0)
+    progress_layout.addWidget(label)
+    progress_layout.addWidget(progress_bar)
+    
+    cancel_btn = QPushButton("Cancelar")
+    cancel_btn.setCursor(Qt.PointingHandCursor)
+    progress_layout.addWidget(cancel_btn)
+    
+    thread = DedupeThread([VERSIONS_DIR])
+    
+    def on_progress(done, total):
+        progress_bar.setRange(0, total)
+        progress_bar.setValue(done)
+    
+    def on_finished(success, message, result):
+        progress_dialog.close()
+        progress_dialog.deleteLater()
+        if not success:
+            if "Cancelado" not in message:
+                QMessageBox.critical(main_window, "Error", message)
+            return
+        text = (f"{message}.\n\n"
+                f"Archivos revisados: {result['files']}\n"
+                f"Objetos compartidos: {result['objects']} ({format_size(result['store_bytes'])})\n"
+                f"Ahorro total entre versiones: {format_size(result['saved_bytes'])}")
+        if thread.skipped_versions:
+            text += f"\n\nOmitidas por estar extrayéndose: {', '.join(thread.skipped_versions)}"
+        QMessageBox.information(main_window, "Espacio optimizado", text)
+    
+    thread.dedupe_progress.connect(on_progress)
+    thread.dedupe_finished.connect(on_finished)
+    cancel_btn.clicked.connect(thread.cancel)
+    progress_dialog.rejected.connect(thread.cancel)
+    
+    progress_dialog.show()
+    thread.start()
 
 # Añadir función a la ventana principal
 main_window.show_extract_dialog = show_extract_dialog
+main_window.load_versions = load_versions
+
+def forget_load_versions():
+    """Evita que una extracción termine llamando a una página ya destruida."""
+    if getattr(main_window, "load_versions", None) is load_versions:
+        del main_window.load_versions
+
+page_widget.destroyed.connect(forget_load_versions)
 
 # Cargar versiones al iniciar
 load_versions()
\ No newline at end of file
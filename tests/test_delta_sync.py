@@ -0,0 +1,48 @@
+"""Pruebas de DeltaSync: el espejo nunca puede solaparse con el origen."""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from main import DeltaSync, ExportWriter  # noqa: E402
+
+
+@pytest.fixture
+def launcher(tmp_path):
+    """Carpeta del launcher con games/com.mojang y un mundo."""
+    games = tmp_path / "launcher" / "games" / "com.mojang"
+    world = games / "minecraftWorlds" / "w1"
+    world.mkdir(parents=True)
+    (world / "level.dat").write_bytes(b"level")
+    return games
+
+
+def test_sync_roundtrip(launcher, tmp_path):
+    mirror = tmp_path / "mirror"
+    sync = DeltaSync(mirror, delete=True, max_workers=1)
+    sync.sync(ExportWriter.export_roots(None, launcher))
+    assert (mirror / "games" / "minecraftWorlds" / "w1" / "level.dat").read_bytes() == b"level"
+    assert sync.stats['updated'] == 1
+
+
+@pytest.mark.parametrize("target", [
+    lambda games: games.parent.parent,             # su games/ es el propio origen
+    lambda games: games,                           # el propio origen
+    lambda games: games / "minecraftWorlds",       # dentro del origen
+])
+def test_overlapping_target_rejected(launcher, target):
+    with pytest.raises(ValueError):
+        DeltaSync(target(launcher), delete=True).sync(ExportWriter.export_roots(None, launcher))
+    assert (launcher / "minecraftWorlds" / "w1" / "level.dat").read_bytes() == b"level"
+
+
+def test_overlap_through_symlink_rejected(launcher, tmp_path):
+    link = tmp_path / "link"
+    os.symlink(launcher.parent.parent, link)
+    with pytest.raises(ValueError):
+        DeltaSync.check_target(link, ExportWriter.export_roots(None, launcher))
+    assert (launcher / "minecraftWorlds" / "w1" / "level.dat").exists()